@@ -1,6 +1,8 @@
 import streamlit as st
 import datetime
 from WvgHessian.query import hess_day_details_eff
+from efficiency.summary import ebno_shift_summary, filter_days_attended
+from efficiency.compare import compare_with_shifts, with_average_row, fill_blanks, SHIFT_EFF_VALUE_COLS
 import pandas as pd
 
 def hessian_low_producer_view():
@@ -18,7 +20,7 @@ def hessian_low_producer_view():
     st.write(f"**Selected Start Date:** {start_date}")
     st.info("This report is considering data from the selected date range")
 
-    df, _ = hess_day_details_eff(end_date, start_date)
+    df = hess_day_details_eff(end_date, start_date)
     if not df.empty:
         # --- Add typeable selectboxes for Shift, EBNO, and LoomNo ---
         shift_options = ['All'] + sorted([str(x) for x in df['Shift'].dropna().unique()]) if 'Shift' in df.columns else []
@@ -50,18 +52,7 @@ def hessian_low_producer_view():
         ebno_days_cols = ['EBNO', 'Date', 'Shift', 'EFF']
         missing_days_cols = [col for col in ebno_days_cols if col not in filtered_df.columns]
         if not filtered_df.empty and not missing_days_cols:
-            group_rows = []
-            for ebno, group in filtered_df.groupby(['EBNO']):
-                row = {'EBNO': ebno}
-                row['DaysAttended'] = group['Date'].nunique()
-                # Shiftwise average eff
-                for shift in ['A', 'B', 'C']:
-                    effs = group[(group['Shift'] == shift) & (group['EFF'] > 0) & (~group['EFF'].isnull())]['EFF']
-                    row[shift] = round(effs.mean(), 2) if not effs.empty else ''
-                effs_all = group[(group['EFF'] > 0) & (~group['EFF'].isnull())]['EFF']
-                row['Avg Eff'] = round(effs_all.mean(), 2) if not effs_all.empty else ''
-                group_rows.append(row)
-            group_df = pd.DataFrame(group_rows)
+            group_df = ebno_shift_summary(filtered_df, 'EBNO', 'Date', 'Shift', 'EFF')
             # Add DaysAttended filter controls
             colf1, colf2 = st.columns(2)
             with colf1:
@@ -69,12 +60,9 @@ def hessian_low_producer_view():
             with colf2:
                 days_filter_value = st.number_input('DaysAttended Value', min_value=0, value=0, key='hess_days_filter_value')
             # Apply DaysAttended filter
-            if days_filter_type != 'All':
-                if days_filter_type == 'Above':
-                    group_df = group_df[group_df['DaysAttended'] > days_filter_value]
-                elif days_filter_type == 'Below':
-                    group_df = group_df[group_df['DaysAttended'] < days_filter_value]
+            group_df = filter_days_attended(group_df, days_filter_type, days_filter_value)
             group_df = group_df.sort_values(by='DaysAttended', ascending=False).reset_index(drop=True)
+            group_df = fill_blanks(group_df, ['A', 'B', 'C', 'Avg Eff'], '')
             st.markdown('**Number of Days Worked (DaysAttended) and Shiftwise Eff per EBNO**')
             st.dataframe(group_df, hide_index=True)
 
@@ -82,47 +70,15 @@ def hessian_low_producer_view():
         if selected_ebno and selected_ebno != 'All' and 'EBNO' in filtered_df.columns:
             ebno_df = filtered_df[filtered_df['EBNO'].astype(str) == selected_ebno]
             if not ebno_df.empty:
-                # Use the original (unfiltered) df for EffA, EffB, EffC
-                orig_df = df.copy()
-                grouped = ebno_df.groupby(['Date', 'Shift', 'LOOM_NO'], as_index=False)
-                rows = []
-                for (date, shift, loomno), group in grouped:
-                    # Eff: average for selected EBNO, date, shift, loomno
-                    eff_vals = group['EFF']
-                    eff_vals = eff_vals[(eff_vals > 0) & (~eff_vals.isnull())]
-                    eff = round(eff_vals.mean(), 2) if not eff_vals.empty else ''
-                    # EffA, EffB, EffC: average for ALL spinners (all EBNOs) who worked on that date, loomno, and shift A/B/C (from original df, not filtered by EBNO)
-                    eff_a = orig_df[(orig_df['Date'] == date) & (orig_df['LOOM_NO'] == loomno) & (orig_df['Shift'] == 'A')]['EFF']
-                    eff_a = eff_a[(eff_a > 0) & (~eff_a.isnull())]
-                    eff_b = orig_df[(orig_df['Date'] == date) & (orig_df['LOOM_NO'] == loomno) & (orig_df['Shift'] == 'B')]['EFF']
-                    eff_b = eff_b[(eff_b > 0) & (~eff_b.isnull())]
-                    eff_c = orig_df[(orig_df['Date'] == date) & (orig_df['LOOM_NO'] == loomno) & (orig_df['Shift'] == 'C')]['EFF']
-                    eff_c = eff_c[(eff_c > 0) & (~eff_c.isnull())]
-                    eff_a_val = round(eff_a.mean(), 2) if not eff_a.empty else ''
-                    eff_b_val = round(eff_b.mean(), 2) if not eff_b.empty else ''
-                    eff_c_val = round(eff_c.mean(), 2) if not eff_c.empty else ''
-                    avg_eff = [v for v in [eff_a_val, eff_b_val, eff_c_val] if isinstance(v, (int, float))]
-                    avg_eff_val = round(sum(avg_eff) / len(avg_eff), 2) if avg_eff else ''
-                    rows.append({
-                        'Date': date,
-                        'Shift': shift,
-                        'EBNO': selected_ebno,
-                        'LoomNo': loomno,
-                        'Eff': eff,
-                        'EffA': eff_a_val,
-                        'EffB': eff_b_val,
-                        'EffC': eff_c_val,
-                        'AvgEff': avg_eff_val
-                    })
-                result_df = pd.DataFrame(rows)
+                # Own Eff per (date, shift, loomno) next to the EffA/EffB/EffC average of ALL workers
+                # on that date and loomno (from the original df, not filtered by EBNO)
+                result_df = compare_with_shifts(ebno_df, df, 'Date', 'Shift', 'LOOM_NO', 'EFF')
+                result_df = result_df.rename(columns={'LOOM_NO': 'LoomNo'})
+                result_df['EBNO'] = selected_ebno
+                result_df = result_df.reindex(columns=['Date', 'Shift', 'EBNO', 'LoomNo', 'Eff', 'EffA', 'EffB', 'EffC', 'AvgEff'])
                 # Add summary row for averages
-                if not result_df.empty:
-                    avg_row = {'Date': 'Avg', 'Shift': '', 'EBNO': selected_ebno, 'LoomNo': ''}
-                    for col in ['Eff', 'EffA', 'EffB', 'EffC', 'AvgEff']:
-                        vals = pd.to_numeric(result_df[col], errors='coerce')
-                        vals = vals[~vals.isnull()]
-                        avg_row[col] = round(vals.mean(), 2) if not vals.empty else ''
-                    result_df = pd.concat([result_df, pd.DataFrame([avg_row])], ignore_index=True)
+                result_df = with_average_row(result_df, SHIFT_EFF_VALUE_COLS, {'Date': 'Avg', 'Shift': '', 'EBNO': selected_ebno, 'LoomNo': ''}, blank='')
+                result_df = fill_blanks(result_df, SHIFT_EFF_VALUE_COLS, '')
                 st.markdown('**EBNO/Shiftwise Eff Table (Details)**')
                 st.dataframe(result_df, hide_index=True)
             else:
@@ -21,6 +21,8 @@ def s4_low_producer_view():
     import streamlit as st
     import datetime
     from WvgS4.query import S4_day_details_eff
+    from efficiency.summary import ebno_shift_summary, filter_days_attended, filter_avg_eff, sort_blanks_last
+    from efficiency.compare import fill_blanks
     import pandas as pd
     import re
 
@@ -38,7 +40,7 @@ def s4_low_producer_view():
     st.write(f"**Selected Start Date:** {start_date}")
     st.info("This report is considering data from the selected date range")
 
-    df, _ = S4_day_details_eff(end_date, start_date)
+    df = S4_day_details_eff(end_date, start_date)
     if not df.empty:
         # Add LoomGroup column before LOOM_NO
         if 'LOOM_NO' in df.columns:
@@ -106,43 +108,15 @@ def s4_low_producer_view():
             with colf4:
                 eff_filter_value = st.number_input('Avg Eff Value', min_value=0.0, value=0.0, key='eff_filter_value', step=0.1, format='%.2f')
 
-            group_rows = []
-            for ebno, group in group_base_df.groupby(['EBNO']):
-                row = {'EBNO': ebno}
-                # Get name (first non-null value for this EBNO)
-                name_val = group['Name'].dropna().unique()
-                row['Name'] = name_val[0] if len(name_val) > 0 else ''
-                row['DaysAttended'] = group['Date'].nunique()
-                # Calculate Avg LoomsRun: count of looms run where Eff > 0 divided by DaysAttended
-                # Count every loom row for this EBNO (duplicates included, no EFF filter)
-                looms_run = group['LOOM_NO'].count() if 'LOOM_NO' in group.columns else len(group)
-                row['Avg LoomsRun'] = round(looms_run / row['DaysAttended'], 0) if row['DaysAttended'] > 0 else ''
-                for shift in ['A', 'B', 'C']:
-                    effs = group[(group['Shift'] == shift) & (group['EFF'] > 0) & (~group['EFF'].isnull())]['EFF']
-                    row[shift] = round(effs.mean(), 2) if not effs.empty else ''
-                effs_all = group[(group['EFF'] > 0) & (~group['EFF'].isnull())]['EFF']
-                row['Avg Eff'] = round(effs_all.mean(), 2) if not effs_all.empty else ''
-                group_rows.append(row)
-            group_df = pd.DataFrame(group_rows)
+            # Avg LoomsRun counts every loom row for this EBNO (duplicates included, no EFF filter)
+            group_df = ebno_shift_summary(group_base_df, 'EBNO', 'Date', 'Shift', 'EFF', name_col='Name', looms_col='LOOM_NO')
             # Apply DaysAttended filter
-            if days_filter_type != 'All':
-                if days_filter_type == 'Above':
-                    group_df = group_df[group_df['DaysAttended'] > days_filter_value]
-                elif days_filter_type == 'Below':
-                    group_df = group_df[group_df['DaysAttended'] < days_filter_value]
+            group_df = filter_days_attended(group_df, days_filter_type, days_filter_value)
             # Apply Avg Eff filter
-            if eff_filter_type != 'All':
-                if eff_filter_type == 'Above':
-                    group_df = group_df[pd.to_numeric(group_df['Avg Eff'], errors='coerce') > eff_filter_value]
-                elif eff_filter_type == 'Below':
-                    group_df = group_df[pd.to_numeric(group_df['Avg Eff'], errors='coerce') < eff_filter_value]
+            group_df = filter_avg_eff(group_df, eff_filter_type, eff_filter_value)
             # Sort by Avg Eff (lowest to highest, blanks at the bottom)
-            def avg_eff_sort_key(val):
-                try:
-                    return float(val)
-                except:
-                    return float('inf')
-            group_df = group_df.sort_values(by='Avg Eff', key=lambda col: col.map(avg_eff_sort_key)).reset_index(drop=True)
+            group_df = sort_blanks_last(group_df, 'Avg Eff')
+            group_df = fill_blanks(group_df, ['Avg LoomsRun', 'A', 'B', 'C', 'Avg Eff'], '')
             st.markdown('**EBNO/Shiftwise Avg Eff Table**')
             st.dataframe(group_df, hide_index=True)
         elif not group_base_df.empty and missing_cols:
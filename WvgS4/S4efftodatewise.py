@@ -8,7 +8,7 @@ def s4_eff_todatewise_view():
     selected_date = st.date_input("Select End Date", value=datetime.date.today())
     if selected_date:
         start_date = selected_date.replace(day=1)
-        df, _ = S4_day_details_eff(selected_date, start_date)
+        df = S4_day_details_eff(selected_date, start_date)
         if not df.empty:
             # Add typeable dropdown for EBNO
             ebno_list = sorted(df['EBNO'].dropna().unique().astype(str))
@@ -6,7 +6,7 @@ def s4_eff_daywise_view():
     st.title("S4 Daywise Efficiency Details")
     selected_date = st.date_input("Select Date", value=datetime.date.today())
     if selected_date:
-        df, _ = S4_day_details_eff_day(selected_date)
+        df = S4_day_details_eff_day(selected_date)
         if not df.empty:
             st.dataframe(df)
         else:
@@ -13,7 +13,7 @@ def s4_from_day_to_day_view():
     with col2:
         to_date = st.date_input("To Date", value=today, key="to_date")
     if start_date and to_date and start_date <= to_date:
-        df, _ = S4_day_details_eff(to_date, start_date)
+        df = S4_day_details_eff(to_date, start_date)
         if not df.empty:
             # Add LoomGroup column before LOOM_NO
             if 'LOOM_NO' in df.columns:
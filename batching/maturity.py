@@ -0,0 +1,119 @@
+"""
+Roll maturity as whole-frame array operations.
+
+Rolls are left to mature for a quality-specific number of hours
+(``EMPMILL12.maturity_time_master``, 48 h when a quality has no row) before
+they are issued. The entry page, the maturity report and the required-issue
+projection all work this out for many rows at once; the helpers here take
+and return Series so none of them needs a per-row ``apply``.
+
+States, as coloured on the pages (``TOLERANCE_HOURS`` either side of the
+target counts as on target):
+
+    maturing   elapsed < target - tolerance      yellow
+    ready      within the tolerance              green
+    over       elapsed > target + tolerance      red
+"""
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TARGET_HOURS = 48
+TOLERANCE_HOURS = 2
+
+MATURING, READY, OVER = "maturing", "ready", "over"
+STATE_COLORS = {
+    MATURING: "background-color: #fff3cd",
+    READY: "background-color: #d4edda",
+    OVER: "background-color: #f8d7da",
+}
+
+
+def entry_timestamps(dates, hours) -> pd.Series:
+    """Ledger date + hour columns as one datetime64 Series."""
+    dates = pd.Series(dates)
+    days = np.asarray(dates.to_numpy(), dtype="datetime64[D]")
+    offsets = pd.to_numeric(pd.Series(hours, index=dates.index), errors="coerce").to_numpy(dtype=float)
+    return pd.Series(days.astype("datetime64[s]") + (offsets * 3600).astype("timedelta64[s]"), index=dates.index)
+
+
+def elapsed_hours(start, end=None, rounding: str = "round") -> pd.Series:
+    """
+    Hours from ``start`` to ``end`` (default: now), never negative.
+
+    ``start`` is a datetime Series or, if numeric, Unix seconds (as the
+    balance table's average entry time is; ``end`` must then be a single
+    datetime). ``end`` may also be a Series aligned with ``start``.
+    ``rounding`` is "round" or "floor"; the result is nullable Int64 so
+    missing starts stay missing.
+    """
+    start = pd.Series(start)
+    if end is None:
+        end = datetime.datetime.now()
+    if pd.api.types.is_numeric_dtype(start):
+        hours = (end.timestamp() - start.to_numpy(dtype=float)) / 3600.0
+    else:
+        start_dt = pd.to_datetime(start).to_numpy(dtype="datetime64[s]")
+        end_dt = (pd.to_datetime(end).to_numpy(dtype="datetime64[s]") if isinstance(end, pd.Series)
+                  else np.datetime64(pd.Timestamp(end), "s"))
+        hours = (end_dt - start_dt) / np.timedelta64(1, "h")
+    hours = np.floor(hours) if rounding == "floor" else np.round(hours)
+    return pd.Series(pd.array(np.clip(hours, 0, None), dtype="Float64"), index=start.index).astype("Int64")
+
+
+def target_hours(quality_ids, maturity_df: Optional[pd.DataFrame], default: int = DEFAULT_TARGET_HOURS) -> pd.Series:
+    """Target maturity per row from a ``jute_quality_id, maturity_hours`` frame, ``default`` when missing."""
+    quality_ids = pd.Series(quality_ids)
+    if maturity_df is None or maturity_df.empty:
+        return pd.Series(default, index=quality_ids.index, dtype="Int64")
+    lookup = maturity_df.drop_duplicates("jute_quality_id", keep="last").set_index("jute_quality_id")["maturity_hours"]
+    return quality_ids.map(lookup).fillna(default).astype(float).round(0).astype("Int64")
+
+
+def maturity_state(elapsed, target, tolerance: float = TOLERANCE_HOURS) -> pd.Series:
+    """MATURING / READY / OVER per row, None where either side is missing."""
+    elapsed = pd.to_numeric(pd.Series(elapsed), errors="coerce").astype(float)
+    target = pd.to_numeric(pd.Series(target, index=elapsed.index), errors="coerce").astype(float)
+    diff = (elapsed - target).to_numpy()
+    known = ~np.isnan(diff)
+    state = np.select(
+        [known & (np.abs(diff) <= tolerance), known & (diff < 0), known],
+        [READY, MATURING, OVER],
+        default=None,
+    )
+    return pd.Series(state, index=elapsed.index, dtype=object)
+
+
+def is_ready(elapsed, target, tolerance: float = TOLERANCE_HOURS) -> pd.Series:
+    """True where rolls have reached their target (within the tolerance) or passed it."""
+    state = maturity_state(elapsed, target, tolerance)
+    return state.isin([READY, OVER])
+
+
+def state_styles(frame: pd.DataFrame, column: str, state: pd.Series) -> pd.DataFrame:
+    """
+    CSS for ``Styler.apply(..., axis=None)``: colour ``column`` by ``state``
+    (aligned with ``frame``'s index), leave every other cell blank.
+    """
+    styles = pd.DataFrame("", index=frame.index, columns=frame.columns)
+    if column in frame.columns:
+        styles[column] = state.reindex(frame.index).map(STATE_COLORS).fillna("")
+    return styles
+
+
+def cover_days(hours) -> pd.Series:
+    """Maturity hours as days of consumption the stock has to cover (missing counts as 0)."""
+    return pd.to_numeric(pd.Series(hours), errors="coerce").fillna(0.0) / 24.0
+
+
+def closing_dates(start_date, hours, extra_days: int = 0) -> pd.Series:
+    """
+    '%Y-%m-%d' of the day whose planned consumption stock maturing for
+    ``hours`` covers: ``start_date`` plus the hours in whole days (rounded)
+    plus ``extra_days``.
+    """
+    days = np.round(cover_days(hours).to_numpy()) + extra_days
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(days, unit="D")
+    return pd.Series(dates.strftime("%Y-%m-%d"), index=pd.Series(hours).index)
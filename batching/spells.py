@@ -0,0 +1,44 @@
+"""
+Spell (shift) buckets for the spreader ledger.
+
+    A1 06-11   B1 11-14   A2 14-17   B2 17-22   C 22-06
+
+The production day starts at 06:00, so hours 00-05 are the C spell of the
+previous day. The helpers bucket whole columns with one ``searchsorted``
+over the boundary hours instead of an if/elif chain per row.
+"""
+import numpy as np
+import pandas as pd
+
+# Display order, as in the pages' spell pickers and pivots
+SPELLS = ("A1", "A2", "B1", "B2", "C")
+PRODUCTION_DAY_START = 6
+
+_BOUNDARIES = np.array([6, 11, 14, 17, 22])
+# Spell for each gap between boundaries: <6, 6-11, 11-14, 14-17, 17-22, >=22
+_LABELS = np.array(["C", "A1", "B1", "A2", "B2", "C"], dtype=object)
+
+
+def spell_for_hour(hour: int) -> str:
+    """The spell an entry hour (0-23) falls in."""
+    return _LABELS[np.searchsorted(_BOUNDARIES, int(hour), side="right")]
+
+
+def spells_for_hours(hours) -> pd.Series:
+    """Spell per row; None where the hour is missing."""
+    hours = pd.to_numeric(pd.Series(hours), errors="coerce")
+    values = hours.to_numpy(dtype=float)
+    known = ~np.isnan(values)
+    labels = np.full(len(values), None, dtype=object)
+    labels[known] = _LABELS[np.searchsorted(_BOUNDARIES, values[known], side="right")]
+    return pd.Series(labels, index=hours.index, dtype=object)
+
+
+def production_dates(dates, hours) -> pd.Series:
+    """The 06:00-to-06:00 production day of each row, as datetime64 at midnight (NaT where the hour is missing)."""
+    dates = pd.Series(dates)
+    hours = pd.to_numeric(pd.Series(hours, index=dates.index), errors="coerce").to_numpy(dtype=float)
+    days = np.asarray(dates.to_numpy(), dtype="datetime64[D]")
+    days = np.where(hours < PRODUCTION_DAY_START, days - np.timedelta64(1, "D"), days)
+    days[np.isnan(hours)] = np.datetime64("NaT")
+    return pd.Series(days.astype("datetime64[s]"), index=dates.index)
@@ -0,0 +1,235 @@
+"""
+Running roll stock balance for the spreader ledger.
+
+``EMPMILL12.spreader_roll_balance`` keeps one row per (entry_id_grp, bin_no,
+wt_per_roll) with the rolls produced and issued so far, so stock lookups read
+a handful of rows instead of aggregating the whole production and issue
+history. Every insert and delete of a ledger row rebuilds the balance rows of
+its group inside the same transaction (a group only ever has a few rows).
+Callers run ``ensure_balance()`` before opening that transaction; the helpers
+that take a connection assume the table exists.
+
+The balance can drift if the ledger is edited outside these helpers; run the
+reconciliation job to check it against the full ledger:
+
+    python -m batching.spreader_balance          # report differences
+    python -m batching.spreader_balance --fix    # and rebuild the affected groups
+
+Both also list keys with more rolls issued than produced, including issues
+of a weight the group never produced; those need the ledger corrected.
+"""
+import argparse
+import datetime
+import sys
+import threading
+
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Double, Index, Integer, MetaData, Table, func, inspect, select, text
+
+from db import get_engine
+from .spreader_ledger import ensure_ledger_timestamps
+
+_lock = threading.Lock()
+_ready = False
+
+_metadata = MetaData(schema="EMPMILL12")
+
+balance_table = Table(
+    "spreader_roll_balance",
+    _metadata,
+    Column("entry_id_grp", Integer, primary_key=True, autoincrement=False),
+    Column("bin_no", Integer, primary_key=True, autoincrement=False),
+    Column("wt_per_roll", Double, primary_key=True),
+    Column("jute_quality_id", Integer),
+    Column("produced_rolls", Integer, nullable=False, server_default=text("0")),
+    Column("issued_rolls", Integer, nullable=False, server_default=text("0")),
+    Column("balance_rolls", Integer, nullable=False, server_default=text("0")),
+    # For the average entry time shown as maturity: SUM/COUNT of entry timestamps
+    Column("entry_rows", Integer, nullable=False, server_default=text("0")),
+    Column("entry_ts_sum", Double, nullable=False, server_default=text("0")),
+    Column("max_entry_date", Date),
+    Column("max_entry_time", Integer),
+    Column("updated_at", DateTime, nullable=False),
+    Index("idx_srb_bin", "bin_no"),
+    Index("idx_srb_open", "balance_rolls"),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4",
+)
+
+# The per-group rebuild filters both ledger tables on entry_id_grp
+_ledger_metadata = MetaData(schema="EMPMILL12")
+_LEDGER_INDEXES = [
+    Index("idx_spe_entry_id_grp", Table("spreader_prod_entry", _ledger_metadata, Column("entry_id_grp", Integer)).c.entry_id_grp),
+    Index("idx_sri_entry_id_grp", Table("spreader_roll_issue", _ledger_metadata, Column("entry_id_grp", Integer)).c.entry_id_grp),
+]
+
+# Balance rows as computed from the full ledger; {where} narrows every side.
+# The second half keeps issues of a weight the group never produced (a
+# negative balance, booked against the group's bin, or bin 0 when the group
+# has no production at all) so they show up instead of vanishing in the join.
+_LEDGER_BALANCE_SQL = """
+    SELECT p.entry_id_grp, p.bin_no, p.wt_per_roll, p.jute_quality_id,
+           p.produced_rolls,
+           COALESCE(i.issued_rolls, 0) AS issued_rolls,
+           p.produced_rolls - COALESCE(i.issued_rolls, 0) AS balance_rolls,
+           p.entry_rows, p.entry_ts_sum, p.max_entry_date, p.max_entry_time
+    FROM (
+        SELECT entry_id_grp, bin_no, COALESCE(wt_per_roll, 0) AS wt_per_roll,
+               MAX(jute_quality_id) AS jute_quality_id,
+               SUM(no_of_rolls) AS produced_rolls,
+               COUNT(entry_dt) AS entry_rows,
+               COALESCE(SUM(UNIX_TIMESTAMP(entry_dt)), 0) AS entry_ts_sum,
+               MAX(entry_date) AS max_entry_date,
+               MAX(entry_time) AS max_entry_time
+        FROM EMPMILL12.spreader_prod_entry
+        WHERE entry_id_grp IS NOT NULL {where}
+        GROUP BY entry_id_grp, bin_no, COALESCE(wt_per_roll, 0)
+    ) p
+    LEFT JOIN (
+        SELECT entry_id_grp, COALESCE(wt_per_roll, 0) AS wt_per_roll, SUM(no_of_rolls) AS issued_rolls
+        FROM EMPMILL12.spreader_roll_issue
+        WHERE entry_id_grp IS NOT NULL {where}
+        GROUP BY entry_id_grp, COALESCE(wt_per_roll, 0)
+    ) i ON i.entry_id_grp = p.entry_id_grp AND i.wt_per_roll = p.wt_per_roll
+    UNION ALL
+    SELECT i.entry_id_grp, COALESCE(g.bin_no, 0), i.wt_per_roll, g.jute_quality_id,
+           0, i.issued_rolls, -i.issued_rolls,
+           0, 0, NULL, NULL
+    FROM (
+        SELECT entry_id_grp, COALESCE(wt_per_roll, 0) AS wt_per_roll, SUM(no_of_rolls) AS issued_rolls
+        FROM EMPMILL12.spreader_roll_issue
+        WHERE entry_id_grp IS NOT NULL {where}
+        GROUP BY entry_id_grp, COALESCE(wt_per_roll, 0)
+    ) i
+    LEFT JOIN (
+        SELECT entry_id_grp, MIN(bin_no) AS bin_no, MAX(jute_quality_id) AS jute_quality_id
+        FROM EMPMILL12.spreader_prod_entry
+        WHERE entry_id_grp IS NOT NULL {where}
+        GROUP BY entry_id_grp
+    ) g ON g.entry_id_grp = i.entry_id_grp
+    WHERE NOT EXISTS (
+        SELECT 1 FROM EMPMILL12.spreader_prod_entry e
+        WHERE e.entry_id_grp = i.entry_id_grp AND COALESCE(e.wt_per_roll, 0) = i.wt_per_roll
+    )
+"""
+
+_INSERT_SQL = """
+    INSERT INTO EMPMILL12.spreader_roll_balance
+        (entry_id_grp, bin_no, wt_per_roll, jute_quality_id, produced_rolls, issued_rolls, balance_rolls,
+         entry_rows, entry_ts_sum, max_entry_date, max_entry_time, updated_at)
+    SELECT entry_id_grp, bin_no, wt_per_roll, jute_quality_id, produced_rolls, issued_rolls, balance_rolls,
+           entry_rows, entry_ts_sum, max_entry_date, max_entry_time, :now
+    FROM ({select}) b
+"""
+
+_rebuild_group_sql = text(_INSERT_SQL.format(select=_LEDGER_BALANCE_SQL.format(where="AND entry_id_grp = :entry_id_grp")))
+_rebuild_all_sql = text(_INSERT_SQL.format(select=_LEDGER_BALANCE_SQL.format(where="")))
+_ledger_balance_sql = text(_LEDGER_BALANCE_SQL.format(where=""))
+
+_KEY = ["entry_id_grp", "bin_no", "wt_per_roll"]
+_COMPARED = ["jute_quality_id", "produced_rolls", "issued_rolls", "balance_rolls", "entry_rows"]
+
+
+def _ensure_ledger_indexes(conn) -> None:
+    """Index entry_id_grp on both ledger tables unless some index already leads with it."""
+    inspector = inspect(conn)
+    for index in _LEDGER_INDEXES:
+        existing = inspector.get_indexes(index.table.name, schema=index.table.schema)
+        if not any(ix["column_names"][:1] == ["entry_id_grp"] for ix in existing):
+            index.create(conn)
+
+
+def ensure_balance() -> None:
+    """Create the balance table if needed and fill it from the ledger the first time."""
+    global _ready
+    if _ready:
+        return
+    ensure_ledger_timestamps()
+    with _lock:
+        if _ready:
+            return
+        with get_engine().begin() as conn:
+            _ensure_ledger_indexes(conn)
+            _metadata.create_all(conn, checkfirst=True)
+            if conn.execute(select(func.count()).select_from(balance_table)).scalar() == 0:
+                conn.execute(_rebuild_all_sql, {"now": datetime.datetime.now()})
+        _ready = True
+
+
+def refresh_group(conn, entry_id_grp: int) -> None:
+    """Rebuild the balance rows of one group from the ledger, on the caller's transaction."""
+    conn.execute(balance_table.delete().where(balance_table.c.entry_id_grp == int(entry_id_grp)))
+    conn.execute(_rebuild_group_sql, {"entry_id_grp": int(entry_id_grp), "now": datetime.datetime.now()})
+
+
+def available_rolls(conn, entry_id_grp: int, wt_per_roll: float) -> int:
+    """Rolls of one weight still in stock for a group."""
+    total = conn.execute(
+        select(func.coalesce(func.sum(balance_table.c.balance_rolls), 0)).where(
+            balance_table.c.entry_id_grp == int(entry_id_grp),
+            balance_table.c.wt_per_roll == float(wt_per_roll),
+        )
+    ).scalar()
+    return int(total or 0)
+
+
+def reconcile(fix: bool = False) -> pd.DataFrame:
+    """
+    Compare the balance table with the full ledger.
+
+    Returns one row per key that differs (missing on either side or with
+    different counts), with ``_ledger`` / ``_balance`` suffixed columns. With
+    ``fix=True`` the affected groups are rebuilt.
+    """
+    ensure_balance()
+    with get_engine().connect() as conn:
+        expected = pd.read_sql(_ledger_balance_sql, conn)
+        actual = pd.read_sql(select(*[balance_table.c[c] for c in _KEY + _COMPARED]), conn)
+    merged = expected[_KEY + _COMPARED].merge(
+        actual, on=_KEY, how="outer", suffixes=("_ledger", "_balance"), indicator=True
+    )
+    differs = merged["_merge"] != "both"
+    for col in _COMPARED:
+        a, b = merged[f"{col}_ledger"], merged[f"{col}_balance"]
+        differs |= ~((a == b) | (a.isna() & b.isna()))
+    diff = merged[differs].drop(columns="_merge").reset_index(drop=True)
+    if fix and not diff.empty:
+        with get_engine().begin() as conn:
+            for grp in diff["entry_id_grp"].dropna().astype(int).unique():
+                refresh_group(conn, grp)
+    return diff
+
+
+def overdrawn() -> pd.DataFrame:
+    """Balance rows with more rolls issued than produced (e.g. issues of a weight the group never made)."""
+    ensure_balance()
+    with get_engine().connect() as conn:
+        return pd.read_sql(
+            select(*[balance_table.c[c] for c in _KEY + _COMPARED])
+            .where(balance_table.c.balance_rolls < 0)
+            .order_by(balance_table.c.entry_id_grp, balance_table.c.wt_per_roll),
+            conn,
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the spreader roll balance against the ledger.")
+    parser.add_argument("--fix", action="store_true", help="rebuild the groups that differ")
+    args = parser.parse_args(argv)
+    diff = reconcile(fix=args.fix)
+    if diff.empty:
+        print("spreader_roll_balance matches the ledger")
+    else:
+        print(f"{diff['entry_id_grp'].nunique()} group(s) differ from the ledger"
+              f"{' and were rebuilt' if args.fix else ''}:")
+        print(diff.to_string(index=False))
+    # Only a ledger correction clears these, so they fail the check even with --fix
+    negative = overdrawn()
+    if not negative.empty:
+        print(f"{len(negative)} balance row(s) have more rolls issued than produced:")
+        print(negative.to_string(index=False))
+    return 0 if (diff.empty or args.fix) and negative.empty else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
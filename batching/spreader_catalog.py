@@ -0,0 +1,145 @@
+"""
+Shared lookup catalog for the spreader pages.
+
+The bin, jute quality, maturity and spreader machine masters change a few
+times a year, yet the entry page read all of them (plus a 90-day scan of the
+jute receipts) on every rerun. They are instead loaded once into an
+immutable ``Catalog`` snapshot shared by every session. Each load gets a new
+``version``, so a caller holding a snapshot can tell whether it is current.
+
+The masters are reloaded on the first access after REFRESH_SECONDS or after
+``invalidate()``. The set of qualities received in the last
+RECENT_QUALITY_DAYS days is the expensive part; after the first load it is
+recomputed by a background thread every RECENT_REFRESH_SECONDS, and readers
+keep getting the previous set meanwhile.
+
+Frames in a snapshot are shared; the accessor functions return copies.
+"""
+import dataclasses
+import logging
+import threading
+import time
+from typing import FrozenSet, List, Optional
+
+import pandas as pd
+
+from .rollestockbatchingquery import (
+    get_bin_no,
+    get_jute_quality,
+    get_maturity_hours,
+    get_recent_jute_quality_ids_90d,
+    get_spreader_machine_no,
+)
+
+REFRESH_SECONDS = 10 * 60
+RECENT_QUALITY_DAYS = 90
+RECENT_REFRESH_SECONDS = 30 * 60
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class Catalog:
+    version: int
+    loaded_at: float
+    bins: tuple
+    jute_quality: pd.DataFrame
+    maturity_hours: pd.DataFrame
+    spreaders: pd.DataFrame
+    recent_quality_ids: FrozenSet[int]
+
+
+_lock = threading.Lock()
+_current: Optional[Catalog] = None
+_version = 0
+_stale = False
+_recent_stale = False
+_refresher: Optional[threading.Thread] = None
+
+
+def _load_recent() -> FrozenSet[int]:
+    return frozenset(get_recent_jute_quality_ids_90d(RECENT_QUALITY_DAYS))
+
+
+def _publish(**changes) -> Catalog:
+    """Swap in a new snapshot with the given fields replaced; caller holds _lock."""
+    global _current, _version
+    _version += 1
+    _current = dataclasses.replace(_current, version=_version, **changes)
+    return _current
+
+
+def _load_masters() -> None:
+    """Load every master (and the recent set, the first time); caller holds _lock."""
+    global _current, _version, _stale, _recent_stale
+    recent = _current.recent_quality_ids if _current is not None else None
+    if recent is None or _recent_stale:
+        try:
+            recent = _load_recent()
+        except Exception:
+            log.warning("recent jute quality set unavailable", exc_info=True)
+            recent = frozenset()
+    _version += 1
+    _current = Catalog(
+        version=_version,
+        loaded_at=time.monotonic(),
+        bins=tuple(get_bin_no()),
+        jute_quality=get_jute_quality(),
+        maturity_hours=get_maturity_hours(),
+        spreaders=get_spreader_machine_no(),
+        recent_quality_ids=recent,
+    )
+    _stale = _recent_stale = False
+
+
+def _refresh_recent_forever() -> None:
+    while True:
+        time.sleep(RECENT_REFRESH_SECONDS)
+        try:
+            recent = _load_recent()
+        except Exception:
+            log.warning("refreshing the recent jute quality set failed", exc_info=True)
+            continue
+        with _lock:
+            if recent != _current.recent_quality_ids:
+                _publish(recent_quality_ids=recent)
+
+
+def catalog() -> Catalog:
+    """The current snapshot, loaded or reloaded as needed."""
+    global _refresher
+    with _lock:
+        if _current is None or _stale or time.monotonic() - _current.loaded_at > REFRESH_SECONDS:
+            _load_masters()
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_recent_forever, name="spreader-catalog", daemon=True)
+            _refresher.start()
+        return _current
+
+
+def invalidate(recent: bool = False) -> None:
+    """Reload the masters on next access; with ``recent`` also recompute the recent quality set."""
+    global _stale, _recent_stale
+    with _lock:
+        _stale = True
+        _recent_stale = _recent_stale or recent
+
+
+def bin_options() -> List:
+    return list(catalog().bins)
+
+
+def jute_quality() -> pd.DataFrame:
+    return catalog().jute_quality.copy()
+
+
+def maturity_hours() -> pd.DataFrame:
+    return catalog().maturity_hours.copy()
+
+
+def spreader_machines() -> pd.DataFrame:
+    return catalog().spreaders.copy()
+
+
+def recent_quality_ids() -> FrozenSet[int]:
+    return catalog().recent_quality_ids
@@ -0,0 +1,237 @@
+"""
+Daily roll stock checkpoints for as-of-time stock queries.
+
+``EMPMILL12.spreader_stock_checkpoint`` holds the closing rolls per (bin,
+group, weight, quality) as of 06:00 on a day (ledger rows strictly before
+it); keys with no stock are not stored. An as-of query starts from the
+checkpoint at or before the requested time and adds only the production and
+issues since then, so a historical view costs at most one day of ledger rows
+instead of the whole history.
+
+Checkpoints are built on first use (from the latest earlier checkpoint, or
+from the full ledger when there is none) and recorded in
+``EMPMILL12.spreader_stock_checkpoint_log``. Writing a ledger row dated
+before an existing checkpoint drops that checkpoint and every later one.
+
+Issues carry no bin or quality of their own; as in the original snapshot
+query they are booked against the bin and quality of their group's
+production rows.
+"""
+import datetime
+import threading
+
+import pandas as pd
+from sqlalchemy import Column, DateTime, Double, Index, Integer, MetaData, Table, select, text
+
+from db import get_engine
+from .spreader_ledger import ensure_ledger_timestamps
+
+CHECKPOINT_HOUR = 6
+
+_lock = threading.Lock()
+_tables_ready = False
+# Stands in for "no checkpoint yet": every ledger row is after it
+_EPOCH = datetime.datetime(1900, 1, 1)
+
+_metadata = MetaData(schema="EMPMILL12")
+
+checkpoint_table = Table(
+    "spreader_stock_checkpoint",
+    _metadata,
+    Column("checkpoint_dt", DateTime, nullable=False),
+    Column("bin_no", Integer),
+    Column("entry_id_grp", Integer),
+    Column("wt_per_roll", Double),
+    Column("jute_quality_id", Integer),
+    Column("closing_rolls", Integer, nullable=False),
+    Index("idx_ssc_checkpoint_dt", "checkpoint_dt"),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4",
+)
+
+checkpoint_log_table = Table(
+    "spreader_stock_checkpoint_log",
+    _metadata,
+    Column("checkpoint_dt", DateTime, primary_key=True),
+    Column("built_at", DateTime, nullable=False),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4",
+)
+
+_KEY = "bin_no, entry_id_grp, wt_per_roll, jute_quality_id"
+
+# Ledger movements with :{lo} <= dt {op} :{hi}, one row per key.
+_PROD_SQL = """
+    SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id, SUM(no_of_rolls) AS rolls
+    FROM EMPMILL12.spreader_prod_entry
+    WHERE entry_dt >= :{lo} AND entry_dt {op} :{hi}
+    GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
+"""
+
+_ISSUE_SQL = """
+    SELECT spe.bin_no, sri.entry_id_grp, sri.wt_per_roll, spe.jute_quality_id, SUM(sri.no_of_rolls) AS rolls
+    FROM EMPMILL12.spreader_roll_issue sri
+    LEFT JOIN (
+        SELECT DISTINCT entry_id_grp, bin_no, jute_quality_id
+        FROM EMPMILL12.spreader_prod_entry
+        WHERE entry_id_grp IN (
+            SELECT entry_id_grp FROM EMPMILL12.spreader_roll_issue
+            WHERE issue_dt >= :{lo} AND issue_dt {op} :{hi}
+        )
+    ) spe ON spe.entry_id_grp = sri.entry_id_grp
+    WHERE sri.issue_dt >= :{lo} AND sri.issue_dt {op} :{hi}
+    GROUP BY spe.bin_no, sri.entry_id_grp, sri.wt_per_roll, spe.jute_quality_id
+"""
+
+
+def _movements(lo: str, hi: str, op: str = "<") -> str:
+    """Production as +rolls and issues as -rolls between two bound parameters."""
+    return f"""
+        SELECT {_KEY}, rolls FROM ({_PROD_SQL.format(lo=lo, hi=hi, op=op)}) prod
+        UNION ALL
+        SELECT {_KEY}, -rolls FROM ({_ISSUE_SQL.format(lo=lo, hi=hi, op=op)}) issu
+    """
+
+
+_CHECKPOINT_ROWS_SQL = f"""
+    SELECT {_KEY}, closing_rolls AS rolls
+    FROM EMPMILL12.spreader_stock_checkpoint
+    WHERE checkpoint_dt = :cp_dt
+"""
+
+_build_sql = text(
+    f"""
+    INSERT INTO EMPMILL12.spreader_stock_checkpoint (checkpoint_dt, {_KEY}, closing_rolls)
+    SELECT :new_dt, {_KEY}, SUM(rolls)
+    FROM (
+        {_CHECKPOINT_ROWS_SQL}
+        UNION ALL
+        {_movements("cp_dt", "new_dt")}
+    ) m
+    GROUP BY {_KEY}
+    HAVING SUM(rolls) <> 0
+    """
+)
+
+
+def _as_of_sql(op: str):
+    return text(
+        f"""
+        SELECT {_KEY}, SUM(rolls) AS rolls
+        FROM (
+            {_CHECKPOINT_ROWS_SQL}
+            UNION ALL
+            {_movements("cp_dt", "at_dt", op)}
+        ) m
+        GROUP BY {_KEY}
+        HAVING SUM(rolls) <> 0
+        ORDER BY {_KEY}
+        """
+    )
+
+
+_as_of_before_sql = _as_of_sql("<")
+_as_of_through_sql = _as_of_sql("<=")
+
+_window_sql = text(
+    f"""
+    SELECT {_KEY},
+           SUM(openstock) AS openstock,
+           SUM(prodroll)  AS prodroll,
+           SUM(issueroll) AS issueroll,
+           SUM(openstock) + SUM(prodroll) - SUM(issueroll) AS closstock
+    FROM (
+        -- Opening stock: checkpoint plus movements up to the opening time
+        SELECT {_KEY}, rolls AS openstock, 0 AS prodroll, 0 AS issueroll
+        FROM (
+            {_CHECKPOINT_ROWS_SQL}
+            UNION ALL
+            {_movements("cp_dt", "opening_dt")}
+        ) o
+        UNION ALL
+        -- Production within window
+        SELECT {_KEY}, 0 AS openstock, rolls AS prodroll, 0 AS issueroll
+        FROM ({_PROD_SQL.format(lo="opening_dt", hi="closing_dt", op="<")}) wp
+        UNION ALL
+        -- Issues within window
+        SELECT {_KEY}, 0 AS openstock, 0 AS prodroll, rolls AS issueroll
+        FROM ({_ISSUE_SQL.format(lo="opening_dt", hi="closing_dt", op="<")}) wi
+    ) g
+    GROUP BY {_KEY}
+    HAVING SUM(openstock) <> 0 OR SUM(prodroll) <> 0 OR SUM(issueroll) <> 0
+    ORDER BY bin_no, entry_id_grp, wt_per_roll
+    """
+)
+
+
+def ensure_checkpoint_tables() -> None:
+    """Create the checkpoint and checkpoint-log tables if they don't exist."""
+    global _tables_ready
+    if _tables_ready:
+        return
+    ensure_ledger_timestamps()
+    _metadata.create_all(get_engine(), checkfirst=True)
+    _tables_ready = True
+
+
+def checkpoint_boundary(at: datetime.datetime) -> datetime.datetime:
+    """The latest 06:00 at or before ``at``."""
+    boundary = at.replace(hour=CHECKPOINT_HOUR, minute=0, second=0, microsecond=0)
+    return boundary if boundary <= at else boundary - datetime.timedelta(days=1)
+
+
+def checkpoint_for(at: datetime.datetime) -> datetime.datetime:
+    """
+    Return the checkpoint time to start an as-of query for ``at`` from,
+    building that checkpoint first if it is missing. Never later than the
+    current day's boundary, so future times read from today's checkpoint.
+    """
+    ensure_checkpoint_tables()
+    target = min(checkpoint_boundary(at), checkpoint_boundary(datetime.datetime.now()))
+    log = checkpoint_log_table
+    with _lock:
+        with get_engine().begin() as conn:
+            latest = conn.execute(
+                select(log.c.checkpoint_dt)
+                .where(log.c.checkpoint_dt <= target)
+                .order_by(log.c.checkpoint_dt.desc())
+                .limit(1)
+            ).scalar()
+            if latest != target:
+                conn.execute(_build_sql, {"cp_dt": latest or _EPOCH, "new_dt": target})
+                conn.execute(log.insert(), {"checkpoint_dt": target, "built_at": datetime.datetime.now()})
+    return target
+
+
+def invalidate_from(conn, at: datetime.datetime) -> None:
+    """Drop checkpoints that a ledger row dated ``at`` would change, on the caller's transaction."""
+    if not isinstance(at, datetime.datetime):
+        at = datetime.datetime.fromisoformat(str(at))
+    conn.execute(checkpoint_table.delete().where(checkpoint_table.c.checkpoint_dt > at))
+    conn.execute(checkpoint_log_table.delete().where(checkpoint_log_table.c.checkpoint_dt > at))
+
+
+def stock_as_of(at: datetime.datetime, inclusive: bool = False) -> pd.DataFrame:
+    """
+    Closing rolls per (bin_no, entry_id_grp, wt_per_roll, jute_quality_id)
+    from ledger rows before ``at`` (or at it, with ``inclusive``). Keys with
+    no stock are left out.
+    """
+    cp_dt = checkpoint_for(at)
+    sql = _as_of_through_sql if inclusive else _as_of_before_sql
+    with get_engine().connect() as conn:
+        return pd.read_sql(sql, conn, params={"cp_dt": cp_dt, "at_dt": at})
+
+
+def stock_window(opening_dt: datetime.datetime, closing_dt: datetime.datetime) -> pd.DataFrame:
+    """
+    Opening rolls before ``opening_dt``, production and issues in
+    [opening_dt, closing_dt) and the resulting closing rolls, per
+    (bin_no, entry_id_grp, wt_per_roll, jute_quality_id).
+    """
+    cp_dt = checkpoint_for(opening_dt)
+    with get_engine().connect() as conn:
+        return pd.read_sql(
+            _window_sql, conn,
+            params={"cp_dt": cp_dt, "opening_dt": opening_dt, "closing_dt": closing_dt},
+        )
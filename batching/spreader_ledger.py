@@ -0,0 +1,133 @@
+"""
+Stored timestamps for the spreader roll ledger.
+
+``spreader_prod_entry`` and ``spreader_roll_issue`` keep the date and the hour
+in separate columns, so "stock as of <datetime>" filters had to rebuild the
+datetime per row with ``STR_TO_DATE(CONCAT(...))`` and could not use an index.
+Each table now also carries the combined value (``entry_dt`` / ``issue_dt``)
+as an indexed STORED generated column, so every row has it, including rows
+written by other tools or fixed by hand; snapshot queries compare it
+directly against a datetime parameter.
+
+The columns are added by an explicit migration,
+
+    python -m batching.spreader_ledger
+
+which the ledger helpers also run once on first use (``ensure_ledger_timestamps``).
+A failed migration is logged and raised rather than left for the snapshot
+queries to trip over.
+"""
+import argparse
+import datetime
+import logging
+import sys
+import threading
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, MetaData, Table, inspect, text
+
+from db import get_engine
+
+LEDGER_DT_FORMAT = "%Y-%m-%d %H"
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ready = False
+
+_metadata = MetaData(schema="EMPMILL12")
+
+prod_entry_table = Table(
+    "spreader_prod_entry", _metadata,
+    Column("spreader_prod_entry_id", Integer, primary_key=True),
+    Column("entry_date", Date),
+    Column("entry_time", Integer),
+    Column("entry_dt", DateTime),
+    Index("idx_spe_entry_dt", "entry_dt"),
+)
+
+roll_issue_table = Table(
+    "spreader_roll_issue", _metadata,
+    Column("spreader_roll_issue_id", Integer, primary_key=True),
+    Column("issue_date", Date),
+    Column("issue_time", Integer),
+    Column("issue_dt", DateTime),
+    Index("idx_sri_issue_dt", "issue_dt"),
+)
+
+# (table, date column, hour column, stored datetime column)
+_LEDGERS = [
+    (prod_entry_table, "entry_date", "entry_time", "entry_dt"),
+    (roll_issue_table, "issue_date", "issue_time", "issue_dt"),
+]
+
+
+def ledger_dt(day, hour) -> datetime.datetime:
+    """The stored timestamp for a ledger row: its date at the given hour."""
+    return datetime.datetime.combine(day, datetime.time(hour=int(hour)))
+
+
+def parse_ledger_dt(value) -> datetime.datetime:
+    """Accept a datetime or a '%Y-%m-%d %H' string, as the pages pass them."""
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.strptime(str(value), LEDGER_DT_FORMAT)
+
+
+def generated_sql(date_col: str, hour_col: str) -> str:
+    """MySQL expression of a stored timestamp column (as in the CREATE TABLE of the ledger)."""
+    return f"DATE_ADD({date_col}, INTERVAL {hour_col} HOUR)"
+
+
+def migrate(conn) -> None:
+    """
+    Make ``entry_dt`` / ``issue_dt`` STORED generated columns (adding them, or
+    converting the plain columns an earlier version filled from the insert
+    helpers) and create their indexes. Other databases, such as the benchmark
+    stand-in, must already have the columns.
+    """
+    inspector = inspect(conn)
+    for table, date_col, hour_col, dt_col in _LEDGERS:
+        columns = {c["name"].lower(): c for c in inspector.get_columns(table.name, schema=table.schema)}
+        existing = columns.get(dt_col)
+        if existing is None or not existing.get("computed"):
+            if conn.dialect.name != "mysql":
+                if existing is None:
+                    raise RuntimeError(f"{table.schema}.{table.name} has no {dt_col} column")
+            else:
+                action = "ADD COLUMN" if existing is None else "MODIFY COLUMN"
+                conn.execute(text(
+                    f"ALTER TABLE {table.schema}.{table.name} {action} {dt_col} DATETIME "
+                    f"AS ({generated_sql(date_col, hour_col)}) STORED"
+                ))
+                log.info("%s.%s.%s is now a stored generated column", table.schema, table.name, dt_col)
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def ensure_ledger_timestamps() -> None:
+    """Run ``migrate`` once per process, before the first query that needs the columns."""
+    global _ready
+    if _ready:
+        return
+    with _lock:
+        if _ready:
+            return
+        try:
+            with get_engine().begin() as conn:
+                migrate(conn)
+        except Exception:
+            log.exception("spreader ledger timestamp migration failed")
+            raise
+        _ready = True
+
+
+def main(argv=None) -> int:
+    argparse.ArgumentParser(description="Add the stored entry_dt / issue_dt columns to the spreader ledger.").parse_args(argv)
+    ensure_ledger_timestamps()
+    print("spreader ledger timestamps are in place")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
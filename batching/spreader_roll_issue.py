@@ -1,7 +1,10 @@
 import datetime
 from typing import Optional
 from sqlalchemy import text
-from db import engine
+from db import get_engine
+from .spreader_ledger import ledger_dt
+from .spreader_balance import available_rolls, ensure_balance, refresh_group
+from .spreader_checkpoint import ensure_checkpoint_tables, invalidate_from
 
 def insert_spreader_roll_issue(
     breaker_inter_no: str,
@@ -22,7 +25,9 @@ def insert_spreader_roll_issue(
     find_sql = text("""
         SELECT bin_no FROM EMPMILL12.spreader_prod_entry WHERE entry_id_grp = :entry_id_grp ORDER BY entry_date DESC, entry_time DESC LIMIT 1
     """)
-    with engine.begin() as conn:
+    ensure_balance()
+    ensure_checkpoint_tables()
+    with get_engine().begin() as conn:
         row = conn.execute(find_sql, {"entry_id_grp": entry_id_grp}).fetchone()
         if not row:
             return None
@@ -31,29 +36,20 @@ def insert_spreader_roll_issue(
         # Validation 1: Issue datetime must be >= group's first production datetime
         first_dt_sql = text(
             """
-            SELECT 
-                MIN(CONCAT(entry_date, ' ', LPAD(entry_time, 2, '0'), ':00:00')) AS first_dt
+            SELECT MIN(entry_dt) AS first_dt
             FROM EMPMILL12.spreader_prod_entry
             WHERE entry_id_grp = :entry_id_grp
             """
         )
         first_dt_row = conn.execute(first_dt_sql, {"entry_id_grp": entry_id_grp}).fetchone()
+        issue_dt = ledger_dt(issue_date, issue_time)
         if first_dt_row and first_dt_row[0]:
-            from datetime import datetime as _dt
-            first_dt = _dt.strptime(str(first_dt_row[0]), "%Y-%m-%d %H:%M:%S")
-            issue_dt = _dt.combine(issue_date, _dt.min.time()).replace(hour=int(issue_time))
+            first_dt = datetime.datetime.fromisoformat(str(first_dt_row[0]))
             if issue_dt < first_dt:
                 raise ValueError("Issue date/time must be after the production start of this group.")
 
         # Validation 2: Quantity must not exceed current stock for the selected weight
-        stock_sql = text(
-            """
-            SELECT 
-                (COALESCE((SELECT SUM(p.no_of_rolls) FROM EMPMILL12.spreader_prod_entry p WHERE p.entry_id_grp = :entry_id_grp AND p.wt_per_roll = :wt_per_roll), 0) -
-                 COALESCE((SELECT SUM(i.no_of_rolls) FROM EMPMILL12.spreader_roll_issue i WHERE i.entry_id_grp = :entry_id_grp AND i.wt_per_roll = :wt_per_roll), 0)) AS current_stock
-            """
-        )
-        current_stock = conn.execute(stock_sql, {"entry_id_grp": entry_id_grp, "wt_per_roll": float(wt_per_roll)}).scalar() or 0
+        current_stock = available_rolls(conn, entry_id_grp, wt_per_roll)
         if int(no_of_rolls) > int(current_stock):
             raise ValueError(f"Cannot issue more than current stock for {wt_per_roll} kg rolls ({int(current_stock)} rolls available).")
         sql = text("""
@@ -72,10 +68,13 @@ def insert_spreader_roll_issue(
         }
         result = conn.execute(sql, params)
         try:
-            return result.lastrowid
+            rid = result.lastrowid
         except Exception:
             rid = conn.execute(text("SELECT LAST_INSERT_ID()")).scalar()
-            return int(rid) if rid is not None else None
+            rid = int(rid) if rid is not None else None
+        refresh_group(conn, entry_id_grp)
+        invalidate_from(conn, issue_dt)
+        return rid
 
 
 def delete_spreader_roll_issue(issue_id: int) -> bool:
@@ -91,13 +90,21 @@ def delete_spreader_roll_issue(issue_id: int) -> bool:
         "id"
     ]
     deleted = False
-    with engine.begin() as conn:
+    ensure_balance()
+    ensure_checkpoint_tables()
+    with get_engine().begin() as conn:
         for pk in pk_variants:
             try:
+                row_sql = text(f"SELECT entry_id_grp, issue_dt FROM EMPMILL12.spreader_roll_issue WHERE {pk} = :iid")
+                row = conn.execute(row_sql, {"iid": int(issue_id)}).fetchone()
                 sql = text(f"DELETE FROM EMPMILL12.spreader_roll_issue WHERE {pk} = :iid LIMIT 1")
                 res = conn.execute(sql, {"iid": int(issue_id)})
                 if res.rowcount > 0:
                     deleted = True
+                    if row is not None and row[0] is not None:
+                        refresh_group(conn, row[0])
+                    if row is not None and row[1] is not None:
+                        invalidate_from(conn, row[1])
                     break
             except Exception:
                 continue
@@ -2,7 +2,7 @@ import datetime
 from dataclasses import dataclass
 from typing import Optional
 from sqlalchemy import text
-from db import engine
+from db import get_engine
 
 @dataclass
 class WindowResult:
@@ -13,6 +13,118 @@ class WindowResult:
     reason: str = ""
 
 
+@dataclass
+class GroupFacts:
+    """Everything the entry rules need about a group, read in one round trip."""
+    entry_id_grp: Optional[int]
+    max_grp: int
+    quality_id: Optional[int] = None
+    earliest_dt: Optional[datetime.datetime] = None
+    same_day_min_hour: Optional[int] = None
+    prev_day_min_hour: Optional[int] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.earliest_dt is not None
+
+
+# The group is either given or, for a bin, its latest group still holding stock.
+_GROUP_FACTS_SQL = text("""
+    WITH grp AS (
+        SELECT COALESCE(:entry_id_grp, (
+            SELECT MAX(entry_id_grp) FROM (
+                SELECT entry_id_grp
+                FROM EMPMILL12.spreader_roll_balance
+                WHERE bin_no = :bin_no
+                GROUP BY entry_id_grp
+                HAVING SUM(balance_rolls) > 0
+            ) o
+        )) AS g
+    )
+    SELECT
+        grp.g AS entry_id_grp,
+        (SELECT COALESCE(MAX(entry_id_grp), 0) FROM EMPMILL12.spreader_prod_entry) AS max_grp,
+        (SELECT p.jute_quality_id FROM EMPMILL12.spreader_prod_entry p
+          WHERE p.entry_id_grp = grp.g ORDER BY p.entry_date, p.entry_time LIMIT 1) AS quality_id,
+        (SELECT p.entry_date FROM EMPMILL12.spreader_prod_entry p
+          WHERE p.entry_id_grp = grp.g ORDER BY p.entry_date, p.entry_time LIMIT 1) AS earliest_date,
+        (SELECT p.entry_time FROM EMPMILL12.spreader_prod_entry p
+          WHERE p.entry_id_grp = grp.g ORDER BY p.entry_date, p.entry_time LIMIT 1) AS earliest_hour,
+        (SELECT MIN(p.entry_time) FROM EMPMILL12.spreader_prod_entry p
+          WHERE p.entry_id_grp = grp.g AND p.entry_date = :d) AS same_day_min_hour,
+        (SELECT MIN(p.entry_time) FROM EMPMILL12.spreader_prod_entry p
+          WHERE p.entry_id_grp = grp.g AND p.entry_date = :pd) AS prev_day_min_hour
+    FROM grp
+""")
+
+
+def fetch_group_facts(conn, candidate_date, entry_id_grp: Optional[int] = None, bin_no: Optional[int] = None) -> GroupFacts:
+    """
+    Read the facts for ``entry_id_grp`` or, when it is None, for the open group
+    of ``bin_no`` (the group stays None when the bin has no stock).
+    """
+    r = conn.execute(_GROUP_FACTS_SQL, {
+        "entry_id_grp": int(entry_id_grp) if entry_id_grp is not None else None,
+        "bin_no": int(bin_no) if bin_no is not None else None,
+        "d": candidate_date,
+        "pd": candidate_date - datetime.timedelta(days=1),
+    }).fetchone()
+    facts = GroupFacts(entry_id_grp=int(r[0]) if r[0] is not None else None, max_grp=int(r[1] or 0))
+    if r[3] is not None:
+        # Scalar subqueries lose the column type on some drivers
+        earliest_date = datetime.date.fromisoformat(str(r[3])[:10])
+        facts.quality_id = int(r[2])
+        facts.earliest_dt = datetime.datetime.combine(earliest_date, datetime.time(hour=int(r[4])))
+        facts.same_day_min_hour = int(r[5]) if r[5] is not None else None
+        facts.prev_day_min_hour = int(r[6]) if r[6] is not None else None
+    return facts
+
+
+def window_from_facts(facts: GroupFacts, candidate_date, candidate_hour: int) -> Optional[WindowResult]:
+    """Apply the 4-hour window rules (see evaluate_4hr_window) to facts already read."""
+    if not facts.exists:
+        return None
+    candidate_dt = datetime.datetime.combine(candidate_date, datetime.time(hour=int(candidate_hour)))
+    # Earliest group entry overall (for anti-backdate safeguard)
+    earliest_dt = facts.earliest_dt
+    if candidate_dt < earliest_dt:
+        return WindowResult(
+            allowed=False,
+            base_dt=earliest_dt,
+            allowed_end_dt=earliest_dt + datetime.timedelta(hours=4),
+            candidate_dt=candidate_dt,
+            reason=(
+                f"Backdated not allowed. Earliest group entry {earliest_dt:%Y-%m-%d %H}:00; "
+                f"candidate {candidate_dt:%Y-%m-%d %H}:00 precedes it."
+            )
+        )
+    base_dt = None
+    allowed_end_dt = None
+    # Same-day earliest
+    if facts.same_day_min_hour is not None:
+        base_dt = datetime.datetime.combine(candidate_date, datetime.time(hour=facts.same_day_min_hour))
+        allowed_end_dt = base_dt + datetime.timedelta(hours=4)
+    else:
+        # Previous day cross-midnight check
+        if facts.prev_day_min_hour is not None:
+            prev_date = candidate_date - datetime.timedelta(days=1)
+            prev_first_dt = datetime.datetime.combine(prev_date, datetime.time(hour=facts.prev_day_min_hour))
+            prev_window_end = prev_first_dt + datetime.timedelta(hours=4)
+            if prev_window_end.date() == candidate_date:  # crosses midnight
+                base_dt = prev_first_dt
+                allowed_end_dt = prev_window_end
+        if base_dt is None:
+            # Start new window at candidate
+            base_dt = candidate_dt
+            allowed_end_dt = candidate_dt + datetime.timedelta(hours=4)
+    allowed = candidate_dt <= allowed_end_dt
+    reason = ""
+    if not allowed:
+        reason = (f"Window closed. Base {base_dt:%Y-%m-%d %H}:00 → allowed until {allowed_end_dt:%Y-%m-%d %H}:00; "
+                  f"candidate {candidate_dt:%Y-%m-%d %H}:00 outside 4-hour window.")
+    return WindowResult(allowed=allowed, base_dt=base_dt, allowed_end_dt=allowed_end_dt, candidate_dt=candidate_dt, reason=reason)
+
+
 def evaluate_4hr_window(entry_id_grp: int, candidate_date, candidate_hour: int) -> Optional[WindowResult]:
     """
     Determine if a candidate entry (date + hour) is within the 4-hour allowable window
@@ -22,67 +134,6 @@ def evaluate_4hr_window(entry_id_grp: int, candidate_date, candidate_hour: int)
       3. Else candidate becomes first entry for a new daily window.
     Returns WindowResult or None if group not found.
     """
-    candidate_dt = datetime.datetime.combine(candidate_date, datetime.time(hour=int(candidate_hour)))
-    with engine.connect() as conn:
-        # Ensure group exists
-        grp_exists = conn.execute(text("SELECT 1 FROM EMPMILL12.spreader_prod_entry WHERE entry_id_grp = :g LIMIT 1"), {"g": entry_id_grp}).fetchone()
-        if not grp_exists:
-            return None
-        # Earliest group entry overall (for anti-backdate safeguard)
-        earliest_row = conn.execute(text("""
-            SELECT entry_date, entry_time
-            FROM EMPMILL12.spreader_prod_entry
-            WHERE entry_id_grp = :g
-            ORDER BY entry_date ASC, entry_time ASC
-            LIMIT 1
-        """), {"g": entry_id_grp}).fetchone()
-        if earliest_row:
-            earliest_dt = datetime.datetime.combine(earliest_row[0], datetime.time(hour=int(earliest_row[1])))
-            if candidate_dt < earliest_dt:
-                return WindowResult(
-                    allowed=False,
-                    base_dt=earliest_dt,
-                    allowed_end_dt=earliest_dt + datetime.timedelta(hours=4),
-                    candidate_dt=candidate_dt,
-                    reason=(
-                        f"Backdated not allowed. Earliest group entry {earliest_dt:%Y-%m-%d %H}:00; "
-                        f"candidate {candidate_dt:%Y-%m-%d %H}:00 precedes it."
-                    )
-                )
-        # Same-day earliest
-        same_day = conn.execute(text("""
-            SELECT MIN(entry_time) AS min_hour
-            FROM EMPMILL12.spreader_prod_entry
-            WHERE entry_id_grp = :g AND entry_date = :d
-        """), {"g": entry_id_grp, "d": candidate_date}).fetchone()
-        base_dt = None
-        allowed_end_dt = None
-        if same_day and same_day[0] is not None:
-            base_hour = int(same_day[0])
-            base_dt = datetime.datetime.combine(candidate_date, datetime.time(hour=base_hour))
-            allowed_end_dt = base_dt + datetime.timedelta(hours=4)
-        else:
-            # Previous day cross-midnight check
-            prev_date = candidate_date - datetime.timedelta(days=1)
-            prev_row = conn.execute(text("""
-                SELECT MIN(entry_time) AS min_hour
-                FROM EMPMILL12.spreader_prod_entry
-                WHERE entry_id_grp = :g AND entry_date = :pd
-            """), {"g": entry_id_grp, "pd": prev_date}).fetchone()
-            if prev_row and prev_row[0] is not None:
-                prev_first_hour = int(prev_row[0])
-                prev_first_dt = datetime.datetime.combine(prev_date, datetime.time(hour=prev_first_hour))
-                prev_window_end = prev_first_dt + datetime.timedelta(hours=4)
-                if prev_window_end.date() == candidate_date:  # crosses midnight
-                    base_dt = prev_first_dt
-                    allowed_end_dt = prev_window_end
-            if base_dt is None:
-                # Start new window at candidate
-                base_dt = candidate_dt
-                allowed_end_dt = candidate_dt + datetime.timedelta(hours=4)
-        allowed = candidate_dt <= allowed_end_dt
-        reason = ""
-        if not allowed:
-            reason = (f"Window closed. Base {base_dt:%Y-%m-%d %H}:00 → allowed until {allowed_end_dt:%Y-%m-%d %H}:00; "
-                      f"candidate {candidate_dt:%Y-%m-%d %H}:00 outside 4-hour window.")
-        return WindowResult(allowed=allowed, base_dt=base_dt, allowed_end_dt=allowed_end_dt, candidate_dt=candidate_dt, reason=reason)
+    with get_engine().connect() as conn:
+        facts = fetch_group_facts(conn, candidate_date, entry_id_grp=entry_id_grp)
+    return window_from_facts(facts, candidate_date, candidate_hour)
@@ -2,14 +2,21 @@ from sqlalchemy import update
 from sqlalchemy import text
 import pandas as pd
 import datetime
-from typing import Optional
-from db import engine
-from .spreader_rules import evaluate_4hr_window
+from typing import Dict, List, Optional, Tuple
+from db import get_engine
+from .spreader_rules import GroupFacts, fetch_group_facts, window_from_facts
+from .spreader_ledger import generated_sql, ledger_dt
+from .spreader_balance import ensure_balance, refresh_group
+from .spreader_checkpoint import ensure_checkpoint_tables, invalidate_from
+from .maturity import elapsed_hours, entry_timestamps
+
+_table_ready = False
 
 def update_issue_for_bin(bin_no: int, issue_date, issue_time, issue_spell, issue_rolls):
     """
     Update issue columns for the latest entry in a bin (no id column, so use entry_date, entry_time, bin_no, jute_quality_id).
     """
+    ensure_spreader_table()
     # Find latest row for bin by max(entry_date, entry_time)
     find_sql = text("""
         SELECT entry_date, entry_time, bin_no, jute_quality_id
@@ -25,7 +32,7 @@ def update_issue_for_bin(bin_no: int, issue_date, issue_time, issue_spell, issue
             issue_rolls = :issue_rolls
         WHERE bin_no = :bin_no AND entry_date = :entry_date AND entry_time = :entry_time AND jute_quality_id = :jute_quality_id
     """)
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         result = conn.execute(find_sql, {"bin_no": bin_no})
         row = result.fetchone()
         if row:
@@ -44,50 +51,35 @@ def fetch_bins_with_stock():
     """
     Fetch bins with current stock and maturity info.
     """
-    # Join production and issue tables, aggregate rolls and issued rolls by bin and entry_id_grp
-    # Join on entry_id_grp only if both tables have it, otherwise join on spreader_prod_entry_id
+    # Read from the running balance (one row per group/bin/weight) rather than
+    # aggregating the whole production and issue history.
+    ensure_spreader_table()
+    ensure_balance()
     sql = text(
         """
         SELECT
-            p.bin_no,
-            p.entry_id_grp,
-            p.jute_quality_id,
-            p.no_of_rolls,
-            p.produced_weight_kg,
-            p.entry_date,
-            p.entry_time,
-            p.avg_entry_ts,
-            COALESCE(i.issued_rolls, 0) AS issued_rolls,
-            COALESCE(i.issued_weight_kg, 0) AS issued_weight_kg,
-            (p.produced_weight_kg - COALESCE(i.issued_weight_kg, 0)) AS current_weight_kg,
-            (p.produced_weight_kg - COALESCE(i.issued_weight_kg, 0)) / 1000.0 AS current_weight_mt
-        FROM (
-            SELECT
-                bin_no,
-                entry_id_grp,
-                jute_quality_id,
-                SUM(no_of_rolls) AS no_of_rolls,
-                SUM(no_of_rolls * IFNULL(wt_per_roll, 0)) AS produced_weight_kg,
-                MAX(entry_date) AS entry_date,
-                MAX(entry_time) AS entry_time,
-                AVG(UNIX_TIMESTAMP(CONCAT(entry_date, ' ', LPAD(entry_time, 2, '0'), ':00:00'))) AS avg_entry_ts
-            FROM EMPMILL12.spreader_prod_entry
-            GROUP BY bin_no, entry_id_grp, jute_quality_id
-        ) p
-        LEFT JOIN (
-            SELECT 
-                entry_id_grp, 
-                SUM(no_of_rolls) AS issued_rolls,
-                SUM(no_of_rolls * IFNULL(wt_per_roll, 0)) AS issued_weight_kg
-            FROM EMPMILL12.spreader_roll_issue
-            GROUP BY entry_id_grp
-        ) i
-        ON p.entry_id_grp = i.entry_id_grp
-        WHERE (p.no_of_rolls - COALESCE(i.issued_rolls, 0)) > 0
-        ORDER BY p.bin_no, p.entry_id_grp
+            b.bin_no,
+            b.entry_id_grp,
+            b.jute_quality_id,
+            SUM(b.produced_rolls) AS no_of_rolls,
+            SUM(b.produced_rolls * b.wt_per_roll) AS produced_weight_kg,
+            MAX(b.max_entry_date) AS entry_date,
+            MAX(b.max_entry_time) AS entry_time,
+            SUM(b.entry_ts_sum) / NULLIF(SUM(b.entry_rows), 0) AS avg_entry_ts,
+            SUM(b.issued_rolls) AS issued_rolls,
+            SUM(b.issued_rolls * b.wt_per_roll) AS issued_weight_kg,
+            SUM(b.balance_rolls * b.wt_per_roll) AS current_weight_kg,
+            SUM(b.balance_rolls * b.wt_per_roll) / 1000.0 AS current_weight_mt
+        FROM EMPMILL12.spreader_roll_balance b
+        WHERE b.entry_id_grp IN (
+            SELECT entry_id_grp FROM EMPMILL12.spreader_roll_balance WHERE balance_rolls > 0
+        )
+        GROUP BY b.bin_no, b.entry_id_grp, b.jute_quality_id
+        HAVING SUM(b.balance_rolls) > 0
+        ORDER BY b.bin_no, b.entry_id_grp
         """
     )
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         df = pd.read_sql(sql, conn)
     return df
 
@@ -97,35 +89,23 @@ def fetch_available_weights_for_group(entry_id_grp: int) -> "pd.DataFrame":
     Columns: wt_per_roll, produced_rolls, issued_rolls, available_rolls
     Only includes weights with available_rolls > 0.
     """
-    # Previous implementation caused inflated produced_rolls when multiple issue rows existed
-    # because of join multiplication (production rows x issue rows).
-    # Fix: aggregate production and issue separately then join.
+    ensure_spreader_table()
+    ensure_balance()
     sql = text(
         """
-        WITH prod AS (
-            SELECT wt_per_roll, SUM(no_of_rolls) AS produced_rolls
-            FROM EMPMILL12.spreader_prod_entry
-            WHERE entry_id_grp = :entry_id_grp
-            GROUP BY wt_per_roll
-        ),
-        issu AS (
-            SELECT wt_per_roll, SUM(no_of_rolls) AS issued_rolls
-            FROM EMPMILL12.spreader_roll_issue
-            WHERE entry_id_grp = :entry_id_grp
-            GROUP BY wt_per_roll
-        )
-        SELECT 
-            p.wt_per_roll,
-            p.produced_rolls,
-            COALESCE(i.issued_rolls, 0) AS issued_rolls,
-            (p.produced_rolls - COALESCE(i.issued_rolls,0)) AS available_rolls
-        FROM prod p
-        LEFT JOIN issu i ON i.wt_per_roll = p.wt_per_roll
-        WHERE (p.produced_rolls - COALESCE(i.issued_rolls,0)) > 0
-        ORDER BY p.wt_per_roll
+        SELECT
+            wt_per_roll,
+            SUM(produced_rolls) AS produced_rolls,
+            SUM(issued_rolls) AS issued_rolls,
+            SUM(balance_rolls) AS available_rolls
+        FROM EMPMILL12.spreader_roll_balance
+        WHERE entry_id_grp = :entry_id_grp
+        GROUP BY wt_per_roll
+        HAVING SUM(balance_rolls) > 0
+        ORDER BY wt_per_roll
         """
     )
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         df = pd.read_sql(sql, conn, params={"entry_id_grp": int(entry_id_grp)})
     return df
 """Spreader production entry data access helpers.
@@ -138,7 +118,10 @@ function returns False.
 
 
 def ensure_spreader_table() -> None:
-    """Create the EMPMILL12.spreader_prod_entry table if it doesn't exist."""
+    """Create the EMPMILL12.spreader_prod_entry table if it doesn't exist (once per process, on first use)."""
+    global _table_ready
+    if _table_ready:
+        return
     ddl = text(
         """
         CREATE TABLE IF NOT EXISTS EMPMILL12.spreader_prod_entry (
@@ -150,20 +133,61 @@ def ensure_spreader_table() -> None:
             no_of_rolls INT NOT NULL,
             entry_time INT NOT NULL,
             bin_no INT NOT NULL,
+            entry_dt DATETIME AS ({entry_dt}) STORED,
             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
             PRIMARY KEY (id),
             KEY idx_entry_date (entry_date),
+            KEY idx_spe_entry_dt (entry_dt),
             KEY idx_spell (spell),
             KEY idx_spreader_no (spreader_no)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """
+        """.format(entry_dt=generated_sql("entry_date", "entry_time"))
     )
     try:
-        with engine.begin() as conn:
+        with get_engine().begin() as conn:
             conn.execute(ddl)
     except Exception:
         # If we cannot create (permissions), ignore; page will still error with clear message.
         pass
+    _table_ready = True
+
+
+_insert_prod_sql = text(
+    """
+    INSERT INTO EMPMILL12.spreader_prod_entry
+    (entry_date, spell, spreader_no, jute_quality_id, no_of_rolls, entry_time, bin_no, entry_id_grp, trolley_no, wt_per_roll)
+    VALUES (:entry_date, :spell, :spreader_no, :jute_quality_id, :no_of_rolls, :entry_time, :bin_no, :entry_id_grp, :trolley_no, :wt_per_roll)
+    """
+)
+
+
+def check_entry_against_group(facts: GroupFacts, jute_quality_id: int, entry_date: datetime.date, entry_time: int) -> int:
+    """
+    Apply the group rules to a candidate entry and return the entry_id_grp it
+    goes into: the bin's open group (quality frozen, 4-hour window from its
+    first entry) or a new group after the highest one. Raises ValueError when
+    the entry is not allowed.
+    """
+    if facts.entry_id_grp is None:
+        # No group with stock, assign max+1 (across all bins) or 1 if none
+        return facts.max_grp + 1 if facts.max_grp else 1
+    if facts.exists:
+        if int(jute_quality_id) != facts.quality_id:
+            raise ValueError("Jute quality is locked for this group and cannot be changed.")
+        candidate_dt = datetime.datetime.combine(entry_date, datetime.time(hour=int(entry_time)))
+        if candidate_dt < facts.earliest_dt:
+            raise ValueError(
+                f"Backdated not allowed. Earliest group entry {facts.earliest_dt:%Y-%m-%d %H}:00; candidate {candidate_dt:%Y-%m-%d %H}:00."
+            )
+    win = window_from_facts(facts, entry_date, int(entry_time))
+    if win is None:
+        raise ValueError("Group not found for validation.")
+    # Prevent back-dated earlier hour for same day relative to base when base is same day and candidate earlier.
+    if win.base_dt.date() == entry_date and win.candidate_dt < win.base_dt:
+        raise ValueError("Cannot insert earlier than the first entry hour for the day in this group.")
+    if not win.allowed:
+        raise ValueError(win.reason)
+    return facts.entry_id_grp
 
 
 def insert_spreader_prod_entry(
@@ -180,79 +204,10 @@ def insert_spreader_prod_entry(
     """
     Insert one row into EMPMILL12.spreader_prod_entry. Returns inserted id or None.
     """
-    # Use the current stock query to determine entry_id_grp
-    # Get max entry_id_grp across all bins
-    max_grp_sql = text("SELECT COALESCE(MAX(entry_id_grp), 0) FROM EMPMILL12.spreader_prod_entry")
-    stock_sql = text("""
-        SELECT entry_id_grp, SUM(no_of_rolls) AS total_rolls, COALESCE(SUM(issued_rolls),0) AS total_issued
-        FROM (
-            SELECT p.entry_id_grp, p.no_of_rolls, COALESCE(SUM(i.no_of_rolls),0) AS issued_rolls
-            FROM EMPMILL12.spreader_prod_entry p
-            LEFT JOIN EMPMILL12.spreader_roll_issue i
-                ON p.entry_id_grp = i.entry_id_grp
-            WHERE p.bin_no = :bin_no
-            GROUP BY p.entry_id_grp, p.no_of_rolls
-        ) t
-        GROUP BY entry_id_grp
-        ORDER BY entry_id_grp DESC
-    """)
-    with engine.begin() as conn:
-        # Get max entry_id_grp across all bins
-        max_grp = conn.execute(max_grp_sql).scalar() or 0
-        result = conn.execute(stock_sql, {"bin_no": bin_no})
-        stock_rows = result.fetchall()
-        # Find the latest group with stock > 0
-        entry_id_grp = None
-        reused_existing_group = False
-        for row in stock_rows:
-            grp, total_rolls, total_issued = row
-            if (total_rolls - total_issued) > 0:
-                entry_id_grp = grp
-                reused_existing_group = True
-                break
-        if entry_id_grp is None:
-            # No group with stock, assign max+1 (across all bins) or 1 if none
-            entry_id_grp = max_grp + 1 if max_grp else 1
-            reused_existing_group = False
-
-        # If reusing an existing group for this bin, enforce quality freeze and 4-hour cutoff from first entry
-        if reused_existing_group:
-            # Quality freeze & window handled using shared utility
-            first_row_sql = text(
-                """
-                SELECT jute_quality_id, entry_date, entry_time
-                FROM EMPMILL12.spreader_prod_entry
-                WHERE bin_no = :bin_no AND entry_id_grp = :entry_id_grp
-                ORDER BY entry_date ASC, entry_time ASC
-                LIMIT 1
-                """
-            )
-            r = conn.execute(first_row_sql, {"bin_no": bin_no, "entry_id_grp": entry_id_grp}).fetchone()
-            if r:
-                grp_quality_id, earliest_date, earliest_time = int(r[0]), r[1], int(r[2])
-                if int(jute_quality_id) != grp_quality_id:
-                    raise ValueError("Jute quality is locked for this group and cannot be changed.")
-                earliest_dt = datetime.datetime.combine(earliest_date, datetime.time(hour=earliest_time))
-                candidate_dt = datetime.datetime.combine(entry_date, datetime.time(hour=int(entry_time)))
-                if candidate_dt < earliest_dt:
-                    raise ValueError(
-                        f"Backdated not allowed. Earliest group entry {earliest_dt:%Y-%m-%d %H}:00; candidate {candidate_dt:%Y-%m-%d %H}:00."
-                    )
-            win = evaluate_4hr_window(entry_id_grp, entry_date, int(entry_time))
-            if win is None:
-                raise ValueError("Group not found for validation.")
-            # Prevent back-dated earlier hour for same day relative to base when base is same day and candidate earlier.
-            if win.base_dt.date() == entry_date and win.candidate_dt < win.base_dt:
-                raise ValueError("Cannot insert earlier than the first entry hour for the day in this group.")
-            if not win.allowed:
-                raise ValueError(win.reason)
-    sql = text(
-        """
-        INSERT INTO EMPMILL12.spreader_prod_entry
-        (entry_date, spell, spreader_no, jute_quality_id, no_of_rolls, entry_time, bin_no, entry_id_grp, trolley_no, wt_per_roll)
-        VALUES (:entry_date, :spell, :spreader_no, :jute_quality_id, :no_of_rolls, :entry_time, :bin_no, :entry_id_grp, :trolley_no, :wt_per_roll)
-        """
-    )
+    ensure_spreader_table()
+    ensure_balance()
+    ensure_checkpoint_tables()
+    sql = _insert_prod_sql
     params = {
         "entry_date": entry_date,
         "spell": spell,
@@ -261,17 +216,117 @@ def insert_spreader_prod_entry(
         "no_of_rolls": int(no_of_rolls),
         "entry_time": int(entry_time),
         "bin_no": int(bin_no),
-        "entry_id_grp": int(entry_id_grp),
+        "entry_id_grp": None,
         "trolley_no": int(trolley_no),
         "wt_per_roll": float(wt_per_roll),
     }
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
+        # Everything the group rules need comes back in one round trip
+        facts = fetch_group_facts(conn, entry_date, bin_no=bin_no)
+        entry_id_grp = check_entry_against_group(facts, jute_quality_id, entry_date, entry_time)
+        params["entry_id_grp"] = entry_id_grp
         result = conn.execute(sql, params)
         try:
-            return result.lastrowid  # MySQL should return lastrowid
+            rid = result.lastrowid  # MySQL should return lastrowid
         except Exception:
             rid = conn.execute(text("SELECT LAST_INSERT_ID()")).scalar()
-            return int(rid) if rid is not None else None
+            rid = int(rid) if rid is not None else None
+        refresh_group(conn, entry_id_grp)
+        invalidate_from(conn, ledger_dt(entry_date, entry_time))
+        return rid
+
+
+def insert_spreader_prod_entries(entry_date: datetime.date, rows: List[Dict]) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Validate and insert several production rows for one entry date in one
+    transaction. Each row is a dict with the keyword arguments of
+    insert_spreader_prod_entry except entry_date.
+
+    Rows are checked against the same group rules as a single entry, in hour
+    order per bin, with each accepted row counting towards the window and
+    quality lock of the rows after it. Nothing is written unless every row
+    passes. Returns (rows inserted, [(row position, error), ...]).
+    """
+    ensure_spreader_table()
+    ensure_balance()
+    ensure_checkpoint_tables()
+    errors: List[Tuple[int, str]] = []
+    params_list: List[Dict] = []
+    with get_engine().begin() as conn:
+        facts_by_bin: Dict[int, GroupFacts] = {}
+        for pos, row in enumerate(rows):
+            try:
+                bin_no = int(row["bin_no"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if bin_no not in facts_by_bin:
+                facts_by_bin[bin_no] = fetch_group_facts(conn, entry_date, bin_no=bin_no)
+        next_grp = max((f.max_grp for f in facts_by_bin.values()), default=0) + 1
+
+        def _order(item):
+            row = item[1]
+            try:
+                return (0, int(row["bin_no"]), int(row["entry_time"]))
+            except (KeyError, TypeError, ValueError):
+                return (1, 0, 0)
+
+        for pos, row in sorted(enumerate(rows), key=_order):
+            try:
+                bin_no = int(row["bin_no"])
+                entry_time = int(row["entry_time"])
+                jute_quality_id = int(row["jute_quality_id"] or 0)
+                no_of_rolls = int(row["no_of_rolls"] or 0)
+                spreader_no = str(row["spreader_no"] or "").strip()
+            except (KeyError, TypeError, ValueError):
+                errors.append((pos, "Bin, hour, quality, spreader and rolls are required."))
+                continue
+            if not spreader_no:
+                errors.append((pos, "Spreader No must be selected."))
+                continue
+            if jute_quality_id <= 0:
+                errors.append((pos, "Jute Quality must be selected."))
+                continue
+            if no_of_rolls <= 0:
+                errors.append((pos, "No. of Rolls must be > 0."))
+                continue
+            facts = facts_by_bin[bin_no]
+            try:
+                entry_id_grp = check_entry_against_group(facts, jute_quality_id, entry_date, entry_time)
+            except ValueError as e:
+                errors.append((pos, str(e)))
+                continue
+            if facts.entry_id_grp is None:
+                # The first accepted row opens a new group the bin's later rows join
+                entry_id_grp = next_grp
+                next_grp += 1
+                facts_by_bin[bin_no] = GroupFacts(
+                    entry_id_grp=entry_id_grp,
+                    max_grp=entry_id_grp,
+                    quality_id=jute_quality_id,
+                    earliest_dt=ledger_dt(entry_date, entry_time),
+                    same_day_min_hour=entry_time,
+                )
+            elif facts.same_day_min_hour is None or entry_time < facts.same_day_min_hour:
+                facts.same_day_min_hour = entry_time
+            params_list.append({
+                "entry_date": entry_date,
+                "spell": row.get("spell"),
+                "spreader_no": spreader_no,
+                "jute_quality_id": jute_quality_id,
+                "no_of_rolls": no_of_rolls,
+                "entry_time": entry_time,
+                "bin_no": bin_no,
+                "entry_id_grp": entry_id_grp,
+                "trolley_no": int(row.get("trolley_no") or 0),
+                "wt_per_roll": float(row.get("wt_per_roll") or 0.0),
+            })
+        if errors or not params_list:
+            return 0, sorted(errors)
+        conn.execute(_insert_prod_sql, params_list)
+        for entry_id_grp in sorted({p["entry_id_grp"] for p in params_list}):
+            refresh_group(conn, entry_id_grp)
+        invalidate_from(conn, min(ledger_dt(p["entry_date"], p["entry_time"]) for p in params_list))
+    return len(params_list), []
 
 
 def delete_spreader_prod_entry(row_id: int) -> bool:
@@ -284,10 +339,20 @@ def delete_spreader_prod_entry(row_id: int) -> bool:
     reflect the change. In a stricter environment we'd first validate that
     no issues reference this row's group & weight produced after removal.
     """
+    ensure_spreader_table()
+    ensure_balance()
+    ensure_checkpoint_tables()
+    row_sql = text("SELECT entry_id_grp, entry_dt FROM EMPMILL12.spreader_prod_entry WHERE spreader_prod_entry_id = :rid")
     sql = text("DELETE FROM EMPMILL12.spreader_prod_entry WHERE spreader_prod_entry_id = :rid LIMIT 1")
     try:
-        with engine.begin() as conn:
+        with get_engine().begin() as conn:
+            row = conn.execute(row_sql, {"rid": int(row_id)}).fetchone()
             res = conn.execute(sql, {"rid": int(row_id)})
+            if res.rowcount > 0 and row is not None:
+                if row[0] is not None:
+                    refresh_group(conn, row[0])
+                if row[1] is not None:
+                    invalidate_from(conn, row[1])
             return res.rowcount > 0
     except Exception:
         return False
@@ -297,6 +362,7 @@ def fetch_recent_spreader_entries(limit: int = 25) -> pd.DataFrame:
     """
     Fetch recent entries for display, only bins with stock, and show maturity.
     """
+    ensure_spreader_table()
     sql = text(
         """
         SELECT
@@ -314,20 +380,13 @@ def fetch_recent_spreader_entries(limit: int = 25) -> pd.DataFrame:
         LIMIT :limit
         """
     )
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         df = pd.read_sql(sql, conn, params={"limit": int(limit)})
     # Add maturity column
     if not df.empty:
         now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
-        def calc_maturity(row):
-            entry_dt = datetime.datetime.combine(row['entry_date'], datetime.time(hour=row['entry_time']))
-            delta = now - entry_dt
-            return max(int(delta.total_seconds() // 3600), 0)
-        df['Maturity (hrs)'] = df.apply(calc_maturity, axis=1)
+        df['Maturity (hrs)'] = elapsed_hours(entry_timestamps(df['entry_date'], df['entry_time']), now, rounding="floor")
     return df
 
 
-# Ensure table exists on import so first page load works.
-ensure_spreader_table()
-
 
@@ -0,0 +1,372 @@
+"""
+Time every report query and the view post-processing on synthetic data.
+
+Builds a SQLite stand-in for the plant databases (see ``standin`` and
+``synthetic``), points ``db`` at it through ``DATABASE_URL`` and times:
+
+    query      each report query function, bypassing the result cache
+    transform  the pandas work the views do on those results
+    page       optionally, each Streamlit page run headless (--pages)
+
+Results go to benchmarks/results/last.json. The previous file is the
+baseline: cases whose median got more than --threshold slower (and by more
+than --min-ms) are listed as regressions.
+
+    python -m benchmarks.bench_queries --days 60 --frames 120 --looms 300 --workers 1500
+    python -m benchmarks.bench_queries --reuse --repeat 7
+    python -m benchmarks.bench_queries --pages --fail-on-regression
+"""
+import argparse
+import dataclasses
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import traceback
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from benchmarks import standin, synthetic
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_DIR = os.path.join(HERE, ".standin")
+DEFAULT_RESULTS = os.path.join(HERE, "results", "last.json")
+
+PAGES = [
+    "Doff_Details.py",
+    "spgframe-analysis.py",
+    "spgLowProducer.py",
+    "WdgLowProducer.py",
+    "S4LowProducer.py",
+    "S4FromDayToDay.py",
+    "HessianLowProducer.py",
+    "hands.py",
+    "Daily_Summary.py",
+]
+
+
+@dataclasses.dataclass
+class Case:
+    kind: str
+    name: str
+    fn: Callable
+    args: tuple = ()
+
+
+# --------------------------------------------------------------------------- #
+# Stand-in database                                                           #
+# --------------------------------------------------------------------------- #
+def prepare_database(scale: synthetic.Scale, db_dir: str, reuse: bool) -> None:
+    from overall import yarn, yarnsheet
+    yarnsheet.write_fixture(os.path.join(db_dir, "yarnsheet"), synthetic.yarn_sheet(scale))
+    manifest_path = os.path.join(db_dir, "manifest.json")
+    manifest = {"scale": dataclasses.asdict(scale), "built_on": datetime.date.today().isoformat()}
+    if reuse and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) == manifest:
+                print(f"reusing stand-in database in {db_dir}")
+                return
+    t0 = time.perf_counter()
+    tables = synthetic.generate(scale)
+    standin.load(db_dir, tables)
+    # Month snapshots of the old data would be served for the new one
+    shutil.rmtree(os.path.join(db_dir, "snapshots"), ignore_errors=True)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    rows = sum(len(df) for df in tables.values())
+    print(f"built stand-in database: {rows:,} rows in {len(tables)} tables ({time.perf_counter() - t0:.1f} s)")
+
+
+def connect(db_dir: str) -> None:
+    """Point the app's engine at the stand-in; must run before anything creates the engine."""
+    import db
+    if db.engine_created():
+        raise RuntimeError("the database engine was created before the stand-in URL was set")
+    os.environ["DATABASE_URL"] = standin.database_url(db_dir)
+    os.environ["MIS_YARN_SHEET_FIXTURE"] = os.path.join(db_dir, "yarnsheet")
+    os.environ["MIS_SNAPSHOT_DIR"] = os.path.join(db_dir, "snapshots")
+    db.get_database_url.cache_clear()
+    standin.install(db.get_engine(), db_dir)
+
+
+# --------------------------------------------------------------------------- #
+# Cases                                                                       #
+# --------------------------------------------------------------------------- #
+def _uncached(fn: Callable) -> Callable:
+    return getattr(fn, "__wrapped__", fn)
+
+
+def query_cases(scale: synthetic.Scale) -> List[Case]:
+    from overall import query as overall_q
+    from overall import rollup
+    from doff10 import query as doff_q
+    from doff10 import liveday
+    from spg import query as spg_q
+    from wdg import query as wdg_q
+    from WvgS4 import query as s4_q
+    from WvgHessian import query as hess_q
+    from hands import query as hands_q
+    from overall import yarn, yarnsheet
+    from batching import spreaderprodentry, rollestockbatchingquery, spreader_balance, spreader_checkpoint
+    import db
+
+    today = datetime.date.today()
+    day = today - datetime.timedelta(days=1)
+    month_start = max(day.replace(day=1), today - datetime.timedelta(days=scale.days - 1))
+    range_start = today - datetime.timedelta(days=min(scale.days - 1, 30))
+    week_start = day - datetime.timedelta(days=7)
+    frame_q_code = pd.read_sql("SELECT q_code FROM dofftable WHERE frameno = '1' LIMIT 1", db.get_engine())['q_code'].iloc[0]
+    # The rollup tables are created by a deploy step, not the pages
+    rollup.create_rollup_tables()
+    # Build the roll balance up front so the stock lookups time point reads only
+    spreader_balance.ensure_balance()
+    open_group = int(spreaderprodentry.fetch_bins_with_stock()['entry_id_grp'].iloc[0])
+
+    def load_yarn_sheet():
+        """Full load of the yarn sheet (from the fixture) into a fresh snapshot."""
+        yarnsheet.use_source(None)
+        return yarnsheet.sheet().data
+
+    def live_doffs(full):
+        """Today's doff rows: read whole, or only what changed since the last read."""
+        liveday.invalidate(full=full)
+        return liveday.rows(today)
+
+    def yarn_month_trend():
+        return yarn.heavy_light_trend(yarnsheet.rows(month_start, day), yarnsheet.std_params())
+
+    cases = [
+        ("overall.get_dofftable_data", overall_q.get_dofftable_data, (day,)),
+        ("overall.get_spg_fine_coarse", overall_q.get_spg_fine_coarse, (day,)),
+        ("overall.weaving_details", overall_q.weaving_details, (day,)),
+        ("overall.get_weaving_shiftwise", overall_q.get_weaving_shiftwise, (day,)),
+        ("overall.get_hands_details", overall_q.get_hands_details, (day,)),
+        ("overall.refresh_rollup", rollup.refresh_rollup, (month_start, day)),
+        ("overall.get_dofftable_sum_by_date", overall_q.get_dofftable_sum_by_date, (month_start, day)),
+        ("overall.get_spg_sid_mtd", overall_q.get_spg_sid_mtd, (day, month_start)),
+        ("overall.get_quality_winding_details", overall_q.get_quality_winding_details, (day, month_start)),
+        ("overall.get_weaving_total_mtd", overall_q.get_weaving_total_mtd, (day, month_start)),
+        ("overall.get_hands_mtd_details", overall_q.get_hands_mtd_details, (day, month_start)),
+        ("doff10.get_dofftable_data", doff_q.get_dofftable_data, (day,)),
+        ("doff10.get_dofftable_sum_by_date", doff_q.get_dofftable_sum_by_date, (range_start, day)),
+        ("doff10.get_dofftable_withname", doff_q.get_dofftable_withname, (day,)),
+        ("doff10.get_doff_details", doff_q.get_doff_details, (day,)),
+        ("doff10.get_dofftable_details", doff_q.get_dofftable_details, (week_start, day)),
+        ("doff10.get_dofftable_details.month", doff_q.get_dofftable_details, (range_start, day)),
+        ("doff10.get_dofftable_details_lastdoff", doff_q.get_dofftable_details_lastdoff, (day,)),
+        ("doff10.get_frame_quality_details", doff_q.get_frame_quality_details, (week_start, day, "1", frame_q_code)),
+        ("doff10.liveday.full", live_doffs, (True,)),
+        ("doff10.liveday.incremental", live_doffs, (False,)),
+        ("spg.spg_details_date", spg_q.spg_details_date, (day, range_start)),
+        ("wdg.wdg_details_date", wdg_q.wdg_details_date, (day, range_start)),
+        ("WvgS4.S4_day_details_eff_day", s4_q.S4_day_details_eff_day, (day,)),
+        ("WvgS4.S4_day_details_eff", s4_q.S4_day_details_eff, (day, range_start)),
+        ("WvgHessian.hess_day_details_eff_day", hess_q.hess_day_details_eff_day, (day,)),
+        ("WvgHessian.hess_day_details_eff", hess_q.hess_day_details_eff, (day, range_start)),
+        ("hands.get_daily_hand_comparison", hands_q.get_daily_hand_comparison, (range_start, day)),
+        ("overall.yarnsheet.load", load_yarn_sheet, ()),
+        ("overall.yarnsheet.quality_means", yarnsheet.quality_means, (day,)),
+        ("overall.yarn.heavy_light_trend", yarn_month_trend, ()),
+        ("batching.fetch_bins_with_stock", spreaderprodentry.fetch_bins_with_stock, ()),
+        ("batching.fetch_available_weights_for_group", spreaderprodentry.fetch_available_weights_for_group, (open_group,)),
+        ("batching.reconcile_balance", spreader_balance.reconcile, ()),
+        ("batching.fetch_recent_spreader_entries", spreaderprodentry.fetch_recent_spreader_entries, (200,)),
+        ("batching.get_roll_stock_time", rollestockbatchingquery.get_roll_stock_time,
+         ((day - datetime.timedelta(days=1)).strftime("%Y-%m-%d 06"), day.strftime("%Y-%m-%d 06"))),
+        ("batching.get_recent_jute_quality_ids_90d", rollestockbatchingquery.get_recent_jute_quality_ids_90d, ()),
+        ("batching.stock_window", spreader_checkpoint.stock_window,
+         (datetime.datetime.combine(day, datetime.time(6)), datetime.datetime.combine(today, datetime.time(6)))),
+    ]
+    return [Case("query", name, _uncached(fn), args) for name, fn, args in cases]
+
+
+def transform_cases(results: dict) -> List[Case]:
+    """The pandas post-processing of the views, fed with the query results."""
+    from doff10.framestats import shift_normalized_pivot, nonzero_mean, nonzero_min
+    from efficiency.compare import compare_with_shifts
+    from efficiency.summary import ebno_shift_summary, sort_blanks_last
+    from workers import attach_names
+    from payload import records_json
+    from hands import engine as hands_engine
+
+    def spgframe_pivot(df):
+        df = df.assign(quality=df['q_code'].astype(str) + '-' + df['quality_name'].astype(str))
+        pivot_df, date_cols = shift_normalized_pivot(df)
+        pivot_df['Average'] = nonzero_mean(pivot_df[date_cols], axis=1)
+        pivot_df['Min'] = nonzero_min(pivot_df[date_cols], axis=1)
+        return pivot_df
+
+    def busiest(df, col):
+        return df[df[col] == df[col].value_counts().idxmax()]
+
+    cases = []
+
+    def add(name, source, fn):
+        df = results.get(source)
+        if isinstance(df, pd.DataFrame) and not df.empty:
+            cases.append(Case("transform", name, fn, (df,)))
+
+    add("spgframe.shift_normalized_pivot", "doff10.get_dofftable_details", spgframe_pivot)
+    add("spg.ebno_shift_summary", "spg.spg_details_date",
+        lambda df: sort_blanks_last(ebno_shift_summary(df, 'ebno', 'doffdate', 'shift', 'eff', name_col='name')))
+    add("spg.compare_with_shifts", "spg.spg_details_date",
+        lambda df: compare_with_shifts(busiest(df, 'ebno'), df, 'doffdate', 'shift', 'frameno', 'eff', extra_cols=['name']))
+    add("wdg.ebno_shift_summary", "wdg.wdg_details_date",
+        lambda df: ebno_shift_summary(df, 'eb_no', 'tran_date', 'shift', 'eff', name_col='name'))
+    add("wdg.compare_with_shifts", "wdg.wdg_details_date",
+        lambda df: compare_with_shifts(busiest(df, 'eb_no'), df, 'tran_date', 'shift', 'mechine_name', 'eff', extra_cols=['name']))
+    add("WvgS4.ebno_shift_summary", "WvgS4.S4_day_details_eff",
+        lambda df: ebno_shift_summary(df, 'EBNO', 'Date', 'Shift', 'EFF', name_col='Name', looms_col='LOOM_NO'))
+    add("WvgHessian.ebno_shift_summary", "WvgHessian.hess_day_details_eff",
+        lambda df: ebno_shift_summary(df, 'EBNO', 'Date', 'Shift', 'EFF'))
+    add("WvgHessian.compare_with_shifts", "WvgHessian.hess_day_details_eff",
+        lambda df: compare_with_shifts(busiest(df, 'EBNO'), df, 'Date', 'Shift', 'LOOM_NO', 'EFF'))
+    add("workers.attach_names", "doff10.get_dofftable_details",
+        lambda df: attach_names(df, 'ebno', 'name'))
+    add("payload.records_json", "doff10.get_dofftable_withname", records_json)
+    add("hands.by_date", "hands.get_daily_hand_comparison", hands_engine.by_date)
+    add("hands.by_occupation", "hands.get_daily_hand_comparison", hands_engine.by_occupation)
+    add("hands.by_department", "hands.get_daily_hand_comparison", hands_engine.by_department)
+    return cases
+
+
+def page_cases() -> List[Case]:
+    from streamlit.testing.v1 import AppTest
+    import querycache
+
+    def run_page(path):
+        querycache.invalidate()
+        at = AppTest.from_file(path, default_timeout=600)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    root = os.path.dirname(HERE)
+    return [Case("page", name, run_page, (os.path.join(root, "pages", name),)) for name in PAGES]
+
+
+# --------------------------------------------------------------------------- #
+# Timing and reporting                                                        #
+# --------------------------------------------------------------------------- #
+def run_case(case: Case, repeat: int) -> tuple:
+    """Warm up once, then time ``repeat`` runs. Returns (timings, last result)."""
+    try:
+        value = case.fn(*case.args)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}".splitlines()[0][:200]
+        return {"kind": case.kind, "error": error, "trace": traceback.format_exc(limit=3)}, None
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        value = case.fn(*case.args)
+        times.append((time.perf_counter() - t0) * 1000)
+    out = {
+        "kind": case.kind,
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+    if isinstance(value, pd.DataFrame):
+        out["rows"] = len(value)
+    return out, value
+
+
+def compare(current: dict, baseline: Optional[dict], threshold: float, min_ms: float) -> List[tuple]:
+    regressions = []
+    if not baseline:
+        return regressions
+    for name, now in current["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before or "median_ms" not in now or "median_ms" not in before:
+            continue
+        delta = now["median_ms"] - before["median_ms"]
+        if delta > min_ms and now["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append((name, before["median_ms"], now["median_ms"]))
+    return regressions
+
+
+def print_report(current: dict, baseline: Optional[dict]) -> None:
+    base_cases = (baseline or {}).get("cases", {})
+    print(f"\n{'case':<48} {'median ms':>10} {'min ms':>9} {'rows':>8} {'vs last':>8}")
+    for name, r in current["cases"].items():
+        if "error" in r:
+            print(f"{name:<48} {'ERROR':>10}  {r['error']}")
+            continue
+        before = base_cases.get(name, {}).get("median_ms")
+        change = f"{(r['median_ms'] / before - 1) * 100:+.0f}%" if before else "new"
+        print(f"{name:<48} {r['median_ms']:>10.1f} {r['min_ms']:>9.1f} {r.get('rows', ''):>8} {change:>8}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    defaults = synthetic.Scale()
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--frames", type=int, default=defaults.frames)
+    parser.add_argument("--looms", type=int, default=defaults.looms)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db-dir", default=DEFAULT_DB_DIR)
+    parser.add_argument("--reuse", action="store_true", help="keep the stand-in database if the scale is unchanged")
+    parser.add_argument("--pages", action="store_true", help="also run the Streamlit pages headless")
+    parser.add_argument("--only", help="only cases whose name contains this text")
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    scale = dataclasses.replace(defaults, days=args.days, frames=args.frames, looms=args.looms,
+                                workers=args.workers, seed=args.seed)
+    prepare_database(scale, args.db_dir, args.reuse)
+    connect(args.db_dir)
+
+    current = {
+        "run_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "scale": dataclasses.asdict(scale),
+        "cases": {},
+    }
+    results = {}
+
+    def run_all(cases):
+        for case in cases:
+            if args.only and args.only not in case.name:
+                continue
+            current["cases"][case.name], results[case.name] = run_case(case, args.repeat)
+
+    run_all(query_cases(scale))
+    run_all(transform_cases(results))
+    if args.pages:
+        run_all(page_cases())
+
+    baseline = None
+    if os.path.exists(args.results):
+        with open(args.results) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != current["scale"]:
+            print("previous run used a different scale; not comparing")
+            baseline = None
+
+    print_report(current, baseline)
+    regressions = compare(current, baseline, args.threshold, args.min_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline['run_at']}:")
+        for name, before, now in regressions:
+            print(f"  {name}: {before:.1f} ms -> {now:.1f} ms")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, "w") as f:
+        json.dump(current, f, indent=2)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark the SPG frame pivot against the row-by-row loop it replaced.
+
+Builds a synthetic dofftable detail frame (the shape returned by
+``doff10.query.get_dofftable_details``), runs the old nested
+``iterrows`` normalisation and the grouped version from
+``doff10.framestats``, checks they agree and prints the timings.
+
+    python -m benchmarks.bench_spgframe --days 90 --frames 150
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from doff10.framestats import shift_normalized_pivot, nonzero_mean, nonzero_min
+
+
+def make_doff_details(days: int = 90, frames: int = 150, qualities: int = 12, seed: int = 7) -> pd.DataFrame:
+    """Synthetic get_dofftable_details output: one row per date/shift/frame/quality/ebno."""
+    rng = np.random.default_rng(seed)
+    start = datetime.date.today() - datetime.timedelta(days=days)
+    rows = []
+    frame_quality = rng.integers(0, qualities, size=frames)
+    for d in range(days):
+        doffdate = start + datetime.timedelta(days=d)
+        for frame in range(1, frames + 1):
+            # Roughly one frame in twenty changes quality on a given day
+            q = frame_quality[frame - 1] if rng.random() > 0.05 else rng.integers(0, qualities)
+            for shift in 'ABC':
+                if rng.random() < 0.1:
+                    continue
+                rows.append((doffdate, shift, frame, f"Q{q:02d}", f"QUALITY {q}", f"E{rng.integers(1000, 1600)}",
+                             float(rng.integers(150, 450))))
+    df = pd.DataFrame(rows, columns=['doffdate', 'shift', 'frameno', 'q_code', 'quality_name', 'ebno', 'total_netwt'])
+    df['quality'] = df['q_code'].astype(str) + '-' + df['quality_name'].astype(str)
+    return df
+
+
+def legacy_pivot(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    """The original spgframe_view normalisation, kept only for comparison."""
+    pivot_df = filtered_df.pivot_table(
+        index=['frameno', 'quality'], columns='doffdate', values='total_netwt', aggfunc='sum', fill_value=0
+    ).reset_index()
+    date_cols = sorted([col for col in pivot_df.columns if isinstance(col, (str, datetime.date)) and col not in ['frameno', 'quality']])
+    pivot_df = pivot_df[['frameno', 'quality'] + date_cols].astype({c: float for c in date_cols})
+    for date_col in date_cols:
+        for idx, row in pivot_df.iterrows():
+            mask = (
+                (filtered_df['frameno'] == row['frameno']) &
+                (filtered_df['quality'] == row['quality']) &
+                (filtered_df['doffdate'] == date_col)
+            )
+            n_shifts = filtered_df[mask]['shift'].nunique()
+            if n_shifts > 0 and row[date_col] != 0:
+                pivot_df.at[idx, date_col] = round(row[date_col] / n_shifts, 2)
+
+    def avg_ignore_zeros(row):
+        vals = [v for v in row if v != 0]
+        return round(sum(vals) / len(vals), 2) if vals else 0
+
+    def min_ignore_zeros(row):
+        vals = [v for v in row if v != 0]
+        return min(vals) if vals else 0
+
+    pivot_df['Average'] = pivot_df[date_cols].apply(avg_ignore_zeros, axis=1)
+    pivot_df['Min'] = pivot_df[date_cols].apply(min_ignore_zeros, axis=1)
+    return pivot_df
+
+
+def vectorized_pivot(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    pivot_df, date_cols = shift_normalized_pivot(filtered_df)
+    pivot_df['Average'] = nonzero_mean(pivot_df[date_cols], axis=1)
+    pivot_df['Min'] = nonzero_min(pivot_df[date_cols], axis=1)
+    return pivot_df
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the grouped version")
+    args = parser.parse_args()
+
+    df = make_doff_details(args.days, args.frames)
+    print(f"synthetic dofftable: {len(df):,} rows, {args.days} days, {args.frames} frames")
+
+    new, new_s = _time(vectorized_pivot, df)
+    print(f"grouped pivot : {new_s:8.3f} s")
+    if args.skip_legacy:
+        return
+
+    old, old_s = _time(legacy_pivot, df)
+    print(f"legacy loop   : {old_s:8.3f} s  ({old_s / new_s:,.0f}x slower)")
+    pd.testing.assert_frame_equal(
+        old.reset_index(drop=True), new.reset_index(drop=True), check_dtype=False, check_names=False
+    )
+    print("results match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time profile of the Streamlit pages.
+
+Each page's top-level imports are run in a fresh interpreter under
+``python -X importtime``, which is what the first load of the page pays
+after a deploy or restart. The report lists the total per page and the
+slowest modules it pulled in; with --budget-ms pages over the budget are
+listed and the exit status is 1.
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --top 15 pages/Doff_Details.py
+    python -m benchmarks.import_profile --budget-ms 1500
+
+Only the import statements are run, never the page body, so no database or
+Google Sheets access is needed.
+"""
+import argparse
+import ast
+import glob
+import os
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def page_imports(path: str) -> str:
+    """The page's module-level import statements as source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile(path: str) -> Tuple[float, List[Tuple[str, float]], str]:
+    """
+    Import ``path``'s imports in a new interpreter. Returns the total in ms,
+    (module, cumulative ms) for every module imported directly at top level
+    and the interpreter's error output if the imports failed.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", page_imports(path)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        # Top-level entries have no indent; nested ones are counted in them
+        if match and len(match.group(3)) == 1:
+            modules.append((match.group(4), int(match.group(2)) / 1000))
+    error = "" if proc.returncode == 0 else proc.stderr.strip().splitlines()[-1]
+    return sum(ms for _, ms in modules), modules, error
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="page files (default: pages/*.py)")
+    parser.add_argument("--top", type=int, default=5, help="slowest modules listed per page")
+    parser.add_argument("--budget-ms", type=float, help="report pages whose imports take longer")
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+    over = []
+    print(f"{'page':<36} {'import ms':>10}  slowest modules")
+    for path in pages:
+        total, modules, error = profile(os.path.abspath(path))
+        slowest = sorted(modules, key=lambda m: -m[1])[:args.top]
+        listed = ", ".join(f"{name} {ms:.0f}" for name, ms in slowest)
+        print(f"{os.path.basename(path):<36} {total:>10.0f}  {listed}")
+        if error:
+            print(f"{'':<36} {'':>10}  failed: {error}")
+        if args.budget_ms is not None and total > args.budget_ms:
+            over.append((path, total))
+    if over:
+        print(f"\n{len(over)} page(s) over the {args.budget_ms:.0f} ms budget:")
+        for path, total in over:
+            print(f"  {os.path.basename(path)}: {total:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
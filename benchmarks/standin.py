@@ -0,0 +1,140 @@
+"""
+SQLite stand-in for the plant MySQL databases.
+
+The default database (``vowsls`` in production) is one SQLite file, attached a
+second time as ``vowsls``; ``EMPMILL12`` is another file attached under that
+name, so schema-qualified and unqualified table names in the report SQL
+resolve the same way they do on the server. The MySQL functions SQLite lacks
+(``concat``, ``lpad``, ``unix_timestamp``, ``str_to_date``) are registered on
+every connection.
+
+Point the app at it with ``DATABASE_URL`` before ``db`` is imported:
+
+    os.environ["DATABASE_URL"] = standin.database_url(path)
+"""
+import datetime
+import os
+import sqlite3
+import time
+from typing import Dict
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+from benchmarks.synthetic import TableKey
+
+
+MAIN_FILE = "vowsls.db"
+ATTACHED = {"vowsls": MAIN_FILE, "EMPMILL12": "empmill12.db"}
+
+# DATE columns come back as date objects, as with pymysql. DATETIME is left
+# as text: SQLAlchemy's SQLite DateTime type always parses it itself. Bound
+# datetimes use that type's storage format so text comparisons line up.
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+sqlite3.register_adapter(datetime.datetime, lambda v: v.strftime("%Y-%m-%d %H:%M:%S.%f"))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+def database_url(path: str) -> str:
+    return f"sqlite:///{os.path.join(os.path.abspath(path), MAIN_FILE)}?detect_types={sqlite3.PARSE_DECLTYPES}"
+
+
+# --------------------------------------------------------------------------- #
+# MySQL functions                                                             #
+# --------------------------------------------------------------------------- #
+def _text(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _concat(*args):
+    if any(a is None for a in args):
+        return None
+    return "".join(_text(a) for a in args)
+
+
+def _lpad(value, length, pad):
+    if value is None:
+        return None
+    s = _text(value)
+    return s[:length] if len(s) >= length else (pad * length)[: length - len(s)] + s
+
+
+def _unix_timestamp(value):
+    if value is None:
+        return None
+    return int(time.mktime(datetime.datetime.fromisoformat(str(value)).timetuple()))
+
+
+_MYSQL_FORMAT = {"%i": "%M", "%s": "%S", "%h": "%I"}
+
+
+def _str_to_date(value, fmt):
+    if value is None or fmt is None:
+        return None
+    for mysql, python in _MYSQL_FORMAT.items():
+        fmt = fmt.replace(mysql, python)
+    try:
+        return datetime.datetime.strptime(str(value), fmt).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def install(engine, path: str) -> None:
+    """Attach the schemas and register the MySQL functions on each new connection."""
+    path = os.path.abspath(path)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        for schema, filename in ATTACHED.items():
+            dbapi_conn.execute(f"ATTACH DATABASE '{os.path.join(path, filename)}' AS {schema}")
+        dbapi_conn.create_function("concat", -1, _concat, deterministic=True)
+        dbapi_conn.create_function("lpad", 3, _lpad, deterministic=True)
+        dbapi_conn.create_function("unix_timestamp", 1, _unix_timestamp, deterministic=True)
+        dbapi_conn.create_function("str_to_date", 2, _str_to_date, deterministic=True)
+
+
+# --------------------------------------------------------------------------- #
+# Loading                                                                     #
+# --------------------------------------------------------------------------- #
+# Indexes matching the ones the report queries rely on in production
+INDEXES = {
+    (None, "dofftable"): ["company_id, doffdate", "auto_id"],
+    (None, "daily_attendance"): ["daily_atten_id", "company_id, attendance_date"],
+    (None, "daily_ebmc_attendance"): ["company_id, attendace_date, mc_id"],
+    (None, "worker_master"): ["eb_no"],
+    (None, "tbl_hrms_ed_official_details"): ["eb_id"],
+    (None, "mechine_master"): ["company_id, mach_shr_code"],
+    ("EMPMILL12", "spining_daily_transaction"): ["tran_date, q_code"],
+    ("EMPMILL12", "weaving_daily_transaction"): ["tran_date, q_code"],
+    ("EMPMILL12", "DAILY_LOOM_DATA"): ["TRAN_DATE"],
+    ("EMPMILL12", "view_proc_spellwindingdata"): ["tran_date"],
+    ("EMPMILL12", "tbl_daily_hand_comp_data"): ["company_id, tran_date"],
+    ("EMPMILL12", "spreader_prod_entry"): ["bin_no", "entry_id_grp"],
+    ("EMPMILL12", "spreader_roll_issue"): ["entry_id_grp"],
+}
+
+
+def load(path: str, tables: Dict[TableKey, pd.DataFrame]) -> None:
+    """Write every table into fresh database files under ``path``."""
+    os.makedirs(path, exist_ok=True)
+    for filename in set(ATTACHED.values()):
+        target = os.path.join(path, filename)
+        if os.path.exists(target):
+            os.remove(target)
+
+    engine = create_engine(database_url(path))
+    install(engine, path)
+    try:
+        with engine.begin() as conn:
+            for (schema, name), df in tables.items():
+                # vowsls is the main file attached again; write through main
+                schema = None if schema == "vowsls" else schema
+                df.to_sql(name, conn, schema=schema, index=False, chunksize=50_000)
+                for i, cols in enumerate(INDEXES.get((schema, name), [])):
+                    prefix = f"{schema}." if schema else ""
+                    conn.exec_driver_sql(f"CREATE INDEX {prefix}ix_{name}_{i} ON {name} ({cols})")
+    finally:
+        engine.dispose()
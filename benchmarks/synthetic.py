@@ -0,0 +1,398 @@
+"""
+Synthetic plant data for the offline benchmarks.
+
+``generate(scale)`` returns one DataFrame per table the reports read, keyed
+by ``(schema, table)`` with ``None`` for the default database. Shapes follow
+the production tables closely enough for every report query to join and
+aggregate realistically: spinning frames doffed per spell, looms per
+spell, winders per shift, daily hand comparison per designation and
+spreader roll production / issue per bin.
+
+Dates run from ``scale.days - 1`` days ago up to today, so the current-day
+code paths (cache TTLs, rollup refresh) are exercised as well.
+"""
+import datetime
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+COMPANY_ID = 2
+SPELLS = ['A1', 'A2', 'B1', 'B2', 'C']
+SPELL_HOURS = {'A1': 5.0, 'A2': 3.0, 'B1': 3.0, 'B2': 5.0, 'C': 7.5}
+SPINNER_DESIGNATIONS = [213, 50, 55, 241, 252, 195, 242]
+
+TableKey = Tuple[Optional[str], str]
+
+
+@dataclass(frozen=True)
+class Scale:
+    days: int = 60
+    frames: int = 120
+    looms: int = 300
+    workers: int = 1500
+    spinning_qualities: int = 12
+    weaving_qualities: int = 20
+    designations: int = 60
+    bins: int = 40
+    seed: int = 7
+
+    @property
+    def dates(self):
+        today = datetime.date.today()
+        return [today - datetime.timedelta(days=i) for i in range(self.days - 1, -1, -1)]
+
+
+def _pick(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size=size)]
+
+
+def _grid(**columns) -> pd.DataFrame:
+    """Cartesian product of the given value lists."""
+    index = pd.MultiIndex.from_product(list(columns.values()), names=list(columns))
+    return index.to_frame(index=False)
+
+
+def _masters(scale: Scale, rng) -> Dict[TableKey, pd.DataFrame]:
+    tables: Dict[TableKey, pd.DataFrame] = {}
+    eb_nos = np.array([str(10000 + i) for i in range(scale.workers)], dtype=object)
+    first = np.array(['RAM', 'SHYAM', 'MOHAN', 'ABDUL', 'SUNIL', 'RAJU', 'BIKASH', 'AMIT', 'MD', 'SANJAY'], dtype=object)
+    last = np.array(['DAS', 'SHAW', 'SINGH', 'PASWAN', 'ALI', 'MONDAL', 'YADAV', 'RAM', 'SAO', 'GHOSH'], dtype=object)
+    tables[(None, 'worker_master')] = pd.DataFrame({
+        'company_id': COMPANY_ID,
+        'eb_id': np.arange(1, scale.workers + 1),
+        'eb_no': eb_nos,
+        'worker_name': _pick(rng, first, scale.workers),
+        'middle_name': np.where(rng.random(scale.workers) < 0.3, 'KUMAR', None),
+        'last_name': _pick(rng, last, scale.workers),
+        'update_date_time': pd.Timestamp.now().floor('s') - pd.to_timedelta(rng.integers(0, 900, scale.workers), unit='D'),
+    })
+    tables[(None, 'tbl_hrms_ed_official_details')] = pd.DataFrame({
+        'eb_id': np.arange(1, scale.workers + 1),
+        'catagory_id': np.where(rng.random(scale.workers) < 0.05, 30, 10),
+        'is_active': 1,
+    })
+
+    spg_codes = [f"{side}{i:02d}" for i, side in enumerate(['1', '2'] * (scale.spinning_qualities // 2 + 1))][:scale.spinning_qualities]
+    tables[('EMPMILL12', 'spining_master')] = pd.DataFrame({
+        'company_id': COMPANY_ID,
+        'q_code': spg_codes,
+        'std_count': rng.choice([8.0, 9.0, 10.0, 12.0, 14.0, 16.0, 20.0], size=len(spg_codes)),
+        'subgroup_type': _pick(rng, ['HESSIAN WARP', 'HESSIAN WEFT', 'SACKING WARP', 'SACKING WEFT'], len(spg_codes)),
+        'spindle': 100.0,
+    })
+    tables[(None, 'weaving_quality_master')] = pd.DataFrame({
+        'company_id': COMPANY_ID,
+        'quality_code': spg_codes,
+        'quality_name': [f"QUALITY {c}" for c in spg_codes],
+    })
+
+    wvg_codes = [f"{(i % 3) + 1}{i:03d}" for i in range(scale.weaving_qualities)]
+    tables[('EMPMILL12', 'weaving_master')] = pd.DataFrame({
+        'q_code': wvg_codes,
+        'q_ozs_yds': rng.uniform(7.0, 14.0, len(wvg_codes)).round(2),
+        'q_finish_length': rng.choice([100.0, 164.0, 200.0], size=len(wvg_codes)),
+        'q_width': rng.choice([40.0, 44.0, 48.0, 54.0], size=len(wvg_codes)),
+    })
+
+    frames = np.arange(1, scale.frames + 1)
+    spreaders = np.arange(1, 7)
+    tables[(None, 'mechine_master')] = pd.DataFrame({
+        'company_id': COMPANY_ID,
+        'mechine_id': np.concatenate([1000 + frames, 5000 + spreaders]),
+        'mach_shr_code': np.concatenate([frames.astype(str), [f"SP{s}" for s in spreaders]]).astype(object),
+        'mech_code': np.concatenate([[f"F{f:03d}" for f in frames], [f"SP{s}" for s in spreaders]]).astype(object),
+        'mechine_name': np.concatenate([[f"FRAME {f}" for f in frames], [f"S{s}" for s in spreaders]]).astype(object),
+        'type_of_mechine': np.concatenate([np.full(len(frames), 36), np.full(len(spreaders), 8)]),
+        'bobbin_weight': np.concatenate([np.zeros(len(frames)), np.full(len(spreaders), 18.0)]),
+    })
+
+    depts = pd.DataFrame({
+        'mdept_id': np.arange(1, 11),
+        'company_id': COMPANY_ID,
+        'dept_code': [f"D{i:02d}" for i in range(1, 11)],
+        'dept_desc': ['BATCHING', 'PREPARING', 'SPINNING', 'WINDING', 'BEAMING', 'WEAVING',
+                      'FINISHING', 'MECHANICAL', 'ELECTRICAL', 'GENERAL'],
+    })
+    tables[('vowsls', 'master_department')] = depts
+    desig_ids = np.arange(1, scale.designations + 1)
+    tables[('vowsls', 'designation')] = pd.DataFrame({
+        'id': desig_ids,
+        'company_id': COMPANY_ID,
+        'department': rng.integers(1, 11, size=len(desig_ids)),
+    })
+    tables[('EMPMILL12', 'OCCUPATION_MASTER_NORMS')] = pd.DataFrame({
+        'desig_id': desig_ids,
+        'OCCU_DESC': [f"OCCUPATION {i}" for i in desig_ids],
+        'OCCU_SHR_NAME': [f"OC{i}" for i in desig_ids],
+        'DEPT_ID': rng.integers(1, 11, size=len(desig_ids)),
+        'DIRECT_INDIRECT': _pick(rng, ['DIRECT', 'INDIRECT'], len(desig_ids)),
+        'VARIABLE_FIXED': _pick(rng, ['VARIABLE', 'FIXED'], len(desig_ids)),
+    })
+
+    jute_ids = np.arange(1, 16)
+    tables[('vowsls', 'jute_quality_price_master')] = pd.DataFrame({
+        'id': jute_ids,
+        'company_id': COMPANY_ID,
+        'jute_quality': [f"TD-{i}" for i in jute_ids],
+    })
+    tables[('EMPMILL12', 'maturity_time_master')] = pd.DataFrame({
+        'jute_quality_id': jute_ids,
+        'maturity_hours': rng.choice([24, 36, 48], size=len(jute_ids)),
+    })
+    tables[('EMPMILL12', 'spreader_roll_bin_master')] = pd.DataFrame({
+        'bin_id': np.arange(1, scale.bins + 1),
+        'bin_no': np.arange(1, scale.bins + 1),
+    })
+    return tables
+
+
+def _spinning(scale: Scale, rng, tables) -> None:
+    dates = scale.dates
+    spg = tables[('EMPMILL12', 'spining_master')]
+    frame_quality = _pick(rng, spg['q_code'].tolist(), scale.frames)
+    spinners = tables[(None, 'worker_master')].iloc[: max(scale.frames * 4, 1)]
+
+    runs = _grid(doffdate=dates, spell=SPELLS, frameno=np.arange(1, scale.frames + 1))
+    runs = runs[rng.random(len(runs)) > 0.08].reset_index(drop=True)
+    runs['q_code'] = frame_quality[runs['frameno'] - 1]
+    worker_idx = rng.integers(0, len(spinners), size=len(runs))
+    runs['eb_id'] = spinners['eb_id'].to_numpy()[worker_idx]
+    runs['ebno'] = np.where(rng.random(len(runs)) < 0.05, None, spinners['eb_no'].to_numpy()[worker_idx])
+
+    # One to three doffs per frame and spell
+    doffs = runs.loc[runs.index.repeat(rng.integers(1, 4, size=len(runs)))].reset_index(drop=True)
+    doffs['netwt'] = rng.normal(60, 12, size=len(doffs)).clip(15, 110).round(2)
+    tables[(None, 'dofftable')] = pd.DataFrame({
+        'auto_id': np.arange(1, len(doffs) + 1),
+        'company_id': COMPANY_ID,
+        'doffdate': doffs['doffdate'],
+        'spell': doffs['spell'],
+        'frameno': doffs['frameno'].astype(str),
+        'q_code': doffs['q_code'],
+        'ebno': doffs['ebno'],
+        'netwt': doffs['netwt'],
+        'is_active': np.where(rng.random(len(doffs)) < 0.01, 0, 1),
+    })
+
+    staffed = runs[runs['ebno'].notna()].reset_index(drop=True)
+    hours = staffed['spell'].map(SPELL_HOURS)
+    attendance = pd.DataFrame({
+        'daily_atten_id': np.arange(1, len(staffed) + 1),
+        'company_id': COMPANY_ID,
+        'eb_id': staffed['eb_id'],
+        'attendance_date': staffed['doffdate'],
+        'spell': staffed['spell'],
+        'working_hours': hours,
+        'idle_hours': np.where(rng.random(len(staffed)) < 0.1, 1.0, 0.0),
+        'is_active': 1,
+        'worked_designation_id': _pick(rng, SPINNER_DESIGNATIONS, len(staffed)),
+        'attendance_type': _pick(rng, ['R', 'R', 'R', 'O'], len(staffed)),
+    })
+    tables[(None, 'daily_attendance')] = attendance
+    tables[(None, 'daily_ebmc_attendance')] = pd.DataFrame({
+        'company_id': COMPANY_ID,
+        'daily_atten_id': attendance['daily_atten_id'],
+        'attendace_date': staffed['doffdate'],
+        'spell': staffed['spell'],
+        'mc_id': 1000 + staffed['frameno'],
+        'is_active': 1,
+    })
+
+    sdt = _grid(tran_date=dates, q_code=spg['q_code'].tolist())
+    n = len(sdt)
+    prd = rng.uniform(800, 2500, size=(n, 3)).round(1)
+    mc = rng.uniform(2, 12, size=(n, 3)).round(2)
+    counts = dict(zip(spg['q_code'], spg['std_count']))
+    sdt = sdt.assign(
+        company_id=COMPANY_ID,
+        prd_a=prd[:, 0], prd_b=prd[:, 1], prd_c=prd[:, 2],
+        mc_a=mc[:, 0], mc_b=mc[:, 1], mc_c=mc[:, 2],
+        act_count=(sdt['q_code'].map(counts) * rng.uniform(0.95, 1.05, n)).round(2),
+        winder=rng.uniform(2, 8, n).round(1),
+        hunprod=(prd.sum(axis=1) * rng.uniform(0.9, 1.1, n)).round(1),
+        speed=rng.uniform(2800, 3400, n).round(0),
+        twist_per_inch=rng.uniform(3.5, 5.5, n).round(2),
+    )
+    tables[('EMPMILL12', 'spining_daily_transaction')] = sdt
+
+
+def _weaving(scale: Scale, rng, tables) -> None:
+    dates = scale.dates
+    wm = tables[('EMPMILL12', 'weaving_master')]
+    wdt = _grid(tran_date=dates, q_code=wm['q_code'].tolist())
+    n = len(wdt)
+    mc = rng.uniform(3, 15, size=(n, 3)).round(2)
+    yds = rng.uniform(2000, 9000, size=(n, 3)).round(1)
+    actyds = yds.sum(axis=1)
+    tables[('EMPMILL12', 'weaving_daily_transaction')] = wdt.assign(
+        company_id=COMPANY_ID,
+        mc_a=mc[:, 0], mc_b=mc[:, 1], mc_c=mc[:, 2],
+        yds_a=yds[:, 0], yds_b=yds[:, 1], yds_c=yds[:, 2],
+        actyds=actyds,
+        actyds_ashots=(actyds / rng.uniform(0.6, 0.95, n)).round(1),
+        actkgs=(actyds * rng.uniform(0.25, 0.4, n)).round(1),
+    )
+
+    # Half the looms are Hessian (41xx), half S4 (42xx)
+    loom_nos = [f"{41 if i % 2 == 0 else 42}{i:02d}" for i in range(scale.looms)]
+    weavers = tables[(None, 'worker_master')]['eb_no'].to_numpy()
+    loom_quality = _pick(rng, wm['q_code'].tolist(), scale.looms)
+    dld = _grid(TRAN_DATE=dates, SPELL=SPELLS, loom=np.arange(scale.looms))
+    dld = dld[rng.random(len(dld)) > 0.1].reset_index(drop=True)
+    n = len(dld)
+    hours = dld['SPELL'].map(SPELL_HOURS).to_numpy()
+    eff = rng.normal(72, 12, n).clip(0, 110).round(2)
+    std = rng.uniform(20, 40, n).round(2) * hours / 8
+    tables[('EMPMILL12', 'DAILY_LOOM_DATA')] = pd.DataFrame({
+        'TRAN_DATE': dld['TRAN_DATE'],
+        'SPELL': dld['SPELL'],
+        'LOOM_NO': np.asarray(loom_nos, dtype=object)[dld['loom']],
+        'EBNO': weavers[rng.integers(0, len(weavers), n)],
+        'Q_CODE': loom_quality[dld['loom']],
+        'QUANTITY': (std * eff / 100).round(2),
+        'STDPROD': std.round(2),
+        'EFFICIENCY': eff,
+        'WRK_HOURS': hours,
+    })
+
+    winders = tables[(None, 'worker_master')]['eb_no'].to_numpy()[: max(scale.workers // 10, 1)]
+    spg_quality = tables[(None, 'weaving_quality_master')]['quality_name'].to_numpy()
+    vps = _grid(tran_date=dates, shift=['A', 'B', 'C'], winder=np.arange(len(winders)))
+    vps = vps[rng.random(len(vps)) > 0.15].reset_index(drop=True)
+    n = len(vps)
+    atthrs = np.where(vps['shift'] == 'C', 7.5, 8.0)
+    target = rng.uniform(350, 550, n).round(0)
+    tables[('EMPMILL12', 'view_proc_spellwindingdata')] = pd.DataFrame({
+        'tran_date': vps['tran_date'],
+        'shift': vps['shift'],
+        'eb_no': winders[vps['winder']],
+        'mechine_name': [f"WINDER {i % 40 + 1}" for i in vps['winder']],
+        'quality': _pick(rng, spg_quality, n),
+        'attendance_type': _pick(rng, ['R', 'R', 'O'], n),
+        'prod': (target * rng.normal(0.9, 0.15, n).clip(0.2, 1.3)).round(1),
+        'atthrs': atthrs,
+        'target_prod': target,
+    })
+
+
+def _hands(scale: Scale, rng, tables) -> None:
+    desig = tables[('vowsls', 'designation')]['id'].to_numpy()
+    hands = _grid(tran_date=scale.dates, desig_id=desig)
+    n = len(hands)
+    target = rng.integers(2, 40, size=(n, 3)).astype(float)
+    actual = (target * rng.normal(1.0, 0.1, size=(n, 3))).round(0)
+    diff = actual.sum(axis=1) - target.sum(axis=1)
+    tables[('EMPMILL12', 'tbl_daily_hand_comp_data')] = hands.assign(
+        company_id=COMPANY_ID,
+        shift_a=actual[:, 0], shift_b=actual[:, 1], shift_c=actual[:, 2],
+        shift_g=rng.integers(0, 5, n).astype(float),
+        target_a=target[:, 0], target_b=target[:, 1], target_c=target[:, 2],
+        excess_hands=np.clip(diff, 0, None),
+        short_hands=np.clip(-diff, 0, None),
+        is_active=1,
+    )
+
+
+def _spreader(scale: Scale, rng, tables) -> None:
+    """Roll groups: a bin is filled over up to four hours and issued about two days later."""
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    start = datetime.datetime.combine(scale.dates[0], datetime.time(6))
+    jute_ids = tables[('vowsls', 'jute_quality_price_master')]['id'].to_numpy()
+    entries, issues = [], []
+    grp = 0
+    for bin_no in range(1, scale.bins + 1):
+        t = start + datetime.timedelta(hours=int(rng.integers(0, 24)))
+        while t < now:
+            grp += 1
+            quality = int(rng.choice(jute_ids))
+            weights = []
+            for k in range(int(rng.integers(1, 5))):
+                at = t + datetime.timedelta(hours=k)
+                if at > now:
+                    break
+                rolls, wt = int(rng.integers(4, 20)), float(rng.choice([18.0, 20.0, 22.0]))
+                weights.append((rolls, wt))
+                entries.append((at.date(), _spell_of(at.hour), f"S{rng.integers(1, 7)}", quality, rolls, at.hour,
+                                bin_no, grp, int(rng.integers(1, 30)), wt))
+            issue_at = t + datetime.timedelta(hours=int(rng.integers(40, 56)))
+            if issue_at <= now:
+                for rolls, wt in weights:
+                    issues.append((f"B{rng.integers(1, 9)}", rolls, issue_at.hour, issue_at.date(),
+                                   _spell_of(issue_at.hour), grp, wt))
+            t = issue_at + datetime.timedelta(hours=int(rng.integers(1, 6)))
+
+    spe = pd.DataFrame(entries, columns=['entry_date', 'spell', 'spreader_no', 'jute_quality_id', 'no_of_rolls',
+                                         'entry_time', 'bin_no', 'entry_id_grp', 'trolley_no', 'wt_per_roll'])
+    spe.insert(0, 'spreader_prod_entry_id', np.arange(1, len(spe) + 1))
+    spe['entry_dt'] = pd.to_datetime(spe['entry_date']) + pd.to_timedelta(spe['entry_time'], unit='h')
+    spe['issue_date'] = None
+    spe['issue_time'] = np.nan
+    spe['issue_spell'] = None
+    spe['issue_rolls'] = np.nan
+    tables[('EMPMILL12', 'spreader_prod_entry')] = spe
+    sri = pd.DataFrame(issues, columns=['breaker_inter_no', 'no_of_rolls', 'issue_time', 'issue_date', 'spell',
+                                        'entry_id_grp', 'wt_per_roll'])
+    sri.insert(0, 'spreader_roll_issue_id', np.arange(1, len(sri) + 1))
+    sri['issue_dt'] = pd.to_datetime(sri['issue_date']) + pd.to_timedelta(sri['issue_time'], unit='h')
+    tables[('EMPMILL12', 'spreader_roll_issue')] = sri
+
+
+def _jute_receipts(scale: Scale, rng, tables) -> None:
+    """Jute receipts over twice the date range; only some qualities arrive in the recent part."""
+    now = pd.Timestamp.now().floor('s')
+    n = scale.days * 2 * 4
+    received = now - pd.to_timedelta(rng.integers(0, scale.days * 2 * 24 * 3600, n), unit='s')
+    jute_ids = tables[('vowsls', 'jute_quality_price_master')]['id'].to_numpy()
+    recent = received >= now - pd.Timedelta(days=scale.days // 2)
+    quality = np.where(recent, rng.choice(jute_ids[:10], n), rng.choice(jute_ids, n))
+    receive_no = np.arange(1, n + 1)
+    tables[('vowsls', 'scm_mr_hdr')] = pd.DataFrame({'jute_receive_no': receive_no, 'company_id': COMPANY_ID})
+    tables[('vowsls', 'scm_mr_line_item')] = pd.DataFrame({
+        'jute_receive_no': np.repeat(receive_no, 2),
+        'actual_quality': np.repeat(quality, 2),
+        'auto_datetime_insert': np.repeat(received.to_numpy(), 2),
+    })
+
+
+def _spell_of(hour: int) -> str:
+    if 6 <= hour < 11:
+        return 'A'
+    if 11 <= hour < 14:
+        return 'B'
+    if 14 <= hour < 17:
+        return 'A'
+    if 17 <= hour < 22:
+        return 'B'
+    return 'C'
+
+
+def yarn_sheet(scale: Scale = Scale(), tests_per_day: int = 20) -> Dict[str, list]:
+    """Rows of the yarn parameter sheet's YARN and STD worksheets, as displayed (strings)."""
+    rng = np.random.default_rng(scale.seed)
+    counts = [7.0, 8.0, 8.5, 9.0, 10.0, 11.0, 12.0, 14.0]
+    qualities = [f"{c:g} LBS" for c in counts]
+    yarn = [["Timestamp", "Date", "Quality", "Wt /450 yds in Gms1", "MR"]]
+    for day in scale.dates:
+        picked = rng.integers(0, len(counts), tests_per_day)
+        for i in picked:
+            weight = counts[i] * 454 / 14400 * 450 * rng.normal(1.0, 0.03)
+            yarn.append([f"{day:%m/%d/%Y} 10:00:00", f"{day:%m/%d/%Y}", qualities[i],
+                         f"{weight:.1f}", f"{rng.normal(16.0, 1.5):.1f}"])
+    std = [["Quality", "Std Count", "", "Quality", "Std MR%"]]
+    std += [[q, f"{c:g}", "", q, "16"] for q, c in zip(qualities, counts)]
+    return {"YARN": yarn, "STD": std}
+
+
+def generate(scale: Scale = Scale()) -> Dict[TableKey, pd.DataFrame]:
+    """Every table, keyed by (schema, table)."""
+    rng = np.random.default_rng(scale.seed)
+    tables = _masters(scale, rng)
+    _spinning(scale, rng, tables)
+    _weaving(scale, rng, tables)
+    _hands(scale, rng, tables)
+    _spreader(scale, rng, tables)
+    _jute_receipts(scale, rng, tables)
+    return tables
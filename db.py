@@ -1,9 +1,17 @@
+"""
+Database engine for every report and entry module.
+
+Nothing is connected or even imported from SQLAlchemy when this module is
+imported: the engine is created by the first ``get_engine()`` call (or
+first access to ``db.engine``), after loading ``.env``. Library modules
+call ``get_engine()`` where they run a query, so importing a page's whole
+dependency tree never opens the database.
+"""
 import os
+import threading
 from functools import lru_cache
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker, declarative_base
-from dotenv import load_dotenv
-load_dotenv()
+
+import querystats
 # /C:/code/mis/db.py
 
 
@@ -19,9 +27,19 @@ def get_database_url() -> str:
     """
     Build the SQLAlchemy URL from environment variables.
 
+    ``DATABASE_URL``, when set, is used as is (e.g. the SQLite stand-in the
+    benchmarks run against).
+
     Raises:
         ValueError: If any required variable is missing.
     """
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    override = os.getenv("DATABASE_URL")
+    if override:
+        return override
+
     db_user = os.getenv("DB_USER")
     db_password = os.getenv("DB_PASSWORD")
     db_host = os.getenv("DB_HOST")
@@ -51,29 +69,88 @@ def get_database_url() -> str:
 # --------------------------------------------------------------------------- #
 # Engine / Session / Base                                                     #
 # --------------------------------------------------------------------------- #
-DATABASE_URL = get_database_url()
+_lock = threading.Lock()
+_engine = None
+_session_factory = None
+_base = None
+
+
+def get_engine():
+    """The process-wide engine, created on first use."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+
+                url = get_database_url()
+                # The SQLite stand-in (benchmarks/standin.py) converts DATE columns
+                # itself so results carry date objects, as they do from pymysql.
+                dialect_options = {"native_datetime": True} if url.startswith("sqlite") else {}
+                engine = create_engine(
+                    url,
+                    pool_pre_ping=True,      # recycle disconnected connections
+                    pool_recycle=280,        # avoid MySQL “gone away”
+                    echo=False,              # set True for SQL logging
+                    future=True,
+                    **dialect_options,
+                )
+                # Per-statement timing, see querystats.py (MIS_SLOW_QUERY_MS for a slow log)
+                querystats.install()
+                _engine = engine
+    return _engine
+
+
+def engine_created() -> bool:
+    """Whether ``get_engine()`` has run (the URL can no longer change)."""
+    return _engine is not None
+
+
+def get_session_factory():
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy.orm import scoped_session, sessionmaker
+
+        with _lock:
+            if _session_factory is None:
+                _session_factory = scoped_session(
+                    sessionmaker(bind=get_engine(), autocommit=False, autoflush=False, future=True)
+                )
+    return _session_factory
+
+
+def get_base():
+    global _base
+    if _base is None:
+        from sqlalchemy.orm import declarative_base
+
+        with _lock:
+            if _base is None:
+                _base = declarative_base()
+    return _base
+
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,      # recycle disconnected connections
-    pool_recycle=280,        # avoid MySQL “gone away”
-    echo=False,              # set True for SQL logging
-    future=True,
-)
+_LAZY = {
+    "engine": get_engine,
+    "DATABASE_URL": get_database_url,
+    "SessionLocal": get_session_factory,
+    "Base": get_base,
+}
 
-SessionLocal = scoped_session(
-    sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
-)
 
-Base = declarative_base()
+def __getattr__(name):
+    # ``from db import engine`` and ``db.engine`` keep working, creating the engine then
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --------------------------------------------------------------------------- #
 # Small dependency helper (e.g. FastAPI)                                      #
 # --------------------------------------------------------------------------- #
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,57 @@
+"""
+Hidden query diagnostics view.
+
+Not linked anywhere: main.py renders it instead of the dashboard when it is
+opened as ``/?diagnostics=<key>`` and ``<key>`` matches the
+``MIS_DIAGNOSTICS_KEY`` environment variable. Without that variable the
+view cannot be reached.
+"""
+import datetime
+import hmac
+import os
+
+import pandas as pd
+import streamlit as st
+
+import querycache
+import querystats
+
+
+def diagnostics_requested() -> bool:
+    """True when the request carries the configured diagnostics key."""
+    key = os.getenv("MIS_DIAGNOSTICS_KEY")
+    given = st.query_params.get("diagnostics")
+    return bool(key) and given is not None and hmac.compare_digest(given, key)
+
+
+def diagnostics_view():
+    st.title("Query Diagnostics")
+    st.caption(
+        f"Since process start. Percentiles over the last {querystats.WINDOW} calls per caller. "
+        f"Slow log: {'≥ %.0f ms' % querystats.SLOW_QUERY_MS if querystats.SLOW_QUERY_MS else 'off'}."
+    )
+    if not querystats.ENABLED:
+        st.warning("Query statistics are disabled (MIS_QUERY_STATS=0).")
+
+    rows = querystats.snapshot()
+    if rows:
+        df = pd.DataFrame(rows)
+        df['last_at'] = df['last_at'].map(lambda t: datetime.datetime.fromtimestamp(t).strftime('%H:%M:%S'))
+        sort_by = st.selectbox("Sort by", ["total_s", "p95_ms", "max_ms", "calls", "mb_fetched"])
+        top_n = st.number_input("Show top", min_value=5, max_value=500, value=25, step=5)
+        df = df.sort_values(sort_by, ascending=False).head(int(top_n))
+        st.dataframe(df, hide_index=True, use_container_width=True)
+    else:
+        st.info("No statements recorded yet.")
+
+    cache = querycache.cache_stats()
+    lookups = cache['hits'] + cache['misses']
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cache hit rate", f"{cache['hits'] / lookups:.0%}" if lookups else "-")
+    col2.metric("Cache entries", cache['entries'])
+    col3.metric("Cache size (MB)", f"{cache['bytes'] / (1024 * 1024):.1f} / {cache['max_bytes'] / (1024 * 1024):.0f}")
+    col4.metric("Evictions", cache['evictions'])
+
+    if st.button("Reset statistics"):
+        querystats.reset()
+        st.rerun()
@@ -1,14 +1,15 @@
 import streamlit as st
 from doff10.query import get_dofftable_data, get_dofftable_sum_by_date, get_dofftable_withname
+from payload import records_json
 
 # Define each page as a function
 def doff10():
     st.title("Dofftable Data Viewer")
     selected_date = st.date_input("Select Doff Date")
     if selected_date:
-        df, json_output = get_dofftable_data(selected_date)
+        df = get_dofftable_data(selected_date)
         st.subheader("JSON Output")
-        st.code(json_output, language="json")
+        st.code(records_json(df), language="json")
 
         # Add cards for q_code wise sum of netwt in each spell
         st.subheader("Q_Code Wise Netwt Sum by Spell")
@@ -57,15 +58,15 @@ def doff10():
     with col2:
         end_date = st.date_input("End Date", key="end_date")
     if start_date and end_date and start_date <= end_date:
-        sum_df, sum_json = get_dofftable_sum_by_date(start_date, end_date)
-        st.code(sum_json, language="json")
+        sum_df = get_dofftable_sum_by_date(start_date, end_date)
+        st.code(records_json(sum_df), language="json")
         st.dataframe(sum_df)
 
 
     st.subheader("Dofftable with Worker Name")
     selected_date3 = st.date_input("Select Doff Date3", key="selected_date")
     if selected_date3:
-        abc, json_output = get_dofftable_withname(selected_date3)
+        abc = get_dofftable_withname(selected_date3)
         st.dataframe(abc)
 
     
@@ -1,14 +1,13 @@
 import streamlit as st
-import plotly.express as px
 from doff10.query import get_doff_details, get_dofftable_data, get_dofftable_details_lastdoff
 
 def doff_details():
     st.subheader("Doff Details Summary")
     selected_date4 = st.date_input("Select Doff Date for Details", key="selected_date4")
     if selected_date4:
-        details_df, details_json = get_dofftable_details_lastdoff(selected_date4)
+        details_df = get_dofftable_details_lastdoff(selected_date4)
         # st.subheader("JSON Output")
-        # st.code(details_json, language="json")
+        # st.code(records_json(details_df), language="json")
         
         # Add spell dropdown filter
         if not details_df.empty:
@@ -57,6 +56,9 @@ def doff_details():
             st.subheader("Netwt by Spell")
             spell_summary = filtered_df.groupby('spell')['netwt'].sum().reset_index()
             
+            # plotly is only needed once there is something to chart
+            import plotly.express as px
+
             # Create plotly chart with data labels for spell netwt
             fig_spell = px.bar(spell_summary, x='spell', y='netwt', 
                               title='Network Weight by Spell',
@@ -152,7 +154,7 @@ def doff_details():
     # --- Show raw dofftable data with frame filter at the end ---
     st.markdown("---")
     st.subheader("Raw Doff Table Data (Frame-wise)")
-    dofftable_df, _ = get_dofftable_data(selected_date4)
+    dofftable_df = get_dofftable_data(selected_date4)
     if not dofftable_df.empty and 'frameno' in dofftable_df.columns:
         frame_list2 = sorted(dofftable_df['frameno'].unique().tolist())
         selected_frameno2 = st.selectbox("Select Frame No (Raw Table)", ["All Frames"] + [str(f) for f in frame_list2], key="frameno_filter_raw")
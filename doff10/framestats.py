@@ -0,0 +1,84 @@
+"""
+Array helpers for the SPG frame doff views.
+
+Kept free of Streamlit and database imports so they can be benchmarked on
+synthetic frames (see ``benchmarks/bench_spgframe.py``).
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from rounding import round_exact, row_sums
+
+
+def shift_normalized_pivot(df: pd.DataFrame):
+    """
+    Pivot doff details to one row per (frameno, quality) and one column per
+    doffdate, with each non-zero cell divided by the number of distinct
+    shifts that frame ran that quality on that date.
+
+    Args:
+        df: Rows with frameno, quality, doffdate, shift and total_netwt.
+
+    Returns:
+        (pivot_df, date_cols): the flat pivot (frameno, quality, dates...)
+        and the sorted list of date columns.
+    """
+    pivot = df.pivot_table(
+        index=['frameno', 'quality'],
+        columns='doffdate',
+        values='total_netwt',
+        aggfunc='sum',
+        fill_value=0
+    )
+    if 'shift' in df.columns:
+        shifts = (
+            df.groupby(['frameno', 'quality', 'doffdate'])['shift']
+            .nunique()
+            .unstack('doffdate')
+            .reindex(index=pivot.index, columns=pivot.columns)
+        )
+        divide = (shifts > 0) & (pivot != 0)
+        pivot = pivot.astype(float).where(~divide, round_exact(pivot / shifts))
+
+    pivot = pivot.reset_index()
+    pivot.columns.name = None
+    date_cols = sorted([col for col in pivot.columns if isinstance(col, (str, datetime.date)) and col not in ['frameno', 'quality']])
+    return pivot[['frameno', 'quality'] + date_cols], date_cols
+
+
+def _labels(values: pd.DataFrame, axis: int):
+    return values.index if axis == 1 else values.columns
+
+
+def nonzero_mean(values: pd.DataFrame, axis: int = 1) -> pd.Series:
+    """
+    Mean of the non-zero entries along ``axis`` (rounded to 2), 0 where there
+    are none. The Average the page always showed was
+    ``round(sum(vals) / len(vals), 2)`` on Python floats, so the sum is added
+    as ``sum`` adds and rounded as ``round`` rounds (``rounding``).
+    """
+    arr = values.to_numpy(dtype=float)
+    lines = arr if axis == 1 else arr.T
+    mask = lines != 0
+    counts = mask.sum(axis=1)
+    sums = row_sums(np.where(mask, lines, np.nan))
+    means = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+    return round_exact(pd.Series(means, index=_labels(values, axis)))
+
+
+def nonzero_min(values: pd.DataFrame, axis: int = 1) -> pd.Series:
+    """Minimum of the non-zero entries along ``axis``, 0 where there are none."""
+    arr = values.to_numpy(dtype=float)
+    mask = arr != 0
+    out = np.where(mask, arr, np.inf).min(axis=axis, initial=np.inf)
+    return pd.Series(np.where(np.isinf(out), 0, out), index=_labels(values, axis))
+
+
+def nonzero_max(values: pd.DataFrame, axis: int = 1) -> pd.Series:
+    """Maximum of the non-zero entries along ``axis``, 0 where there are none."""
+    arr = values.to_numpy(dtype=float)
+    mask = arr != 0
+    out = np.where(mask, arr, -np.inf).max(axis=axis, initial=-np.inf)
+    return pd.Series(np.where(np.isinf(out), 0, out), index=_labels(values, axis))
@@ -0,0 +1,118 @@
+"""
+Today's doff rows, kept current with incremental fetches.
+
+The Doff Details and Dofftable pages stay open through the shift and rerun
+all the time, and every run read each doff row of the day again. Rows are
+only appended during the day, with an increasing ``auto_id``, so the rows
+of the current day (active or not, with quality and worker names) are held
+once per process and a refresh at most every CHECK_SECONDS asks only for
+
+    rows with an auto_id above (newest held - OVERLAP_IDS)  (new doffs)
+    auto_ids of the day's rows that are inactive now         (is_active flips)
+
+auto_ids are handed out at insert but become visible at commit, so a row
+can appear after one with a higher auto_id has already been read; the
+OVERLAP_IDS ids below the newest one held are read again on every check
+and de-duplicated on auto_id, keeping the fresh copy. A row committed
+later still is picked up by the next full read.
+
+Every FULL_RELOAD_SECONDS, and when the date rolls over, the day is read
+whole again, which also picks up rows whose weight or quality was edited.
+Other days are not held; their queries run as before.
+"""
+import datetime
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+
+from statements import register, read_frame, Date, Integer
+
+CHECK_SECONDS = 10
+OVERLAP_IDS = 200
+FULL_RELOAD_SECONDS = 15 * 60
+
+register("doff10.liveday.rows_after", """
+    SELECT d.auto_id, d.spell, d.frameno, d.q_code, wqm.quality_name, d.ebno,
+           CONCAT(wm.worker_name, " ", wm.last_name) AS name, d.netwt, d.is_active
+    FROM dofftable d
+    LEFT JOIN weaving_quality_master wqm ON wqm.quality_code = d.q_code AND d.company_id = wqm.company_id
+    LEFT JOIN worker_master wm ON wm.eb_no = d.ebno AND wm.company_id = d.company_id
+    WHERE d.company_id = 2
+      AND d.doffdate = :selected_date
+      AND d.auto_id > :after_id
+    ORDER BY d.auto_id
+    """, selected_date=Date, after_id=Integer)
+
+register("doff10.liveday.inactive_ids", """
+    SELECT auto_id
+    FROM dofftable
+    WHERE company_id = 2
+      AND doffdate = :selected_date
+      AND COALESCE(is_active, 0) <> 1
+    """, selected_date=Date)
+
+_lock = threading.Lock()
+_day: Optional[datetime.date] = None
+_rows: Optional[pd.DataFrame] = None    # every row of _day seen so far, by auto_id
+_checked_at = 0.0
+_full_at = 0.0
+
+
+def is_live(selected_date) -> bool:
+    """Whether ``selected_date`` is today, the day served from the held rows."""
+    return pd.Timestamp(selected_date).date() == datetime.date.today()
+
+
+def invalidate(full: bool = False) -> None:
+    """Check for new rows on next access instead of waiting CHECK_SECONDS; with ``full``, read the day whole."""
+    global _checked_at, _rows
+    with _lock:
+        _checked_at = 0.0
+        if full:
+            _rows = None
+
+
+def _fetch(day: datetime.date, after_id: int) -> pd.DataFrame:
+    df = read_frame("doff10.liveday.rows_after", selected_date=day, after_id=after_id)
+    # A duplicated worker_master eb_no must not duplicate doffs
+    return df.drop_duplicates(subset=["auto_id"], keep="first")
+
+
+def _refresh(day: datetime.date) -> None:
+    """Bring the held rows up to date; caller holds _lock."""
+    global _day, _rows, _checked_at, _full_at
+    now = time.monotonic()
+    if _day != day or _rows is None or now - _full_at > FULL_RELOAD_SECONDS:
+        rows = _fetch(day, 0)
+        rows["active"] = rows["is_active"] == 1
+        _day, _rows, _full_at = day, rows, now
+    else:
+        after_id = max(int(_rows["auto_id"].max()) - OVERLAP_IDS, 0) if not _rows.empty else 0
+        new = _fetch(day, after_id)
+        rows = (
+            pd.concat([_rows, new], ignore_index=True)
+            .drop_duplicates(subset=["auto_id"], keep="last")
+            .sort_values("auto_id", kind="stable")
+            .reset_index(drop=True)
+        )
+        # Read after the new rows, so every row held is checked against it
+        inactive = read_frame("doff10.liveday.inactive_ids", selected_date=day)["auto_id"]
+        rows["active"] = ~rows["auto_id"].isin(inactive)
+        rows["is_active"] = rows["active"].astype(int)
+        _rows = rows
+    _checked_at = now
+
+
+def rows(selected_date) -> pd.DataFrame:
+    """
+    Active doff rows of today (``selected_date``) by auto_id: auto_id,
+    spell, frameno, q_code, quality_name, ebno, name and netwt.
+    """
+    day = pd.Timestamp(selected_date).date()
+    with _lock:
+        if _day != day or _rows is None or time.monotonic() - _checked_at > CHECK_SECONDS:
+            _refresh(day)
+        held = _rows
+    return held[held["active"]].drop(columns=["is_active", "active"]).reset_index(drop=True)
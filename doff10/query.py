@@ -1,71 +1,98 @@
+import threading
+
 import pandas as pd
-from db import engine
+from querycache import cached_query, ttl_for_args
+from statements import register, read_frame, Date, String
+from doff10 import liveday, snapshots
 
-def get_dofftable_data(selected_date):
-    query = f"""
+
+def _quality(rows):
+    """CONCAT(q_code, "-", quality_name): NULL when either part is."""
+    known = rows["q_code"].notna() & rows["quality_name"].notna()
+    return (rows["q_code"].astype(str) + "-" + rows["quality_name"].astype(str)).where(known, None).astype(object)
+
+
+# Today's views are built from the rows doff10/liveday.py keeps current; a
+# rerun then only costs an incremental fetch, so their results are kept for
+# its check interval rather than the usual TTL for today.
+def _live_ttl(args, kwargs):
+    selected = args[0] if args else next(iter(kwargs.values()))
+    return liveday.CHECK_SECONDS if liveday.is_live(selected) else ttl_for_args(args, kwargs)
+
+register("doff10.get_dofftable_data", """
         select frameno, q_code, quality_name, spell, netwt
         from dofftable d
         left join weaving_quality_master wqm on wqm.quality_code = d.q_code and d.company_id = wqm.company_id
-        where d.doffdate = '{selected_date}'
+        where d.doffdate = :selected_date
           and d.company_id = 2
           and d.is_active = 1
         order by doffdate, auto_id desc
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, selected_date=Date)
 
-def get_dofftable_sum_by_date(start_date, end_date):
-    query = f"""
+@cached_query(ttl=_live_ttl)
+def get_dofftable_data(selected_date):
+    if liveday.is_live(selected_date):
+        rows = liveday.rows(selected_date)
+        return rows.iloc[::-1][["frameno", "q_code", "quality_name", "spell", "netwt"]].reset_index(drop=True)
+    df = read_frame("doff10.get_dofftable_data", selected_date=selected_date)
+    return df
+
+register("doff10.get_dofftable_sum_by_date", """
         SELECT 
             doffdate, 
             ROUND(SUM(netwt), 0) as total_netwt 
         FROM 
             dofftable d 
         WHERE 
-            doffdate BETWEEN '{start_date}' AND '{end_date}' 
+            doffdate BETWEEN :start_date AND :end_date 
             AND company_id = 2 
             AND is_active = 1 
         GROUP BY 
             doffdate  
         ORDER BY 
             doffdate DESC;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, start_date=Date, end_date=Date)
 
-def get_dofftable_withname(selected_date3):
-    query = f""" select d.frameno, d.spell ,  CONCAT(d.q_code, "-",wqm.quality_name) as quality , d.ebno ,concat(wm.worker_name," ",wm.last_name) as name, d.netwt  from dofftable d 
+@cached_query
+def get_dofftable_sum_by_date(start_date, end_date):
+    df = read_frame("doff10.get_dofftable_sum_by_date", start_date=start_date, end_date=end_date)
+    return df
+
+register("doff10.get_dofftable_withname", """ select d.frameno, d.spell ,  CONCAT(d.q_code, "-",wqm.quality_name) as quality , d.ebno ,concat(wm.worker_name," ",wm.last_name) as name, d.netwt  from dofftable d 
 left join weaving_quality_master wqm on wqm.quality_code = d.q_code and d.company_id = wqm.company_id
 left join worker_master wm on wm.eb_no = d.ebno and wm.company_id = d.company_id
-where d.company_id =2 and d.doffdate = '{selected_date3}' and d.is_active = 1;
-    """
-    with engine.connect() as conn:
-        abc = pd.read_sql(query, conn)
-    return abc, abc.to_json(orient="records")
+where d.company_id =2 and d.doffdate = :selected_date3 and d.is_active = 1;
+    """, selected_date3=Date)
 
-def get_doff_details(selected_date3):
-    query = f""" select 
+@cached_query(ttl=_live_ttl)
+def get_dofftable_withname(selected_date3):
+    if liveday.is_live(selected_date3):
+        rows = liveday.rows(selected_date3)
+        return rows.assign(quality=_quality(rows))[["frameno", "spell", "quality", "ebno", "name", "netwt"]]
+    abc = read_frame("doff10.get_dofftable_withname", selected_date3=selected_date3)
+    return abc
+
+register("doff10.get_doff_details", """ select 
 d.spell ,
 d.frameno,  
 CONCAT(d.q_code, "-", wqm.quality_name) as quality , 
 round((sum(d.netwt)),0) as netwt,
 count(*) as num_of_doff,
-round(((sum(d.netwt))/(count(*))),2) as averagewt
+round(((sum(d.netwt))/(count(*))),2) as averagewt,
 max(d.netwt) as maxwt,
 min(d.netwt) as minwt
 from dofftable d 
 left join weaving_quality_master wqm on wqm.quality_code = d.q_code and d.company_id = wqm.company_id
-where d.company_id =2 and d.doffdate = '{selected_date3}' and d.is_active = 1
+where d.company_id =2 and d.doffdate = :selected_date3 and d.is_active = 1
 group by  d.spell ,d.frameno, CONCAT(d.q_code, "-",wqm.quality_name) order by spell, cast(frameno as unsigned);
-    """
-    with engine.connect() as conn:
-        abc = pd.read_sql(query, conn)
-    return abc, abc.to_json(orient="records")
+    """, selected_date3=Date)
 
-def get_dofftable_details(start_date, end_date):
-    query = f"""
+@cached_query
+def get_doff_details(selected_date3):
+    abc = read_frame("doff10.get_doff_details", selected_date3=selected_date3)
+    return abc
+
+register("doff10.get_dofftable_details", """
                SELECT 
             DATE(doffdate) as doffdate, 
             substr(spell,1,1) as shift,
@@ -78,7 +105,7 @@ def get_dofftable_details(start_date, end_date):
             dofftable d 
             left join weaving_quality_master wqm on wqm.quality_code = d.q_code and d.company_id = wqm.company_id
         WHERE 
-            doffdate BETWEEN '{start_date}' AND '{end_date}' 
+            doffdate BETWEEN :start_date AND :end_date 
             AND d.company_id = 2 
             AND is_active = 1 
         GROUP BY 
@@ -94,13 +121,27 @@ def get_dofftable_details(start_date, end_date):
             frameno ,
             q_code,
                quality_name DESC;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, start_date=Date, end_date=Date)
 
-def get_dofftable_details_lastdoff(selected_date3):
-    query = f"""
+# Closed months come from snapshots of this same statement run per month
+# (doff10/snapshots.py); its groups never span days, so a day range of the
+# month result is what the statement returns for those days.
+snapshots.view("details", "doff10.get_dofftable_details", "doffdate")
+
+@cached_query
+def get_dofftable_details(start_date, end_date):
+    closed, opened = snapshots.split(start_date, end_date)
+    if closed is None:
+        df = read_frame("doff10.get_dofftable_details", start_date=start_date, end_date=end_date)
+        return df
+    parts = [snapshots.rows("details", *closed)]
+    if opened is not None:
+        df = read_frame("doff10.get_dofftable_details", start_date=opened[0], end_date=opened[1])
+        parts.append(df.assign(doffdate=snapshots.dates(df["doffdate"])))
+    # Both parts are ordered by date first and the open one comes later
+    return pd.concat(parts, ignore_index=True)
+
+register("doff10.get_dofftable_details_lastdoff", """
 SELECT 
   d.spell,
   d.frameno,
@@ -117,22 +158,142 @@ LEFT JOIN weaving_quality_master wqm
 LEFT JOIN (
     SELECT dt.spell, dt.frameno, dt.doffdate, MAX(dt.auto_id) AS latest_doffid
     FROM dofftable dt
-    WHERE dt.company_id = 2 AND dt.doffdate = '{selected_date3}' AND dt.is_active = 1
+    WHERE dt.company_id = 2 AND dt.doffdate = :selected_date3 AND dt.is_active = 1
     GROUP BY dt.spell, dt.frameno, dt.doffdate
 ) latest_ids ON latest_ids.spell = d.spell 
              AND latest_ids.frameno = d.frameno 
              AND latest_ids.doffdate = d.doffdate
 LEFT JOIN dofftable latest_doffs ON latest_doffs.auto_id = latest_ids.latest_doffid
-WHERE d.company_id = 2 AND d.doffdate = '{selected_date3}' AND d.is_active = 1
+WHERE d.company_id = 2 AND d.doffdate = :selected_date3 AND d.is_active = 1
 GROUP BY d.spell, d.frameno, CONCAT(d.q_code, "-", wqm.quality_name), latest_doffs.netwt
 ORDER BY d.spell, CAST(d.frameno AS UNSIGNED);
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, selected_date3=Date)
 
-def get_frame_quality_details(start_date, end_date, frameno, q_code):
-    query = f"""
+# The same report for every day of a month, with the day added to the
+# grouping and the latest-doff lookup
+register("doff10.snapshots.lastdoff", """
+SELECT 
+  d.doffdate,
+  d.spell,
+  d.frameno,
+  CONCAT(d.q_code, "-", wqm.quality_name) AS quality, 
+  ROUND(SUM(d.netwt), 0) AS netwt,
+  COUNT(*) AS num_of_doff,
+  ROUND(SUM(d.netwt) / COUNT(*), 2) AS averagewt,
+  MAX(d.netwt) AS maxwt,
+  MIN(d.netwt) AS minwt,
+  latest_doffs.netwt AS l_dwt
+FROM dofftable d
+LEFT JOIN weaving_quality_master wqm 
+  ON wqm.quality_code = d.q_code AND d.company_id = wqm.company_id
+LEFT JOIN (
+    SELECT dt.spell, dt.frameno, dt.doffdate, MAX(dt.auto_id) AS latest_doffid
+    FROM dofftable dt
+    WHERE dt.company_id = 2 AND dt.doffdate BETWEEN :start_date AND :end_date AND dt.is_active = 1
+    GROUP BY dt.spell, dt.frameno, dt.doffdate
+) latest_ids ON latest_ids.spell = d.spell 
+             AND latest_ids.frameno = d.frameno 
+             AND latest_ids.doffdate = d.doffdate
+LEFT JOIN dofftable latest_doffs ON latest_doffs.auto_id = latest_ids.latest_doffid
+WHERE d.company_id = 2 AND d.doffdate BETWEEN :start_date AND :end_date AND d.is_active = 1
+GROUP BY d.doffdate, d.spell, d.frameno, CONCAT(d.q_code, "-", wqm.quality_name), latest_doffs.netwt
+ORDER BY d.doffdate, d.spell, CAST(d.frameno AS UNSIGNED);
+    """, start_date=Date, end_date=Date)
+snapshots.view("lastdoff", "doff10.snapshots.lastdoff", "doffdate")
+
+# Today's report for single frames; every group and the latest-doff lookup
+# sit inside one frame, so a frame's rows here are exactly its rows above.
+register("doff10.get_dofftable_details_lastdoff.frame", """
+SELECT 
+  d.spell,
+  d.frameno,
+  CONCAT(d.q_code, "-", wqm.quality_name) AS quality, 
+  ROUND(SUM(d.netwt), 0) AS netwt,
+  COUNT(*) AS num_of_doff,
+  ROUND(SUM(d.netwt) / COUNT(*), 2) AS averagewt,
+  MAX(d.netwt) AS maxwt,
+  MIN(d.netwt) AS minwt,
+  latest_doffs.netwt AS l_dwt
+FROM dofftable d
+LEFT JOIN weaving_quality_master wqm 
+  ON wqm.quality_code = d.q_code AND d.company_id = wqm.company_id
+LEFT JOIN (
+    SELECT dt.spell, dt.frameno, dt.doffdate, MAX(dt.auto_id) AS latest_doffid
+    FROM dofftable dt
+    WHERE dt.company_id = 2 AND dt.doffdate = :selected_date3 AND dt.frameno = :frameno AND dt.is_active = 1
+    GROUP BY dt.spell, dt.frameno, dt.doffdate
+) latest_ids ON latest_ids.spell = d.spell 
+             AND latest_ids.frameno = d.frameno 
+             AND latest_ids.doffdate = d.doffdate
+LEFT JOIN dofftable latest_doffs ON latest_doffs.auto_id = latest_ids.latest_doffid
+WHERE d.company_id = 2 AND d.doffdate = :selected_date3 AND d.frameno = :frameno AND d.is_active = 1
+GROUP BY d.spell, d.frameno, CONCAT(d.q_code, "-", wqm.quality_name), latest_doffs.netwt
+ORDER BY d.spell, CAST(d.frameno AS UNSIGNED);
+    """, selected_date3=Date, frameno=String)
+
+# Today's report is kept with the live rows it was built from. On a rerun
+# only the frames whose live rows changed since are queried again (all of
+# them through the day's query past LIVE_FRAME_QUERIES), so the figures are
+# still MySQL's own.
+LIVE_FRAME_QUERIES = 8
+_LIVE_COLUMNS = ["auto_id", "spell", "frameno", "q_code", "quality_name", "netwt"]
+
+_live_lock = threading.Lock()
+_live_lastdoff = None    # (day, live rows, report)
+
+
+def _changed_frames(before, after):
+    """framenos with a row added, removed or changed between two sets of live rows."""
+    merged = before.merge(after, how="outer", indicator=True)
+    return list(merged.loc[merged["_merge"] != "both", "frameno"].drop_duplicates())
+
+
+def _lastdoff_order(df):
+    """ORDER BY spell, CAST(frameno AS UNSIGNED), keeping the order of ties."""
+    frame = pd.to_numeric(df["frameno"].astype(str).str.extract(r"^\s*(\d+)", expand=False), errors="coerce").fillna(0)
+    keys = pd.DataFrame({
+        "spell_known": df["spell"].notna(),
+        "spell": df["spell"].fillna(""),
+        "frame_known": df["frameno"].notna(),
+        "frame": frame,
+    }, index=df.index)
+    order = keys.sort_values(list(keys.columns), kind="stable").index
+    return df.loc[order].reset_index(drop=True)
+
+
+def _live_details_lastdoff(selected_date3):
+    global _live_lastdoff
+    day = pd.Timestamp(selected_date3).date()
+    rows = liveday.rows(selected_date3)[_LIVE_COLUMNS]
+    with _live_lock:
+        report = None
+        if _live_lastdoff is not None and _live_lastdoff[0] == day:
+            _, held, previous = _live_lastdoff
+            changed = _changed_frames(held, rows)
+            if not changed:
+                return previous
+            if len(changed) <= LIVE_FRAME_QUERIES and all(pd.notna(f) for f in changed):
+                parts = [previous[~previous["frameno"].isin(changed)]] + [
+                    read_frame("doff10.get_dofftable_details_lastdoff.frame", selected_date3=day, frameno=f)
+                    for f in changed
+                ]
+                report = _lastdoff_order(pd.concat(parts, ignore_index=True))
+        if report is None:
+            report = read_frame("doff10.get_dofftable_details_lastdoff", selected_date3=day)
+        _live_lastdoff = (day, rows, report)
+        return report
+
+@cached_query(ttl=_live_ttl)
+def get_dofftable_details_lastdoff(selected_date3):
+    if liveday.is_live(selected_date3):
+        return _live_details_lastdoff(selected_date3)
+    closed, _ = snapshots.split(selected_date3, selected_date3)
+    if closed is not None:
+        return snapshots.rows("lastdoff", *closed).drop(columns="doffdate")
+    df = read_frame("doff10.get_dofftable_details_lastdoff", selected_date3=selected_date3)
+    return df
+
+register("doff10.get_frame_quality_details", """
            select date(d.doffdate) as "Date", 
            substr(d.spell ,1,1) as "Shift", d.ebno as "EBNO"
            ,count(d.netwt) as "NumberOffDoff", 
@@ -142,12 +303,41 @@ def get_frame_quality_details(start_date, end_date, frameno, q_code):
            min(d.netwt)  as "MinDoff"
            from dofftable d 
            where d.company_id =2 
-           and d.doffdate between '{start_date}' and '{end_date}' 
-           and d.frameno = {frameno} and d.q_code = '{q_code}'
+           and d.doffdate between :start_date and :end_date 
+           and d.frameno = :frameno and d.q_code = :q_code
            and d.is_active =1
            group by d.doffdate, substr(d.spell ,1,1), d.ebno
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, start_date=Date, end_date=Date, frameno=String, q_code=String)
 
+# Every frame and quality of a month; the report picks one of each
+register("doff10.snapshots.frame_quality", """
+           select date(d.doffdate) as "Date", 
+           substr(d.spell ,1,1) as "Shift", d.ebno as "EBNO"
+           ,count(d.netwt) as "NumberOffDoff", 
+           round(sum(d.netwt),0) as "Production",
+           round(avg(d.netwt),0) as "AvgDoffWt", 
+           max(d.netwt) as "MaxDoff", 
+           min(d.netwt)  as "MinDoff",
+           d.frameno, d.q_code
+           from dofftable d 
+           where d.company_id =2 
+           and d.doffdate between :start_date and :end_date 
+           and d.is_active =1
+           group by d.doffdate, substr(d.spell ,1,1), d.ebno, d.frameno, d.q_code
+           order by d.doffdate, substr(d.spell ,1,1), d.ebno
+    """, start_date=Date, end_date=Date)
+snapshots.view("frame_quality", "doff10.snapshots.frame_quality", "Date")
+
+@cached_query
+def get_frame_quality_details(start_date, end_date, frameno, q_code):
+    closed, opened = snapshots.split(start_date, end_date)
+    if closed is None:
+        df = read_frame("doff10.get_frame_quality_details", start_date=start_date, end_date=end_date, frameno=frameno, q_code=q_code)
+        return df
+    rows = snapshots.rows("frame_quality", *closed)
+    picked = (rows["frameno"].astype(str) == str(frameno)) & (rows["q_code"].astype(str) == str(q_code))
+    parts = [rows[picked].drop(columns=["frameno", "q_code"])]
+    if opened is not None:
+        df = read_frame("doff10.get_frame_quality_details", start_date=opened[0], end_date=opened[1], frameno=frameno, q_code=q_code)
+        parts.append(df.assign(Date=snapshots.dates(df["Date"])))
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,194 @@
+"""
+Per-month Parquet snapshots of closed months of doff reports.
+
+Doff rows stop changing once a month has been closed, yet the frame
+analysis pages re-read them from MySQL for every range that reaches back
+into earlier months. Each report that can be served this way registers a
+``view``: a statement returning its rows for a whole month, grouped per day
+exactly as the report groups them, with MySQL's own ROUND()ed values. Its
+result for a closed month is written once to
+``<MIS_SNAPSHOT_DIR>/dofftable-v2/<view>/<YYYY-MM>.parquet`` (zstd
+compressed) and read back memory-mapped for the days asked for; only the
+part of a range in still-open months is left to the database. Nothing is
+re-aggregated or re-rounded in Python.
+
+A month counts as closed CLOSED_AFTER_DAYS days after it ends, leaving time
+for late corrections. Snapshots are built on first use. If a closed month
+is corrected anyway, rebuild it:
+
+    python -m doff10.snapshots                      # list the snapshots
+    python -m doff10.snapshots --rebuild 2026-08    # re-read months from the database
+
+Callers ``split`` a range into its closed and open parts, take the closed
+part from ``rows`` and run their SQL for the open part only. pyarrow is
+optional: without it every range is open.
+"""
+import argparse
+import datetime
+import importlib.util
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from statements import read_frame
+
+CLOSED_AFTER_DAYS = 7
+SNAPSHOT_DIR = os.getenv("MIS_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".snapshots"))
+_TABLE_DIR = "dofftable-v2"
+
+_lock = threading.Lock()
+_views: Dict[str, Tuple[str, str]] = {}    # view -> (statement, date column)
+
+
+def view(name: str, statement: str, date_column: str) -> None:
+    """
+    Snapshot the registered ``statement`` as ``name``. It is run with
+    ``:start_date`` / ``:end_date`` spanning a month and must return
+    ``date_column`` (the day each row belongs to) with every row.
+    """
+    _views[name] = (statement, date_column)
+
+
+def available() -> bool:
+    # pyarrow itself is imported on first read, not with the page
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def _month_end(month: datetime.date) -> datetime.date:
+    return _next_month(month) - datetime.timedelta(days=1)
+
+
+def open_from(today: Optional[datetime.date] = None) -> datetime.date:
+    """First day of the earliest month that is not closed yet."""
+    today = today or datetime.date.today()
+    month = _month_start(today)
+    previous = _month_start(month - datetime.timedelta(days=1))
+    return previous if today < month + datetime.timedelta(days=CLOSED_AFTER_DAYS) else month
+
+
+def split(start_date, end_date) -> Tuple[Optional[tuple], Optional[tuple]]:
+    """
+    (closed, open) parts of start_date..end_date as (start, end) date pairs,
+    None where a part is empty. Without pyarrow the whole range is open.
+    """
+    start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+    if start > end:
+        return None, None
+    boundary = open_from() if available() else start
+    closed = (start, min(end, boundary - datetime.timedelta(days=1))) if start < boundary else None
+    opened = (max(start, boundary), end) if end >= boundary else None
+    return closed, opened
+
+
+def dates(values: pd.Series) -> pd.Series:
+    """``datetime.date`` objects, as DATE columns come back from MySQL."""
+    return pd.to_datetime(values).dt.date.astype(object)
+
+
+def _path(name: str, month: datetime.date) -> str:
+    return os.path.join(SNAPSHOT_DIR, _TABLE_DIR, name, f"{month:%Y-%m}.parquet")
+
+
+def build_month(name: str, month: datetime.date) -> str:
+    """Run a view's statement for one month and (re)write its snapshot file."""
+    statement, date_column = _views[name]
+    month = _month_start(month)
+    df = read_frame(statement, start_date=month, end_date=_month_end(month))
+    df[date_column] = dates(df[date_column])
+    path = _path(name, month)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+def _read_month(name: str, month: datetime.date, start_date: datetime.date, end_date: datetime.date) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    path = _path(name, month)
+    if not os.path.exists(path):
+        with _lock:
+            if not os.path.exists(path):
+                build_month(name, month)
+    date_column = _views[name][1]
+    filters = None
+    if start_date > month or end_date < _month_end(month):
+        filters = [(date_column, ">=", start_date), (date_column, "<=", end_date)]
+    return pq.read_table(path, memory_map=True, filters=filters).to_pandas()
+
+
+def _months(start_date: datetime.date, end_date: datetime.date) -> List[datetime.date]:
+    months, month = [], _month_start(start_date)
+    while month <= end_date:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def rows(name: str, start_date, end_date) -> pd.DataFrame:
+    """
+    The view's rows dated start_date..end_date from the snapshots, in the
+    statement's order, building missing ones; the range must lie in closed
+    months.
+    """
+    start_date, end_date = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+    if end_date >= open_from():
+        raise ValueError(f"{end_date} is in a month that is still open")
+    parts = [
+        _read_month(name, month, max(start_date, month), min(end_date, _month_end(month)))
+        for month in _months(start_date, end_date)
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+
+def snapshots() -> List[Tuple[str, str, int, int]]:
+    """(view, month, rows, bytes) of every snapshot file."""
+    import pyarrow.parquet as pq
+
+    out = []
+    for name in sorted(_views):
+        directory = os.path.join(SNAPSHOT_DIR, _TABLE_DIR, name)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".parquet"):
+                path = os.path.join(directory, filename)
+                out.append((name, filename[:-len(".parquet")], pq.ParquetFile(path).metadata.num_rows, os.path.getsize(path)))
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="List or rebuild the closed-month doff report snapshots.")
+    parser.add_argument("--rebuild", nargs="+", metavar="YYYY-MM", help="months to re-read from the database")
+    args = parser.parse_args(argv)
+    if not available():
+        print("pyarrow is not installed; doff reports are always read from the database")
+        return 1
+    # The views are registered next to the report SQL they mirror
+    import doff10.query  # noqa: F401
+
+    for month in args.rebuild or []:
+        for name in sorted(_views):
+            print(f"rebuilt {build_month(name, datetime.date.fromisoformat(f'{month}-01'))}")
+    for name, month, count, size in snapshots():
+        print(f"{name:<14} {month}  {count:>9,} rows  {size / 1024:>9,.0f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
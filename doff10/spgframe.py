@@ -2,6 +2,7 @@ import streamlit as st
 import datetime
 import pandas as pd
 from doff10.query import get_dofftable_details, get_frame_quality_details
+from doff10.framestats import shift_normalized_pivot, nonzero_mean, nonzero_min, nonzero_max
 
 def spgframe_view():
     st.title("SPG Frame Doff Table")
@@ -17,7 +18,7 @@ def spgframe_view():
         end_date = st.date_input("End Date", value=yesterday, min_value=start_date, max_value=yesterday, key="spgframe_end_date")
 
     # Fetch data
-    df, _ = get_dofftable_details(start_date, end_date)
+    df = get_dofftable_details(start_date, end_date)
     if not df.empty:
         # Create a 'quality' column for display (concatenated q_code-quality_name if available)
         if 'q_code' in df.columns and 'quality_name' in df.columns:
@@ -39,48 +40,15 @@ def spgframe_view():
             st.markdown('**Average Netwt by Quality and Shift**')
             st.dataframe(avg_pivot, hide_index=True)
 
-        # Pivot the table: frameno, quality, then date columns
-        pivot_df = filtered_df.pivot_table(
-            index=['frameno', 'quality'],
-            columns='doffdate',
-            values='total_netwt',
-            aggfunc='sum',
-            fill_value=0
-        )
-        # Reset index to get frameno and quality as columns
-        pivot_df = pivot_df.reset_index()
-        # Sort columns: frameno, quality, then dates in order
-        date_cols = sorted([col for col in pivot_df.columns if isinstance(col, (str, datetime.date)) and col not in ['frameno', 'quality']])
-        ordered_cols = ['frameno', 'quality'] + date_cols
-        pivot_df = pivot_df[ordered_cols]
-
-        # For each (frameno, quality, date), divide netwt by number of shifts that frame ran for that quality on that date
-        for date_col in date_cols:
-            # For each row, count how many shifts for this frameno, quality, date
-            for idx, row in pivot_df.iterrows():
-                frameno = row['frameno']
-                quality = row['quality']
-                # Count unique shifts in filtered_df for this frameno, quality, date
-                mask = (
-                    (filtered_df['frameno'] == frameno) &
-                    (filtered_df['quality'] == quality) &
-                    (filtered_df['doffdate'] == date_col)
-                )
-                n_shifts = filtered_df[mask]['shift'].nunique() if 'shift' in filtered_df.columns else 1
-                if n_shifts > 0 and row[date_col] != 0:
-                    pivot_df.at[idx, date_col] = round(row[date_col] / n_shifts, 2)
+        # Pivot the table: frameno, quality, then date columns, with each cell
+        # divided by the number of shifts that frame ran that quality on that date
+        pivot_df, date_cols = shift_normalized_pivot(filtered_df)
 
         # Add Average, Max, Min columns at the end
         value_cols = date_cols
-        def avg_ignore_zeros(row):
-            vals = [v for v in row if v != 0]
-            return round(sum(vals)/len(vals), 2) if vals else 0
-        def min_ignore_zeros(row):
-            vals = [v for v in row if v != 0]
-            return min(vals) if vals else 0
-        pivot_df['Average'] = pivot_df[value_cols].apply(avg_ignore_zeros, axis=1)
+        pivot_df['Average'] = nonzero_mean(pivot_df[value_cols], axis=1)
         pivot_df['Max'] = pivot_df[value_cols].max(axis=1)
-        pivot_df['Min'] = pivot_df[value_cols].apply(min_ignore_zeros, axis=1)
+        pivot_df['Min'] = nonzero_min(pivot_df[value_cols], axis=1)
         st.dataframe(pivot_df, hide_index=True)
 
         # --- Frameno filter and shift-wise production table ---
@@ -99,18 +67,9 @@ def spgframe_view():
                 st.markdown(f'**Shift-wise Production for Frame {selected_frameno}**')
                 # Add average, min, max rows (ignore 0 values)
                 data_cols = [col for col in shiftwise_pivot.columns if col != 'doffdate']
-                def avg_ignore_zeros_col(col):
-                    vals = [v for v in col if v != 0]
-                    return round(sum(vals)/len(vals), 2) if vals else 0
-                def min_ignore_zeros_col(col):
-                    vals = [v for v in col if v != 0]
-                    return min(vals) if vals else 0
-                def max_ignore_zeros_col(col):
-                    vals = [v for v in col if v != 0]
-                    return max(vals) if vals else 0
-                avg_row = {c: avg_ignore_zeros_col(shiftwise_pivot[c]) for c in data_cols}
-                min_row = {c: min_ignore_zeros_col(shiftwise_pivot[c]) for c in data_cols}
-                max_row = {c: max_ignore_zeros_col(shiftwise_pivot[c]) for c in data_cols}
+                avg_row = nonzero_mean(shiftwise_pivot[data_cols], axis=0).to_dict()
+                min_row = nonzero_min(shiftwise_pivot[data_cols], axis=0).to_dict()
+                max_row = nonzero_max(shiftwise_pivot[data_cols], axis=0).to_dict()
                 avg_row['doffdate'] = 'Average'
                 min_row['doffdate'] = 'Min'
                 max_row['doffdate'] = 'Max'
@@ -132,7 +91,7 @@ def spgframe_view():
                 else:
                     q_code = selected_quality
                     quality_name = ''
-                details_df, _ = get_frame_quality_details(start_date, end_date, selected_frameno, q_code)
+                details_df = get_frame_quality_details(start_date, end_date, selected_frameno, q_code)
                 if not details_df.empty:
                     st.markdown(f'**Frame-Quality Details for Frame {selected_frameno}, Quality {selected_quality}**')
                     st.dataframe(details_df, hide_index=True)
@@ -0,0 +1,97 @@
+"""
+Shift comparison for the low-producer "Details" tables.
+
+For one worker the pages show, per (date, shift, machine) they ran, their own
+efficiency next to the mean efficiency of everybody who ran that machine on
+that date in shift A, B and C. The shift means are computed once with a
+grouped pivot and joined back to the worker's rows instead of scanning the
+whole frame three times per row.
+
+Efficiency values of 0 or null are ignored everywhere, as on the pages.
+"""
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from rounding import round_exact
+
+
+SHIFTS = ['A', 'B', 'C']
+# Value columns of a details table, as shown on the pages
+SHIFT_EFF_VALUE_COLS = ['Eff', 'EffA', 'EffB', 'EffC', 'AvgEff']
+
+
+def shift_eff_table(df: pd.DataFrame, date_col: str, machine_col: str, shift_col: str, eff_col: str) -> pd.DataFrame:
+    """
+    Mean positive efficiency per (date, machine) for each shift.
+
+    Returns:
+        One row per (date, machine) with EffA, EffB, EffC and AvgEff, the
+        mean of the shift values that exist. Missing shifts are NaN.
+    """
+    pos = df.loc[df[eff_col] > 0, [date_col, machine_col, shift_col, eff_col]]
+    table = round_exact(
+        pos.groupby([date_col, machine_col, shift_col])[eff_col]
+        .mean()
+        .unstack(shift_col)
+        .reindex(columns=SHIFTS)
+    )
+    table.columns = ['Eff' + s for s in SHIFTS]
+    table['AvgEff'] = round_exact(table[['EffA', 'EffB', 'EffC']].mean(axis=1))
+    return table.reset_index()
+
+
+def compare_with_shifts(
+    worker_df: pd.DataFrame,
+    reference_df: pd.DataFrame,
+    date_col: str,
+    shift_col: str,
+    machine_col: str,
+    eff_col: str,
+    extra_cols: Iterable[str] = (),
+) -> pd.DataFrame:
+    """
+    Worker efficiency per (date, shift, machine) alongside all-worker shift means.
+
+    Args:
+        worker_df: Rows of the selected worker.
+        reference_df: Rows of every worker the shift means are taken from.
+        extra_cols: Worker columns carried along (first non-null per group).
+
+    Returns:
+        date, shift, machine, extra columns, Eff, EffA, EffB, EffC, AvgEff.
+    """
+    keys = [date_col, shift_col, machine_col]
+    extra_cols = [c for c in extra_cols if c in worker_df.columns]
+    own = worker_df[keys + extra_cols].assign(Eff=worker_df[eff_col].where(worker_df[eff_col] > 0))
+    own = own.groupby(keys, as_index=False).agg(
+        Eff=('Eff', 'mean'), **{c: (c, 'first') for c in extra_cols}
+    )
+    own['Eff'] = round_exact(own['Eff'])
+
+    # Only the (date, machine) pairs the worker touched need shift means
+    touched = own[[date_col, machine_col]].drop_duplicates()
+    reference = reference_df.merge(touched, on=[date_col, machine_col])
+    shifts = shift_eff_table(reference, date_col, machine_col, shift_col, eff_col)
+    return own.merge(shifts, on=[date_col, machine_col], how='left')
+
+
+def with_average_row(result_df: pd.DataFrame, value_cols: Iterable[str], labels: dict, blank=None) -> pd.DataFrame:
+    """Append an 'Avg' style summary row holding the mean of each value column."""
+    if result_df.empty:
+        return result_df
+    avg_row = dict(labels)
+    for col in value_cols:
+        avg = pd.to_numeric(result_df[col], errors='coerce').mean()
+        avg_row[col] = round(float(avg), 2) if pd.notna(avg) else blank
+    return pd.concat([result_df, pd.DataFrame([avg_row])], ignore_index=True)
+
+
+def fill_blanks(df: pd.DataFrame, cols: Iterable[str], blank: Optional[str]) -> pd.DataFrame:
+    """Show missing values in ``cols`` as ``blank`` (e.g. '') instead of None/NaN."""
+    cols = [c for c in cols if c in df.columns]
+    if blank is None or not cols:
+        return df
+    df = df.copy()
+    df[cols] = df[cols].astype(object).where(df[cols].notna(), blank)
+    return df
@@ -0,0 +1,86 @@
+"""
+Per-worker efficiency summary for the low-producer views.
+
+Builds the "EBNO/Shiftwise Avg Eff Table" for every worker at once with
+grouped reductions: days attended, mean positive efficiency per shift and
+overall. Efficiency values of 0 or null are ignored, as on the pages.
+"""
+from typing import Optional
+
+import pandas as pd
+
+from efficiency.compare import SHIFTS
+from rounding import round_exact
+
+
+def ebno_shift_summary(
+    df: pd.DataFrame,
+    ebno_col: str,
+    date_col: str,
+    shift_col: str,
+    eff_col: str,
+    name_col: Optional[str] = None,
+    looms_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    One row per worker.
+
+    Args:
+        name_col: Adds a Name column (first non-null name, '' if none).
+        looms_col: Adds Avg LoomsRun, the number of rows with a loom per
+            day attended.
+
+    Returns:
+        EBNO, [Name], DaysAttended, [Avg LoomsRun], A, B, C, Avg Eff.
+        Shift and overall means are NaN where a worker has no positive eff.
+    """
+    grouped = df.groupby(ebno_col)
+    out = pd.DataFrame({'DaysAttended': grouped[date_col].nunique()})
+    if name_col is not None:
+        names = grouped[name_col].first() if name_col in df.columns else pd.Series(dtype=object)
+        out.insert(0, 'Name', names.reindex(out.index).fillna(''))
+    if looms_col is not None:
+        looms_run = grouped[looms_col].count() if looms_col in df.columns else grouped.size()
+        out['Avg LoomsRun'] = round_exact(looms_run / out['DaysAttended'], 0)
+
+    pos = df[df[eff_col] > 0]
+    shift_means = round_exact(
+        pos.groupby([ebno_col, shift_col])[eff_col]
+        .mean()
+        .unstack(shift_col)
+        .reindex(columns=SHIFTS)
+    )
+    out = out.join(shift_means)
+    out['Avg Eff'] = round_exact(pos.groupby(ebno_col)[eff_col].mean())
+    out.index.name = 'EBNO'
+    return out.reset_index()
+
+
+def filter_days_attended(summary: pd.DataFrame, filter_type: str, value) -> pd.DataFrame:
+    """Apply the DaysAttended Above/Below selector ('All' keeps every row)."""
+    return _filter_threshold(summary, 'DaysAttended', filter_type, value)
+
+
+def filter_avg_eff(summary: pd.DataFrame, filter_type: str, value) -> pd.DataFrame:
+    """Apply the Avg Eff Above/Below selector; workers without an average never match."""
+    return _filter_threshold(summary, 'Avg Eff', filter_type, value)
+
+
+def _filter_threshold(summary: pd.DataFrame, col: str, filter_type: str, value) -> pd.DataFrame:
+    values = pd.to_numeric(summary[col], errors='coerce')
+    if filter_type == 'Above':
+        return summary[values > value]
+    if filter_type == 'Below':
+        return summary[values < value]
+    return summary
+
+
+def sort_blanks_last(summary: pd.DataFrame, col: str = 'Avg Eff', ascending: bool = True) -> pd.DataFrame:
+    """Sort by a numeric column with missing or blank values at the bottom."""
+    return summary.sort_values(
+        by=col,
+        key=lambda c: pd.to_numeric(c, errors='coerce'),
+        ascending=ascending,
+        na_position='last',
+        kind='stable',
+    ).reset_index(drop=True)
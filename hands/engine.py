@@ -0,0 +1,71 @@
+"""
+Hands report rollups derived from one detail fetch.
+
+The Hands Comparison page used to run a separate aggregate query for each
+view (detail, by date, by occupation, by department) over the same join of
+the daily hand data with the designation and occupation norms masters.
+Here the joined detail for a date range is fetched once (cached by
+``hands.query.get_daily_hand_comparison``, with its text columns as
+categoricals) and every view is a groupby over it, so switching views
+doesn't go back to the database.
+
+The rollups keep the column names and ordering of the SQL they replace:
+sums are ``total_<measure>``, a group whose values are all missing sums to
+NaN (as SQL SUM gives NULL) and missing keys sort first.
+"""
+from typing import List
+
+import pandas as pd
+
+from hands.query import MEASURE_COLUMNS, get_daily_hand_comparison
+
+TOTAL_COLUMNS = [f"total_{col}" for col in MEASURE_COLUMNS]
+
+
+def detail(start_date, end_date) -> pd.DataFrame:
+    """One row per date and designation, ordered by date and occupation."""
+    return get_daily_hand_comparison(start_date, end_date)
+
+
+def _rollup(df: pd.DataFrame, keys: List[str], order: List[str]) -> pd.DataFrame:
+    """Sum the measures per ``keys`` and sort by ``order``, missing keys first."""
+    totals = (
+        df.groupby(keys, observed=True, dropna=False, sort=False)[MEASURE_COLUMNS]
+        .sum(min_count=1)
+        .add_prefix("total_")
+        .reset_index()
+    )
+    for col in keys:
+        if isinstance(totals[col].dtype, pd.CategoricalDtype):
+            totals[col] = totals[col].cat.remove_unused_categories()
+    return totals.sort_values(order, na_position="first", kind="stable", ignore_index=True)
+
+
+def by_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Totals per date and direct/indirect."""
+    keys = ["tran_date", "DIRECT_INDIRECT"]
+    return _rollup(df, keys, keys)
+
+
+def by_occupation(df: pd.DataFrame) -> pd.DataFrame:
+    """Totals per occupation (with its department), ordered by department and occupation."""
+    keys = ["occupation", "short_name", "DIRECT_INDIRECT", "VARIABLE_FIXED", "department"]
+    return _rollup(df, keys, ["department", "occupation"])
+
+
+def by_department(df: pd.DataFrame) -> pd.DataFrame:
+    """Totals per department and direct/indirect, ordered by department code."""
+    keys = ["dept_code", "department", "DIRECT_INDIRECT"]
+    return _rollup(df, keys, keys)
+
+
+def summary_by_date(start_date, end_date) -> pd.DataFrame:
+    return by_date(detail(start_date, end_date))
+
+
+def summary_by_occupation(start_date, end_date) -> pd.DataFrame:
+    return by_occupation(detail(start_date, end_date))
+
+
+def summary_by_department(start_date, end_date) -> pd.DataFrame:
+    return by_department(detail(start_date, end_date))
@@ -1,12 +1,7 @@
 import streamlit as st
 import pandas as pd
 import datetime
-from hands.query import (
-    get_daily_hand_comparison,
-    get_daily_hand_summary,
-    get_hand_comparison_by_occupation,
-    get_hand_summary_by_department
-)
+from hands import engine
 
 
 def hands_report():
@@ -58,7 +53,7 @@ def hands_report():
 def display_detailed_view(start_date, end_date):
     """Display detailed hand comparison data."""
     
-    df = get_daily_hand_comparison(start_date, end_date)
+    df = engine.detail(start_date, end_date)
     
     if df.empty:
         st.warning("No data found for the selected date range.")
@@ -158,7 +153,7 @@ def display_detailed_view(start_date, end_date):
 def display_summary_by_date(start_date, end_date):
     """Display summary of hands by date."""
     
-    df_raw = get_daily_hand_summary(start_date, end_date)
+    df_raw = engine.summary_by_date(start_date, end_date)
     
     if df_raw.empty:
         st.warning("No data found for the selected date range.")
@@ -257,7 +252,7 @@ def display_summary_by_date(start_date, end_date):
 def display_summary_by_occupation(start_date, end_date):
     """Display summary of hands by occupation."""
     
-    df = get_hand_comparison_by_occupation(start_date, end_date)
+    df = engine.summary_by_occupation(start_date, end_date)
     
     if df.empty:
         st.warning("No data found for the selected date range.")
@@ -357,7 +352,7 @@ def display_summary_by_occupation(start_date, end_date):
 def display_department_summary(start_date, end_date):
     """Display department-wise summary table."""
     
-    dept_df = get_hand_summary_by_department(start_date, end_date)
+    dept_df = engine.summary_by_department(start_date, end_date)
     
     if dept_df.empty:
         st.info("No department data available.")
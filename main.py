@@ -1,4 +1,9 @@
 import streamlit as st
+from diagnostics import diagnostics_requested, diagnostics_view
+
+if diagnostics_requested():
+    diagnostics_view()
+    st.stop()
 
 st.title("MIS Dashboard")
 
@@ -0,0 +1,72 @@
+"""
+Concurrent loading of the Executive Summary sections.
+
+Every table on the daily summary page is fed by one or two independent
+queries. Running them one after another makes the page as slow as the sum of
+all round trips, so the queries are submitted together to a bounded thread
+pool over the shared ``db.engine`` and each section is handed back as soon as
+its own queries have finished.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Process-wide bound on concurrent summary queries. It is kept below the
+# engine's default pool size (5 + 10 overflow) so that several users opening
+# the page together cannot starve the other pages of connections.
+MAX_WORKERS = 6
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="summary-loader")
+
+
+@dataclass
+class SectionResult:
+    """Query results for one page section, keyed by the name given in ``add``."""
+    name: str
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """First query error of the section, or None if every query succeeded."""
+        return next(iter(self.errors.values()), None)
+
+
+class SectionLoader:
+    """
+    Submit the queries of several sections at once and yield each section
+    when all of its queries are done.
+
+    Only the queries run on worker threads; rendering stays with the caller
+    so Streamlit calls are made from the script thread.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._executor = executor or _executor
+        self._sections: Dict[str, SectionResult] = {}
+        self._remaining: Dict[str, int] = {}
+        self._futures = {}
+
+    def add(self, section: str, key: str, fn: Callable[..., Any], *args) -> None:
+        """Start ``fn(*args)`` in the background as query ``key`` of ``section``."""
+        self._sections.setdefault(section, SectionResult(section))
+        self._remaining[section] = self._remaining.get(section, 0) + 1
+        future = self._executor.submit(fn, *args)
+        self._futures[future] = (section, key)
+
+    def completed(self) -> Iterator[SectionResult]:
+        """Yield sections in the order they finish; failures are kept per query."""
+        pending = set(self._futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                section, key = self._futures[future]
+                result = self._sections[section]
+                try:
+                    result.results[key] = future.result()
+                except Exception as e:
+                    result.errors[key] = e
+                self._remaining[section] -= 1
+                if self._remaining[section] == 0:
+                    yield result
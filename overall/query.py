@@ -1,25 +1,26 @@
 import pandas as pd
-from db import engine
+from querycache import cached_query
+from statements import register, read_frame, Date
+from overall.rollup import ensure_rollup
 
-def get_dofftable_data(selected_date):
-    query = f"""
+register("overall.get_dofftable_data", """
 WITH base_day AS (
   SELECT
     spell,
     frameno,
     round(SUM(netwt), 3) AS total_netwt
   FROM dofftable
-  WHERE doffdate = '{selected_date}'
+  WHERE doffdate = :selected_date
     AND company_id = 2
     AND is_active = 1
   GROUP BY spell, frameno
 ),
 frame_day AS (
   SELECT
-    SUM(CASE WHEN spell = 'A1' THEN 1 * 5/8
-             WHEN spell = 'A2' THEN 1 * 3/8 ELSE 0 END) AS A_frames,
-    SUM(CASE WHEN spell = 'B1' THEN 1 * 3/8
-             WHEN spell = 'B2' THEN 1 * 5/8 ELSE 0 END) AS B_frames,
+    SUM(CASE WHEN spell = 'A1' THEN 1 * 0.625
+             WHEN spell = 'A2' THEN 1 * 0.375 ELSE 0 END) AS A_frames,
+    SUM(CASE WHEN spell = 'B1' THEN 1 * 0.375
+             WHEN spell = 'B2' THEN 1 * 0.625 ELSE 0 END) AS B_frames,
     SUM(CASE WHEN spell = 'C' THEN 1 ELSE 0 END) AS C_frames
   FROM (SELECT DISTINCT spell, frameno FROM base_day) AS distinct_frames
 ),
@@ -48,93 +49,74 @@ SELECT 'NO OF FRAME RUNS',
        ROUND(B_frames_day, 3),
        ROUND(C_frames_day, 3)
 FROM combined;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, selected_date=Date)
 
-def get_dofftable_sum_by_date(selected_date, start_date):
-    query = f"""
-WITH base_mtd AS (
-  SELECT DISTINCT spell, frameno, doffdate
-  FROM dofftable
-  WHERE doffdate BETWEEN '{selected_date}' AND '{start_date}'
-    AND company_id = 2
-    AND is_active = 1
-),
-frame_mtd_weighted AS (
-  SELECT 
-    doffdate,
-    SUM(CASE WHEN spell = 'A1' THEN 1 * 5/8 ELSE 0 END +
-        CASE WHEN spell = 'A2' THEN 1 * 3/8 ELSE 0 END +
-        CASE WHEN spell = 'B1' THEN 1 * 3/8 ELSE 0 END +
-        CASE WHEN spell = 'B2' THEN 1 * 5/8 ELSE 0 END +
-        CASE WHEN spell = 'C'  THEN 1 ELSE 0 END) AS daily_weighted_frames
-  FROM base_mtd
-  GROUP BY doffdate
-),
-total_frames_mtd AS (
-  SELECT SUM(daily_weighted_frames) AS total_frames FROM frame_mtd_weighted
-),
-prod_mtd AS (
-  SELECT SUM(netwt) AS total_netwt
-  FROM dofftable
-  WHERE doffdate BETWEEN '{selected_date}' AND '{start_date}'
-    AND company_id = 2
-    AND is_active = 1
-)
+@cached_query
+def get_dofftable_data(selected_date):
+    df = read_frame("overall.get_dofftable_data", selected_date=selected_date)
+    return df
+
+register("overall.get_dofftable_sum_by_date", """
 SELECT 'NO OF FRAME RUNS' AS DoffWtProd,
-       ROUND(f.total_frames, 3) AS value
-FROM total_frames_mtd f
+       ROUND(SUM(frames), 3) AS value
+FROM EMPMILL12.mis_daily_rollup
+WHERE dept = 'DOFF'
+  AND rollup_date BETWEEN :selected_date AND :start_date
 
 UNION ALL
 
 SELECT 'PRODUCTION (MT)',
-       ROUND(p.total_netwt / 1000, 3)
-FROM prod_mtd p;
+       ROUND(SUM(netwt) / 1000, 3)
+FROM EMPMILL12.mis_daily_rollup
+WHERE dept = 'DOFF'
+  AND rollup_date BETWEEN :selected_date AND :start_date;
+    """, selected_date=Date, start_date=Date)
 
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+@cached_query
+def get_dofftable_sum_by_date(selected_date, start_date):
+    ensure_rollup(selected_date, start_date)
+    df = read_frame("overall.get_dofftable_sum_by_date", selected_date=selected_date, start_date=start_date)
+    return df
 
 
-def get_spg_fine_coarse(selected_date):
-    query = f"""          select 'Overall' as side, 
+register("overall.get_spg_fine_coarse", """          select 'Overall' as side, 
      round(sum((sdt.prd_a+sdt.prd_b+sdt.prd_c)*sdt.act_count)/sum(sdt.prd_a+sdt.prd_b+sdt.prd_c),2) as ActualCount,
      round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as KgPerFrame,
      round(sum(sdt.hunprod)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as TrgtKgPerFrame ,
      round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.winder ),0) as ProdPerWinder
-     from EMPMILL12.spining_daily_transaction sdt  where sdt.tran_date = '{selected_date}' and company_id =2 
+     from EMPMILL12.spining_daily_transaction sdt  where sdt.tran_date = :selected_date and company_id =2 
      union all
      select substr(sdt.q_code,1,1) as side, 
      round(sum((sdt.prd_a+sdt.prd_b+sdt.prd_c)*sdt.act_count)/sum(sdt.prd_a+sdt.prd_b+sdt.prd_c),2) as ActualCount,
      round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as KgPerFrame,
      round(sum(sdt.hunprod)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as TrgtKgPerFrame ,
      round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.winder ),0) as ProdPerWinder
-     from EMPMILL12.spining_daily_transaction sdt  where sdt.tran_date = '{selected_date}' and company_id =2 
+     from EMPMILL12.spining_daily_transaction sdt  where sdt.tran_date = :selected_date and company_id =2 
      group by substr(sdt.q_code,1,1) ;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, selected_date=Date)
 
-def get_spg_sid_mtd(selected_date, start_date):
-    query = f"""
+@cached_query
+def get_spg_fine_coarse(selected_date):
+    df = read_frame("overall.get_spg_fine_coarse", selected_date=selected_date)
+    return df
+
+register("overall.get_spg_sid_mtd", """
           select 'MTD' as side, 
-     round(sum((sdt.prd_a+sdt.prd_b+sdt.prd_c)*sdt.act_count)/sum(sdt.prd_a+sdt.prd_b+sdt.prd_c),2) as ActualCount,
-     round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as KgPerFrame,
-     round(sum(sdt.hunprod)/sum(sdt.mc_a+sdt.mc_b+sdt.mc_c),0) as TrgtKgPerFrame ,
-     round(sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.winder ),0) as ProdPerWinder
-     from EMPMILL12.spining_daily_transaction sdt  where sdt.tran_date between '{start_date}' and '{selected_date}' and company_id =2
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+     round(sum(r.prd_count)/sum(r.prd),2) as ActualCount,
+     round(sum(r.prd)/sum(r.mc),0) as KgPerFrame,
+     round(sum(r.hunprod)/sum(r.mc),0) as TrgtKgPerFrame ,
+     round(sum(r.prd)/sum(r.winder ),0) as ProdPerWinder
+     from EMPMILL12.mis_daily_rollup r  where r.dept = 'SPG' and r.rollup_date between :start_date and :selected_date
+    """, start_date=Date, selected_date=Date)
 
+@cached_query
+def get_spg_sid_mtd(selected_date, start_date):
+    ensure_rollup(start_date, selected_date)
+    df = read_frame("overall.get_spg_sid_mtd", start_date=start_date, selected_date=selected_date)
+    return df
 
-def get_quality_winding_details(selected_date, start_date):
-    query = f"""
+
+register("overall.get_quality_winding_details", """
      select tdtprod.TDQuality  as Quality, IFNULL(tdyprod.act_count,0) as ActCount, 
      tdyprod.ProdPerWinder as ProdPerWinder,
      tdyprod.WdgProd as WdgProd, 
@@ -149,7 +131,7 @@ def get_quality_winding_details(selected_date, start_date):
      round((sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.winder))-(sum(sdt.hunprod)/sum(sdt.winder)),0) as diff
      from EMPMILL12.spining_daily_transaction sdt  
      left join EMPMILL12.spining_master sm  on sm.q_code  = sdt.q_code
-     where sdt.tran_date between '{start_date}' and '{selected_date}' group by sdt.q_code ,concat(sm.std_count ,' - ', sm.subgroup_type)) 
+     where sdt.tran_date between :start_date and :selected_date group by sdt.q_code ,concat(sm.std_count ,' - ', sm.subgroup_type)) 
      tdtprod left join (     
      select sdt.q_code  , 
      sdt.act_count , 
@@ -159,16 +141,17 @@ def get_quality_winding_details(selected_date, start_date):
     round((sum(sdt.prd_a+sdt.prd_b+sdt.prd_c)/sum(sdt.winder))-(sum(sdt.hunprod)/sum(sdt.winder)),0) as diff
      from EMPMILL12.spining_daily_transaction sdt  
      left join EMPMILL12.spining_master sm  on sm.q_code  = sdt.q_code
-     where sdt.tran_date = '{selected_date}' group by sdt.q_code  , sdt.act_count) tdyprod 
+     where sdt.tran_date = :selected_date group by sdt.q_code  , sdt.act_count) tdyprod 
      on tdtprod.q_code = tdyprod.q_code ;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, start_date=Date, selected_date=Date)
 
+@cached_query
+def get_quality_winding_details(selected_date, start_date):
+    df = read_frame("overall.get_quality_winding_details", start_date=start_date, selected_date=selected_date)
+    return df
 
-def weaving_details(selected_date):
-    query = f"""
+
+register("overall.weaving_details", """
      select 
      case when QualityType = '1' then 'Hessian'
      when QualityType = '2' then 'Sacking' else 'PackSheet' end 
@@ -190,14 +173,15 @@ def weaving_details(selected_date):
      from EMPMILL12.weaving_daily_transaction wdt 
      left join 
      EMPMILL12.weaving_master wm on wm.q_code = wdt.q_code
-     where wdt.company_id=2 and wdt.tran_date = '{selected_date}') a group by a.QualityType  ;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+     where wdt.company_id=2 and wdt.tran_date = :selected_date) a group by a.QualityType  ;
+    """, selected_date=Date)
 
-def get_weaving_shiftwise(selected_date):
-    query = f"""
+@cached_query
+def weaving_details(selected_date):
+    df = read_frame("overall.weaving_details", selected_date=selected_date)
+    return df
+
+register("overall.get_weaving_shiftwise", """
      select 
      case when QualityType = '1' then 'Hessian'
      when QualityType = '2' then 'Sacking' 
@@ -216,35 +200,33 @@ def get_weaving_shiftwise(selected_date):
      from EMPMILL12.weaving_daily_transaction wdt 
      left join 
      EMPMILL12.weaving_master wm on wm.q_code = wdt.q_code
-     where wdt.company_id=2 and wdt.tran_date = '{selected_date}') a group by a.QualityType 
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+     where wdt.company_id=2 and wdt.tran_date = :selected_date) a group by a.QualityType 
+    """, selected_date=Date)
 
-def get_weaving_total_mtd(selected_date, start_date):
-    query = f"""
+@cached_query
+def get_weaving_shiftwise(selected_date):
+    df = read_frame("overall.get_weaving_shiftwise", selected_date=selected_date)
+    return df
+
+register("overall.get_weaving_total_mtd", """
      select 
-     case when QualityType = '1' then 'Hessian'
-     when QualityType = '2' then 'Sacking' 
+     case when r.sub_key = '1' then 'Hessian'
+     when r.sub_key = '2' then 'Sacking' 
      else 'PackSheet' end 
      as Quality, 
-     round(sum(Total)/1000,3) as Total from (
-     select 
-     substr(wm.q_code,1,1) as QualityType,
-     wdt.actkgs as Total 
-     from EMPMILL12.weaving_daily_transaction wdt 
-     left join 
-     EMPMILL12.weaving_master wm on wm.q_code = wdt.q_code
-     where wdt.company_id=2 and wdt.tran_date between '{start_date}' and '{selected_date}') a group by a.QualityType 
+     round(sum(r.actkgs)/1000,3) as Total 
+     from EMPMILL12.mis_daily_rollup r
+     where r.dept = 'WVG' and r.rollup_date between :start_date and :selected_date group by r.sub_key 
      ;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, start_date=Date, selected_date=Date)
 
-def get_hands_details(selected_date):
-    query = f"""
+@cached_query
+def get_weaving_total_mtd(selected_date, start_date):
+    ensure_rollup(start_date, selected_date)
+    df = read_frame("overall.get_weaving_total_mtd", start_date=start_date, selected_date=selected_date)
+    return df
+
+register("overall.get_hands_details", """
 SELECT shift,
        CASE 
          WHEN shift = 'A' THEN ROUND(whrs / 8, 2)
@@ -262,39 +244,32 @@ FROM (
     ) theod ON da.eb_id = theod.eb_id
     WHERE da.company_id = 2 
       AND da.is_active = 1 
-      AND da.attendance_date = '{selected_date}'
+      AND da.attendance_date = :selected_date
       AND theod.catagory_id NOT IN (30)
     GROUP BY SUBSTR(spell, 1, 1)
 ) AS g;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+    """, selected_date=Date)
 
-def get_hands_mtd_details(selected_date, start_date):
-    query = f"""
+@cached_query
+def get_hands_details(selected_date):
+    df = read_frame("overall.get_hands_details", selected_date=selected_date)
+    return df
+
+register("overall.get_hands_mtd_details", """
 SELECT shift,
        CASE 
-         WHEN shift = 'A' THEN ROUND(whrs / 8, 2)
-         WHEN shift = 'B' THEN ROUND(whrs / 8, 2)
-         ELSE ROUND(whrs / 7.5, 2)
+         WHEN shift = 'A' THEN ROUND(SUM(whrs) / 8, 2)
+         WHEN shift = 'B' THEN ROUND(SUM(whrs) / 8, 2)
+         ELSE ROUND(SUM(whrs) / 7.5, 2)
        END AS hands
-FROM (
-    SELECT 
-        SUBSTR(spell, 1, 1) AS shift,
-        SUM(working_hours - idle_hours) AS whrs
-    FROM daily_attendance da
-    LEFT JOIN (
-        SELECT * FROM tbl_hrms_ed_official_details 
-        WHERE is_active = 1
-    ) theod ON da.eb_id = theod.eb_id
-    WHERE da.company_id = 2 
-      AND da.is_active = 1 
-      AND da.attendance_date BETWEEN '{start_date}' AND '{selected_date}'
-      AND theod.catagory_id NOT IN (30)
-    GROUP BY SUBSTR(spell, 1, 1)
-) AS g;
-    """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df, df.to_json(orient="records")
+FROM EMPMILL12.mis_daily_rollup
+WHERE dept = 'HANDS'
+  AND rollup_date BETWEEN :start_date AND :selected_date
+GROUP BY shift;
+    """, start_date=Date, selected_date=Date)
+
+@cached_query
+def get_hands_mtd_details(selected_date, start_date):
+    ensure_rollup(start_date, selected_date)
+    df = read_frame("overall.get_hands_mtd_details", start_date=start_date, selected_date=selected_date)
+    return df
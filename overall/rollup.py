@@ -0,0 +1,223 @@
+"""
+Daily production rollup for the Executive Summary MTD figures.
+
+``EMPMILL12.mis_daily_rollup`` holds one row per date, department and shift
+with additive measures only, so any date range can be summed back without
+touching the raw tables:
+
+    DOFF   shift = spell (A1..C)  netwt, frames (spell-weighted frame runs)
+    SPG    shift = ''             prd, prd_count (prd * act_count), mc, winder, hunprod
+                                  sub_key = side (first char of q_code)
+    WVG    shift = ''             actkgs, sub_key = quality type (first char of q_code)
+    HANDS  shift = A/B/C          whrs (working - idle hours)
+
+Spinning and weaving are booked per day in their source tables, so their
+rows use an empty shift. ``EMPMILL12.mis_daily_rollup_refresh`` records when
+each date was last rebuilt; only missing dates and the last few (still being
+entered or corrected) dates are ever recomputed.
+
+Rows are written with REPLACE inside the refresh transaction, so two app
+processes rebuilding the same dates overwrite each other's rows instead of
+failing on the primary key. The tables are created by an explicit step, not
+by the report pages:
+
+    python -m overall.rollup
+"""
+import argparse
+import datetime
+import sys
+import threading
+from typing import List, Tuple
+
+from sqlalchemy import Column, Date, DateTime, Double, Index, MetaData, String, Table, select, text
+from db import get_engine
+
+
+COMPANY_ID = 2
+# Dates this close to today are still open for entry and get rebuilt
+# whenever their rows are older than RECENT_TTL.
+RECENT_DAYS = 3
+RECENT_TTL = datetime.timedelta(minutes=10)
+
+_lock = threading.Lock()
+
+_metadata = MetaData(schema="EMPMILL12")
+
+
+def _measure(name: str) -> Column:
+    return Column(name, Double, nullable=False, server_default=text("0"))
+
+
+rollup_table = Table(
+    "mis_daily_rollup",
+    _metadata,
+    Column("rollup_date", Date, primary_key=True),
+    Column("dept", String(8), primary_key=True),
+    Column("shift", String(4), primary_key=True, server_default=""),
+    Column("sub_key", String(8), primary_key=True, server_default=""),
+    *[_measure(name) for name in ("netwt", "frames", "prd", "prd_count", "mc", "winder", "hunprod", "actkgs", "whrs")],
+    Index("idx_dept_date", "dept", "rollup_date"),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4",
+)
+
+refresh_table = Table(
+    "mis_daily_rollup_refresh",
+    _metadata,
+    Column("rollup_date", Date, primary_key=True),
+    Column("refreshed_at", DateTime, nullable=False),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4",
+)
+
+
+def create_rollup_tables() -> None:
+    """Create the rollup and refresh-log tables if they don't exist."""
+    _metadata.create_all(get_engine(), checkfirst=True)
+
+
+# One REPLACE ... SELECT per department, each over the :start..:end date range.
+# Rows are grouped by exactly the expressions that fill the key columns.
+_REFRESH_SQL = [
+    text(
+        """
+        REPLACE INTO EMPMILL12.mis_daily_rollup (rollup_date, dept, shift, sub_key, netwt, frames)
+        SELECT doffdate, 'DOFF', IFNULL(spell, ''), '',
+               SUM(netwt),
+               COUNT(DISTINCT frameno) *
+               CASE IFNULL(spell, '') WHEN 'A1' THEN 0.625 WHEN 'A2' THEN 0.375
+                          WHEN 'B1' THEN 0.375 WHEN 'B2' THEN 0.625
+                          WHEN 'C' THEN 1 ELSE 0 END
+        FROM dofftable
+        WHERE doffdate BETWEEN :start AND :end
+          AND company_id = :company_id
+          AND is_active = 1
+        GROUP BY doffdate, IFNULL(spell, '')
+        """
+    ),
+    text(
+        """
+        REPLACE INTO EMPMILL12.mis_daily_rollup
+            (rollup_date, dept, shift, sub_key, prd, prd_count, mc, winder, hunprod)
+        SELECT sdt.tran_date, 'SPG', '', IFNULL(SUBSTR(sdt.q_code, 1, 1), ''),
+               SUM(sdt.prd_a + sdt.prd_b + sdt.prd_c),
+               SUM((sdt.prd_a + sdt.prd_b + sdt.prd_c) * sdt.act_count),
+               SUM(sdt.mc_a + sdt.mc_b + sdt.mc_c),
+               SUM(sdt.winder),
+               SUM(sdt.hunprod)
+        FROM EMPMILL12.spining_daily_transaction sdt
+        WHERE sdt.tran_date BETWEEN :start AND :end
+          AND sdt.company_id = :company_id
+        GROUP BY sdt.tran_date, IFNULL(SUBSTR(sdt.q_code, 1, 1), '')
+        """
+    ),
+    text(
+        """
+        REPLACE INTO EMPMILL12.mis_daily_rollup (rollup_date, dept, shift, sub_key, mc, actkgs)
+        SELECT wdt.tran_date, 'WVG', '', IFNULL(SUBSTR(wm.q_code, 1, 1), ''),
+               SUM(wdt.mc_a + wdt.mc_b + wdt.mc_c),
+               SUM(wdt.actkgs)
+        FROM EMPMILL12.weaving_daily_transaction wdt
+        LEFT JOIN EMPMILL12.weaving_master wm ON wm.q_code = wdt.q_code
+        WHERE wdt.tran_date BETWEEN :start AND :end
+          AND wdt.company_id = :company_id
+        GROUP BY wdt.tran_date, IFNULL(SUBSTR(wm.q_code, 1, 1), '')
+        """
+    ),
+    text(
+        """
+        REPLACE INTO EMPMILL12.mis_daily_rollup (rollup_date, dept, shift, sub_key, whrs)
+        SELECT da.attendance_date, 'HANDS', IFNULL(SUBSTR(da.spell, 1, 1), ''), '',
+               SUM(da.working_hours - da.idle_hours)
+        FROM daily_attendance da
+        LEFT JOIN (
+            SELECT * FROM tbl_hrms_ed_official_details
+            WHERE is_active = 1
+        ) theod ON da.eb_id = theod.eb_id
+        WHERE da.company_id = :company_id
+          AND da.is_active = 1
+          AND da.attendance_date BETWEEN :start AND :end
+          AND theod.catagory_id NOT IN (30)
+        GROUP BY da.attendance_date, IFNULL(SUBSTR(da.spell, 1, 1), '')
+        """
+    ),
+]
+
+_MARK_REFRESHED_SQL = text(
+    "REPLACE INTO EMPMILL12.mis_daily_rollup_refresh (rollup_date, refreshed_at) VALUES (:rollup_date, :refreshed_at)"
+)
+
+
+def refresh_rollup(start_date: datetime.date, end_date: datetime.date) -> None:
+    """Rebuild the rollup rows for every date in [start_date, end_date] in one transaction."""
+    params = {"start": start_date, "end": end_date, "company_id": COMPANY_ID}
+    now = datetime.datetime.now()
+    days = (end_date - start_date).days + 1
+    with get_engine().begin() as conn:
+        # Drop keys that no longer have source rows; REPLACE overwrites the rest
+        conn.execute(
+            text("DELETE FROM EMPMILL12.mis_daily_rollup WHERE rollup_date BETWEEN :start AND :end"),
+            params,
+        )
+        for stmt in _REFRESH_SQL:
+            conn.execute(stmt, params)
+        conn.execute(
+            _MARK_REFRESHED_SQL,
+            [
+                {"rollup_date": start_date + datetime.timedelta(days=i), "refreshed_at": now}
+                for i in range(days)
+            ],
+        )
+
+
+def _contiguous_runs(dates: List[datetime.date]) -> List[Tuple[datetime.date, datetime.date]]:
+    """Collapse sorted dates into (first, last) runs of consecutive days."""
+    runs = []
+    for d in dates:
+        if runs and d == runs[-1][1] + datetime.timedelta(days=1):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
+
+def ensure_rollup(start_date: datetime.date, end_date: datetime.date) -> None:
+    """
+    Bring the rollup up to date for [start_date, end_date].
+
+    Dates never rolled up are built once; dates within RECENT_DAYS of today
+    are rebuilt when their rows are older than RECENT_TTL. Closed dates are
+    left alone. Concurrent callers in this process wait on a lock so a range
+    is only rebuilt once; another process rebuilding it too just rewrites the
+    same rows.
+    """
+    with _lock:
+        with get_engine().connect() as conn:
+            rows = conn.execute(
+                select(refresh_table.c.rollup_date, refresh_table.c.refreshed_at)
+                .where(refresh_table.c.rollup_date.between(start_date, end_date))
+            ).all()
+        refreshed = {r[0]: r[1] for r in rows}
+
+        now = datetime.datetime.now()
+        recent_from = datetime.date.today() - datetime.timedelta(days=RECENT_DAYS)
+        stale = []
+        for i in range((end_date - start_date).days + 1):
+            d = start_date + datetime.timedelta(days=i)
+            at = refreshed.get(d)
+            if at is None or (d >= recent_from and now - at > RECENT_TTL):
+                stale.append(d)
+
+        for first, last in _contiguous_runs(stale):
+            refresh_rollup(first, last)
+
+
+def main(argv=None) -> int:
+    argparse.ArgumentParser(description="Create the daily rollup tables.").parse_args(argv)
+    create_rollup_tables()
+    print("mis_daily_rollup tables are in place")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Heavy/Light yarn figures from the yarn parameter sheet.
+
+Each yarn test records the weight of 450 yds in grams and the moisture
+regain (MR). Per quality (and per date, for a trend) the tests are averaged
+and compared with the quality's standard count and MR% from the STD
+worksheet:
+
+    Observed Count (Lbs) = avg weight / 450 * 14400 / 454
+    Corr Count           = observed * (100 + avg MR) / (100 + std MR%)
+    Hvy/Light %          = (corr - std count) / std count * 100
+
+Every intermediate is rounded to 2 places before it is used, as on the
+Executive Summary table. The sheet columns are coerced to numbers once and
+each figure is one array expression over the whole frame, so a month of
+dates costs about the same as one.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from rounding import round_exact
+
+# Sheet columns
+DATE = "Date"
+QUALITY = "Quality"
+WEIGHT = "Wt /450 yds in Gms1"
+MR = "MR"
+
+AVG_WEIGHT = f"Avg {WEIGHT}"
+AVG_MR = f"Avg {MR}"
+STD_COUNT = "Std Count"
+STD_MR = "Std MR%"
+OBSERVED = "Observed Count (Lbs)"
+CORR = "Corr Count"
+HEAVY_LIGHT = "Hvy/Light %"
+
+# Column order of the Heavy Light Yarn table
+TABLE_COLUMNS = [QUALITY, STD_COUNT, OBSERVED, CORR, HEAVY_LIGHT, AVG_MR]
+
+
+def quality_means(rows: pd.DataFrame, by_date: bool = False) -> pd.DataFrame:
+    """
+    Average weight and MR per quality (and per date with ``by_date``) of
+    test rows with ``Quality``, weight and MR columns; a date index or a
+    ``Date`` column is needed for ``by_date``.
+    """
+    rows = rows.reset_index() if by_date and DATE not in rows.columns else rows
+    values = pd.DataFrame({
+        QUALITY: rows[QUALITY],
+        AVG_WEIGHT: pd.to_numeric(rows[WEIGHT], errors="coerce"),
+        AVG_MR: pd.to_numeric(rows[MR], errors="coerce"),
+    }, index=rows.index)
+    keys = [QUALITY]
+    if by_date:
+        values[DATE] = pd.to_datetime(rows[DATE]).dt.normalize()
+        keys = [DATE, QUALITY]
+    means = values.groupby(keys, observed=True)[[AVG_WEIGHT, AVG_MR]].mean().reset_index()
+    if isinstance(means[QUALITY].dtype, pd.CategoricalDtype):
+        means[QUALITY] = means[QUALITY].astype(object)
+    return means
+
+
+def heavy_light(means: pd.DataFrame, std: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Add Std Count, Std MR%, Observed Count, Corr Count and Hvy/Light %
+    (as a number) to ``quality_means`` output. Std columns are matched on
+    quality and kept as given; figures with a missing or non-numeric input
+    (or a zero std count) are NaN.
+    """
+    out = means.copy()
+    if std is not None:
+        out = out.merge(std[[QUALITY, STD_COUNT, STD_MR]].drop_duplicates(subset=[QUALITY]), on=QUALITY, how="left")
+    else:
+        out[STD_COUNT] = np.nan
+        out[STD_MR] = np.nan
+    std_count = pd.to_numeric(out[STD_COUNT], errors="coerce")
+    std_mr = pd.to_numeric(out[STD_MR], errors="coerce")
+
+    out[AVG_MR] = round_exact(out[AVG_MR])
+    out[OBSERVED] = round_exact(out[AVG_WEIGHT] / 450 * 14400 / 454)
+    out[CORR] = round_exact(out[OBSERVED] * (100 + out[AVG_MR]) / (100 + std_mr))
+    out[HEAVY_LIGHT] = round_exact((out[CORR] - std_count) / std_count.where(std_count != 0) * 100)
+    return out
+
+
+def percent_labels(values: pd.Series) -> pd.Series:
+    """'1.3%' style labels for display, None where missing."""
+    labels = values.astype(str) + "%"
+    return labels.where(values.notna(), None)
+
+
+def heavy_light_table(means: pd.DataFrame, std: pd.DataFrame) -> pd.DataFrame:
+    """The Executive Summary's Heavy Light Yarn table for one date's ``quality_means``."""
+    table = heavy_light(means, std)
+    table[HEAVY_LIGHT] = percent_labels(table[HEAVY_LIGHT])
+    return table[TABLE_COLUMNS]
+
+
+def heavy_light_trend(rows: pd.DataFrame, std: pd.DataFrame) -> pd.DataFrame:
+    """Hvy/Light % per date (rows) and quality (columns) over every date in ``rows``."""
+    figures = heavy_light(quality_means(rows, by_date=True), std)
+    return figures.pivot(index=DATE, columns=QUALITY, values=HEAVY_LIGHT)
@@ -0,0 +1,285 @@
+"""
+Local cache of the yarn parameter Google Sheet.
+
+The Heavy Light Yarn table on the Executive Summary is fed by the "YARN"
+worksheet (one form response per yarn test) and the "STD" worksheet
+(standard count and MR% per quality) of the yarn parameter spreadsheet.
+Reading them is the slowest and least reliable call on the page, so they
+are pulled once into a process-wide ``YarnSheet`` snapshot that every
+session shares:
+
+    data   Date (index, sorted), Quality (categorical), weight, MR (floats)
+    std    Quality, Std Count, Std MR%
+
+The snapshot is kept current incrementally. At most every CHECK_SECONDS the
+spreadsheet's last-modified time is compared with the snapshot's; when it
+changed, the YARN rows from the last one held on are fetched. If that row
+comes back unchanged the rows after it are appended; if it doesn't (a row
+was deleted, inserted or the last one edited), or nothing was appended (an
+edit of an existing row), the whole worksheet is reloaded, as it is every
+FULL_RELOAD_SECONDS. An edit further up made in the same interval as new
+rows is only picked up by that periodic reload. If the sheet can't be
+reached the previous snapshot keeps being served.
+
+Setting ``MIS_YARN_SHEET_FIXTURE`` to a directory with ``YARN.csv`` and
+``STD.csv`` (as the benchmark stand-in writes) serves the sheet from those
+files instead; ``MIS_GSHEET_CREDENTIALS`` names the service-account file.
+"""
+import csv
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from overall import yarn
+from overall.yarn import DATE, MR, QUALITY, WEIGHT
+
+SPREADSHEET = "new R-08-16 Yarn Parameter Entry (Responses)"
+YARN_WORKSHEET = "YARN"
+STD_WORKSHEET = "STD"
+DEFAULT_CREDENTIALS = "C:\\code\\mis\\careful-analyst-441615-j6-ac33950f3271.json"
+
+CHECK_SECONDS = 60
+FULL_RELOAD_SECONDS = 60 * 60
+
+log = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------- #
+# Sources                                                                     #
+# --------------------------------------------------------------------------- #
+class GoogleSheetSource:
+    """The live spreadsheet, through one authorized gspread client."""
+
+    def __init__(self, credentials_file: str, title: str = SPREADSHEET):
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+        credentials = Credentials.from_service_account_file(credentials_file, scopes=scope)
+        self._spreadsheet = gspread.authorize(credentials).open(title)
+
+    def modified(self) -> str:
+        return self._spreadsheet.get_lastUpdateTime()
+
+    def values(self, worksheet: str, first_row: int = 1) -> List[List[str]]:
+        """Rows of a worksheet from ``first_row`` (1-based) on, as displayed."""
+        ws = self._spreadsheet.worksheet(worksheet)
+        if first_row <= 1:
+            return ws.get_all_values()
+        if first_row > ws.row_count:
+            return []
+        # Whole rows ("5:1000"); trailing empty rows are not returned
+        return ws.get(f"{first_row}:{ws.row_count}")
+
+
+class FixtureSource:
+    """The worksheets as ``<worksheet>.csv`` files in a directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, worksheet: str) -> str:
+        return os.path.join(self.directory, f"{worksheet}.csv")
+
+    def modified(self) -> str:
+        return str(max(os.stat(self._path(ws)).st_mtime_ns for ws in (YARN_WORKSHEET, STD_WORKSHEET)))
+
+    def values(self, worksheet: str, first_row: int = 1) -> List[List[str]]:
+        with open(self._path(worksheet), newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))[max(first_row, 1) - 1:]
+
+
+def write_fixture(directory: str, worksheets: Dict[str, List[List[str]]]) -> None:
+    """Write worksheet rows (header first) where ``FixtureSource`` reads them."""
+    os.makedirs(directory, exist_ok=True)
+    for name, rows in worksheets.items():
+        with open(os.path.join(directory, f"{name}.csv"), "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+
+
+# --------------------------------------------------------------------------- #
+# Snapshot                                                                    #
+# --------------------------------------------------------------------------- #
+@dataclasses.dataclass(frozen=True)
+class YarnSheet:
+    version: int
+    modified: str
+    header: tuple
+    rows: int                # YARN rows read so far, header included
+    last: tuple              # the last of them, as _row_key
+    data: pd.DataFrame
+    std: pd.DataFrame
+
+
+_lock = threading.Lock()
+_source = None
+_current: Optional[YarnSheet] = None
+_version = 0
+_checked_at = 0.0
+_full_at = 0.0
+_means: Dict[tuple, pd.DataFrame] = {}
+
+
+def _default_source():
+    fixture = os.getenv("MIS_YARN_SHEET_FIXTURE")
+    if fixture:
+        return FixtureSource(fixture)
+    return GoogleSheetSource(os.getenv("MIS_GSHEET_CREDENTIALS", DEFAULT_CREDENTIALS))
+
+
+def service_account_email() -> Optional[str]:
+    """The account the sheet has to be shared with (None when serving a fixture)."""
+    if os.getenv("MIS_YARN_SHEET_FIXTURE"):
+        return None
+    try:
+        with open(os.getenv("MIS_GSHEET_CREDENTIALS", DEFAULT_CREDENTIALS), encoding="utf-8") as f:
+            return json.load(f).get("client_email")
+    except (OSError, ValueError):
+        return None
+
+
+def use_source(source) -> None:
+    """Serve the sheet from ``source`` (e.g. a ``FixtureSource``) and drop the snapshot."""
+    global _source, _current
+    with _lock:
+        _source = source
+        _current = None
+        _means.clear()
+
+
+def invalidate() -> None:
+    """Check the sheet for changes on next access instead of waiting CHECK_SECONDS."""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
+
+
+def _yarn_frame(header: tuple, rows: List[List[str]]) -> pd.DataFrame:
+    """Only the columns the table uses, parsed once; rows without a readable date are left out."""
+    columns = list(header)
+    date_col = DATE if DATE in columns else columns[0]
+
+    def column(name):
+        if name not in columns:
+            return [None] * len(rows)
+        i = columns.index(name)
+        return [row[i] if i < len(row) else None for row in rows]
+
+    df = pd.DataFrame({
+        DATE: pd.to_datetime(pd.Series(column(date_col), dtype=object), errors="coerce").dt.normalize(),
+        QUALITY: pd.Series(column(QUALITY), dtype=object),
+        WEIGHT: pd.to_numeric(pd.Series(column(WEIGHT), dtype=object), errors="coerce"),
+        MR: pd.to_numeric(pd.Series(column(MR), dtype=object), errors="coerce"),
+    })
+    return df.dropna(subset=[DATE]).set_index(DATE)
+
+
+def _std_frame(values: List[List[str]]) -> pd.DataFrame:
+    """Std Count from columns A-B and Std MR% from D-E, one row per quality."""
+    count = pd.DataFrame([[r[0], r[1]] for r in values[1:] if len(r) > 1 and r[0] and r[1]],
+                         columns=[QUALITY, yarn.STD_COUNT]).drop_duplicates(subset=[QUALITY])
+    mr = pd.DataFrame([[r[3], r[4]] for r in values[1:] if len(r) > 4 and r[3] and r[4]],
+                      columns=[QUALITY, yarn.STD_MR]).drop_duplicates(subset=[QUALITY])
+    return count.merge(mr, on=QUALITY, how="outer")
+
+
+def _row_key(row) -> tuple:
+    """A sheet row without trailing empty cells, which the values API leaves out."""
+    cells = list(row)
+    while cells and cells[-1] == "":
+        cells.pop()
+    return tuple(cells)
+
+
+def _compact(data: pd.DataFrame) -> pd.DataFrame:
+    data = data.sort_index(kind="stable")
+    data[QUALITY] = data[QUALITY].astype("category")
+    return data
+
+
+def _publish(modified: str, header: tuple, rows: int, last: tuple, data: pd.DataFrame, std: pd.DataFrame) -> None:
+    global _current, _version
+    _version += 1
+    _current = YarnSheet(_version, modified, header, rows, last, _compact(data), std)
+    _means.clear()
+
+
+def _refresh(source) -> None:
+    """Bring the snapshot up to date with the sheet; caller holds _lock."""
+    global _checked_at, _full_at
+    now = time.monotonic()
+    modified = source.modified()
+    _checked_at = now
+    if _current is not None and modified == _current.modified:
+        return
+    std = _std_frame(source.values(STD_WORKSHEET))
+    if _current is not None and _current.header and now - _full_at < FULL_RELOAD_SECONDS:
+        # The last row held comes back first; if it moved or changed, rows
+        # were not only appended
+        fetched = source.values(YARN_WORKSHEET, first_row=_current.rows)
+        if len(fetched) > 1 and _row_key(fetched[0]) == _current.last:
+            new_rows = fetched[1:]
+            old = _current.data.assign(**{QUALITY: _current.data[QUALITY].astype(object)})
+            data = pd.concat([old, _yarn_frame(_current.header, new_rows)])
+            _publish(modified, _current.header, _current.rows + len(new_rows), _row_key(new_rows[-1]), data, std)
+            return
+    values = source.values(YARN_WORKSHEET)
+    header = tuple(values[0]) if values else ()
+    data = _yarn_frame(header, values[1:]) if header else _yarn_frame((DATE,), [])
+    _publish(modified, header, len(values), _row_key(values[-1]) if values else (), data, std)
+    _full_at = now
+
+
+def sheet() -> YarnSheet:
+    """The current snapshot, checking the sheet for changes at most every CHECK_SECONDS."""
+    global _source, _checked_at
+    with _lock:
+        if _current is None or time.monotonic() - _checked_at > CHECK_SECONDS:
+            try:
+                if _source is None:
+                    _source = _default_source()
+                _refresh(_source)
+            except Exception:
+                if _current is None:
+                    raise
+                # Retry after CHECK_SECONDS rather than on every rerun
+                _checked_at = time.monotonic()
+                log.warning("yarn sheet refresh failed; serving the previous snapshot", exc_info=True)
+        return _current
+
+
+def rows(start_date, end_date=None) -> pd.DataFrame:
+    """YARN test rows dated ``start_date`` to ``end_date`` (inclusive; default one day)."""
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize() if end_date is not None else start
+    return sheet().data.loc[start:end].copy()
+
+
+def quality_means(date) -> pd.DataFrame:
+    """
+    Average weight and MR per quality for one date, as
+    ``Quality, Avg Wt /450 yds in Gms1, Avg MR`` (empty if nothing was
+    tested that day).
+    """
+    snapshot = sheet()
+    day = pd.Timestamp(date).normalize()
+    key = (snapshot.version, day)
+    with _lock:
+        cached = _means.get(key)
+    if cached is None:
+        cached = yarn.quality_means(snapshot.data.loc[day:day])
+        with _lock:
+            if snapshot.version == _version:
+                _means[key] = cached
+    return cached.copy()
+
+
+def std_params() -> pd.DataFrame:
+    """Std Count and Std MR% per quality from the STD worksheet."""
+    return sheet().std.copy()
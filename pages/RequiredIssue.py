@@ -2,10 +2,15 @@
 import datetime as dt
 from datetime import date, time, datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from sqlalchemy import text  # works with your existing engine
 
+from batching import maturity
+from batching.spreader_checkpoint import stock_window
+from batching.spreader_ledger import parse_ledger_dt
+
 # ------------------------------------------------------------------
 # Replace this import with your actual engine/provider if different
 # from my_project.db import engine
@@ -138,80 +143,10 @@ def q3_batch_composition(_engine) -> pd.DataFrame:
 @st.cache_data(ttl=60)
 def q4_roll_stock_snapshot(_engine, opening_dt: str, closing_dt: str) -> pd.DataFrame:
     """
-    Uses your existing window query. With opening==closing, window contributions are zero,
-    so you effectively get 'closing stock as of snapshot'.
+    Roll stock window from the daily stock checkpoints. With opening==closing, window
+    contributions are zero, so you effectively get 'closing stock as of snapshot'.
     """
-    sql = text("""
-        SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-               SUM(openstock) AS openstock,
-               SUM(prodroll)  AS prodroll,
-               SUM(issueroll) AS issueroll,
-               SUM(openstock) + SUM(prodroll) - SUM(issueroll) AS closstock
-        FROM (
-            -- Opening stock from production before snapshot
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   SUM(no_of_rolls) AS openstock, 0 AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT spe.entry_id_grp, spe.entry_date, spe.entry_time, spe.bin_no, spe.wt_per_roll,
-                       spe.jute_quality_id, spe.no_of_rolls,
-                       CASE WHEN spe.entry_time < 6 THEN DATE_ADD(spe.entry_date, INTERVAL -1 DAY) ELSE spe.entry_date END AS proddate
-                FROM EMPMILL12.spreader_prod_entry spe
-            ) sprdprod
-            WHERE STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H') < STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Opening stock negative adjustment from issues before snapshot
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   -SUM(no_of_rolls) AS openstock, 0 AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT sri.entry_id_grp, spe.jute_quality_id, spe.bin_no, sri.wt_per_roll,issue_date,
-                       CASE WHEN sri.issue_time < 6 THEN DATE_ADD(sri.issue_date, INTERVAL -1 DAY) ELSE sri.issue_date END AS issudate,
-                       sri.issue_time, sri.no_of_rolls
-                FROM EMPMILL12.spreader_roll_issue sri
-                LEFT JOIN (select entry_id_grp,bin_no,jute_quality_id,sum(no_of_rolls) pdrolls
-                           from EMPMILL12.spreader_prod_entry
-                           group by entry_id_grp,bin_no,jute_quality_id) spe 
-                       ON spe.entry_id_grp = sri.entry_id_grp
-            ) sprdissu
-            WHERE STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H') < STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Production within window (zero when opening==closing)
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   0 AS openstock, SUM(no_of_rolls) AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT spe.entry_id_grp, spe.entry_date, spe.entry_time, spe.bin_no, spe.wt_per_roll,
-                       spe.jute_quality_id, spe.no_of_rolls,
-                       CASE WHEN spe.entry_time < 6 THEN DATE_ADD(spe.entry_date, INTERVAL -1 DAY) ELSE spe.entry_date END AS proddate
-                FROM EMPMILL12.spreader_prod_entry spe
-            ) sprdprod2
-            WHERE STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H') >= STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-              AND STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H') < STR_TO_DATE(:closing_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Issues within window (zero when opening==closing)
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   0 AS openstock, 0 AS prodroll, SUM(no_of_rolls) AS issueroll
-            FROM (
-                SELECT sri.entry_id_grp, spe.jute_quality_id, spe.bin_no, sri.wt_per_roll,issue_date,
-                       CASE WHEN sri.issue_time < 6 THEN DATE_ADD(sri.issue_date, INTERVAL -1 DAY) ELSE sri.issue_date END AS issudate,
-                       sri.issue_time, sri.no_of_rolls
-                FROM EMPMILL12.spreader_roll_issue sri
-                LEFT JOIN (select entry_id_grp,bin_no,jute_quality_id,sum(no_of_rolls) pdrolls
-                           from EMPMILL12.spreader_prod_entry
-                           group by entry_id_grp,bin_no,jute_quality_id) spe 
-                       ON spe.entry_id_grp = sri.entry_id_grp
-            ) sprdissu2
-            WHERE STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H') >= STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-              AND STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H') < STR_TO_DATE(:closing_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-        ) g
-        GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-        HAVING closstock <> 0 OR openstock <> 0 OR prodroll <> 0 OR issueroll <> 0
-        ORDER BY bin_no, entry_id_grp, wt_per_roll;
-    """)
-    with _engine.connect() as cn:
-        df = pd.read_sql(sql, cn, params={"opening_dt": opening_dt, "closing_dt": closing_dt})
+    df = stock_window(parse_ledger_dt(opening_dt), parse_ledger_dt(closing_dt))
     # Derive MT (rolls * wt_per_roll / 1000)
     if not df.empty:
         df["closstock_rolls"] = df["closstock"]
@@ -241,8 +176,9 @@ def q6_jute_quality_lookup(_engine) -> pd.DataFrame:
 # ------------------
 # LOAD DATA (A) & (B)
 # ------------------
-from db import engine
+from db import get_engine
 
+engine = get_engine()
 prod_df = q1_production_by_yarn(engine, selected_date)
 plan_df = q2_batch_plan_window(engine, range_start, range_end)
 composition_df = q3_batch_composition(engine)
@@ -603,11 +539,9 @@ else:
                             )
                             target_stock = target_stock.drop(columns=["jute_quality"], errors="ignore")
                             target_stock["maturity_hours"] = target_stock["maturity_hours"].fillna(0.0)
-
-                            for date_col in date_columns:
-                                target_stock[date_col] = (
-                                    target_stock[date_col] * target_stock["maturity_hours"] / 24.0
-                                ).round(3)
+                            target_stock[date_columns] = (
+                                target_stock[date_columns].mul(maturity.cover_days(target_stock["maturity_hours"]), axis=0)
+                            ).round(3)
 
                             target_stock_display = target_stock[[
                                 "Jute Quality",
@@ -640,51 +574,40 @@ else:
                                 current_stock_map = dict(zip(current_stock["label"], current_stock["closstock_MT"].round(3)))
                                 current_stock_df = current_stock[["label", "closstock_MT"]].copy()
 
-                            target_stock_snapshot_rows = []
-                            planned_qualities = set()
-                            for _, row in target_stock.iterrows():
-                                maturity_hours = float(row.get("maturity_hours", 0.0) or 0.0)
-                                days_offset = int(round(maturity_hours / 24.0, 0)) + 1
-                                closing_dt = selected_date + timedelta(days=days_offset)
-                                closing_dt_str = closing_dt.strftime("%Y-%m-%d")
-                                target_value = float(row.get(closing_dt_str, 0.0) or 0.0)
-                                current_value = current_stock_map.get(row["Jute Quality"], 0.0)
-                                plan_issue = float(jute_day_totals_map.get(row["Jute Quality"], 0.0) or 0.0)
-                                required_issue = target_value - (current_value - plan_issue)
-                                planned_qualities.add(row["Jute Quality"])
-                                target_stock_snapshot_rows.append({
-                                    "Jute Quality": row["Jute Quality"],
-                                    "Closing Target Stock Date": closing_dt_str,
-                                    "Target Stock (MT)": round(target_value, 3),
-                                    "Current Roll Stock (MT)": round(current_value, 3),
-                                    "Plan Issue (MT)": round(plan_issue, 3),
-                                    "Required Issue": round(required_issue, 3)
-                                })
-
-                            if not current_stock_df.empty:
-                                for _, stock_row in current_stock_df.iterrows():
-                                    label = stock_row["label"]
-                                    if label in planned_qualities:
-                                        continue
-                                    maturity_hours = float(maturity_lookup.get(label, 0.0) or 0.0)
-                                    days_offset = int(round(maturity_hours / 24.0, 0))
-                                    closing_dt = selected_date + timedelta(days=days_offset)
-                                    closing_dt_str = closing_dt.strftime("%Y-%m-%d") if maturity_hours else selected_date.strftime("%Y-%m-%d")
-                                    plan_issue = float(jute_day_totals_map.get(label, 0.0) or 0.0)
-                                    current_value = float(stock_row["closstock_MT"] or 0.0)
-                                    required_issue = 0.0 - (current_value - plan_issue)
-                                    target_stock_snapshot_rows.append({
-                                        "Jute Quality": label,
-                                        "Closing Target Stock Date": closing_dt_str,
-                                        "Target Stock (MT)": 0.0,
-                                        "Current Roll Stock (MT)": round(current_value, 3),
-                                        "Plan Issue (MT)": round(plan_issue, 3),
-                                        "Required Issue": round(required_issue, 3)
-                                    })
-
-                            if target_stock_snapshot_rows:
-                                snapshot_df = pd.DataFrame(target_stock_snapshot_rows)
-                                snapshot_df = snapshot_df.sort_values(
+                            # Planned qualities: target stock on the day their maturity window covers
+                            closing = maturity.closing_dates(selected_date, target_stock["maturity_hours"], extra_days=1)
+                            date_pos = pd.Index(date_columns).get_indexer(closing)
+                            date_values = target_stock[date_columns].to_numpy(dtype=float)
+                            target_value = np.where(
+                                date_pos >= 0, date_values[np.arange(len(target_stock)), date_pos.clip(min=0)], 0.0
+                            )
+                            planned = pd.DataFrame({
+                                "Jute Quality": target_stock["Jute Quality"],
+                                "Closing Target Stock Date": closing,
+                                "Target Stock (MT)": target_value,
+                                "Current Roll Stock (MT)": target_stock["Jute Quality"].map(current_stock_map).fillna(0.0).astype(float),
+                                "Plan Issue (MT)": target_stock["Jute Quality"].map(jute_day_totals_map).fillna(0.0).astype(float),
+                            })
+                            # Stocked qualities outside the plan: no target, only the current stock to run down
+                            unplanned = current_stock_df[~current_stock_df["label"].isin(set(target_stock["Jute Quality"]))]
+                            unplanned = pd.DataFrame({
+                                "Jute Quality": unplanned["label"],
+                                "Closing Target Stock Date": maturity.closing_dates(
+                                    selected_date, unplanned["label"].map(maturity_lookup)
+                                ),
+                                "Target Stock (MT)": 0.0,
+                                "Current Roll Stock (MT)": unplanned["closstock_MT"].fillna(0.0).astype(float),
+                                "Plan Issue (MT)": unplanned["label"].map(jute_day_totals_map).fillna(0.0).astype(float),
+                            })
+                            snapshot_all = pd.concat([planned, unplanned], ignore_index=True)
+                            snapshot_all["Required Issue"] = snapshot_all["Target Stock (MT)"] - (
+                                snapshot_all["Current Roll Stock (MT)"] - snapshot_all["Plan Issue (MT)"]
+                            )
+                            mt_cols = ["Target Stock (MT)", "Current Roll Stock (MT)", "Plan Issue (MT)", "Required Issue"]
+                            snapshot_all[mt_cols] = snapshot_all[mt_cols].round(3)
+
+                            if not snapshot_all.empty:
+                                snapshot_df = snapshot_all.sort_values(
                                     by="Current Roll Stock (MT)", ascending=False
                                 ).reset_index(drop=True)
                                 target_stock_snapshot_caption = (
@@ -3,11 +3,13 @@ import streamlit as st
 import pandas as pd
 from batching.spreaderprodentry import (
     insert_spreader_prod_entry,
+    insert_spreader_prod_entries,
     fetch_bins_with_stock,
     delete_spreader_prod_entry
 )
 
-from batching.rollestockbatchingquery import get_bin_no, get_jute_quality, get_maturity_hours, get_spreader_machine_no, get_recent_jute_quality_ids_90d
+from batching import maturity, spells, spreader_catalog
+from batching.spreader_ledger import ensure_ledger_timestamps
 
  
 
@@ -16,17 +18,17 @@ st.set_page_config(page_title="Spreader Production Entry", page_icon="🧵", lay
 
 
 st.title("Spreader Production Entry")
+if st.sidebar.button("Reload master lists", help="Bins, qualities, maturity hours and spreaders are cached for all users"):
+    spreader_catalog.invalidate(recent=True)
 tab1, tab2, tab3, tab4, tab5,tab6 = st.tabs(["Production Entry", "Roll Stock", "Issue Roll", "Roll Stock Time", "Spreader Production","Bin Search"])
 
-# --- Load dropdown options ---
-bin_options = get_bin_no()
+# --- Load dropdown options (shared catalog, see batching/spreader_catalog.py) ---
+catalog = spreader_catalog.catalog()
+bin_options = list(catalog.bins)
 
-jq_df = get_jute_quality()
+jq_df = catalog.jute_quality.copy()
 # Filter by recent 90-day actual qualities without changing the base query
-try:
-    _recent_ids = set(get_recent_jute_quality_ids_90d())
-except Exception:
-    _recent_ids = set()
+_recent_ids = set(catalog.recent_quality_ids)
 if not jq_df.empty and _recent_ids:
     jq_df_filtered = jq_df[jq_df['id'].isin(_recent_ids)].copy()
 else:
@@ -51,7 +53,7 @@ st.write("Selected ID:", selected_id)
 
 
 # Spreader machine options: display name (code), use id for DB
-spreader_df = get_spreader_machine_no()
+spreader_df = catalog.spreaders.copy()
 if isinstance(spreader_df, pd.DataFrame) and not spreader_df.empty:
     spreader_df = spreader_df.fillna("")
     spreader_df['display'] = spreader_df['mechine_name'].astype(str) + " (" + spreader_df['mech_code'].astype(str) + ")"
@@ -96,19 +98,8 @@ with tab1:
     with col1:
         entry_date = st.date_input("Entry Date", datetime.date.today(), key="spe_entry_date")
         entry_time = st.number_input("Entry Time (hour, 0-23)", min_value=0, max_value=23, step=1, value=now_hour, key="spe_entry_time")
-        def get_default_spell(_h):
-            if 6 <= _h < 11:
-                return "A1"
-            elif 11 <= _h < 14:
-                return "B1"
-            elif 14 <= _h < 17:
-                return "A2"
-            elif 17 <= _h < 22:
-                return "B2"
-            else:
-                return "C"
-        default_spell = get_default_spell(int(entry_time))
-        spell_options = ["A1", "A2", "B1", "B2", "C"]
+        default_spell = spells.spell_for_hour(int(entry_time))
+        spell_options = list(spells.SPELLS)
         spell_index = spell_options.index(default_spell) if default_spell in spell_options else 0
         spell = st.selectbox("Spell", spell_options, index=spell_index, key="spe_spell")
     with col2:
@@ -133,42 +124,21 @@ with tab1:
             st.text_input("Wt per Roll (kg)", value=f"{wt_per_roll:.2f}", disabled=True, key="spe_wt_per_roll_display")
         st.text_input("EB No.", value="", disabled=True, key="spe_ebno")
     with col3:
-        from batching.spreader_rules import evaluate_4hr_window
-        from sqlalchemy import text
+        from batching.spreader_balance import ensure_balance
+        from batching.spreader_rules import fetch_group_facts, window_from_facts
         from db import engine
         bin_no = st.selectbox("Bin No", bin_options, key="spe_bin_no")
         last_quality = None
         lock_quality = False
         block_entry = False
+        ensure_balance()
         with engine.connect() as conn:
-            active_grp_sql = text(
-                """
-                SELECT z.entry_id_grp, z.jute_quality_id
-                FROM (
-                    SELECT p.entry_id_grp,
-                           CAST(SUBSTRING_INDEX(MIN(CONCAT(p.entry_date,' ',LPAD(p.entry_time,2,'0'),':00:00','|',LPAD(p.jute_quality_id,6,'0'))),'|',-1) AS UNSIGNED) AS jute_quality_id
-                    FROM EMPMILL12.spreader_prod_entry p
-                    WHERE p.bin_no = :bin_no
-                    GROUP BY p.entry_id_grp
-                ) z
-                JOIN (
-                    SELECT p.entry_id_grp,
-                           SUM(p.no_of_rolls) AS total_rolls,
-                           COALESCE((SELECT SUM(i.no_of_rolls) FROM EMPMILL12.spreader_roll_issue i WHERE i.entry_id_grp = p.entry_id_grp),0) AS total_issued
-                    FROM EMPMILL12.spreader_prod_entry p
-                    WHERE p.bin_no = :bin_no
-                    GROUP BY p.entry_id_grp
-                ) s ON z.entry_id_grp = s.entry_id_grp
-                WHERE (s.total_rolls - s.total_issued) > 0
-                ORDER BY z.entry_id_grp DESC
-                LIMIT 1
-                """
-            )
-            r = conn.execute(active_grp_sql, {"bin_no": bin_no}).fetchone()
-            if r:
-                active_grp, last_quality = int(r[0]), int(r[1])
+            # Open group of the bin, its frozen quality and the window facts in one round trip
+            facts = fetch_group_facts(conn, entry_date, bin_no=bin_no)
+            if facts.entry_id_grp is not None and facts.exists:
+                active_grp, last_quality = facts.entry_id_grp, facts.quality_id
                 lock_quality = True
-                win = evaluate_4hr_window(active_grp, entry_date, int(entry_time))
+                win = window_from_facts(facts, entry_date, int(entry_time))
                 if win:
                     if not win.allowed:
                         block_entry = True
@@ -257,6 +227,76 @@ with tab1:
             else:
                 st.warning("Saved entry but couldn't retrieve insert id.")
 
+    # --- Batch entry: several bins/spreaders in one save (e.g. end-of-shift catch-up) ---
+    with st.expander("Batch Entry (several rows at once)"):
+        st.caption(
+            f"Rows are saved for {entry_date:%d-%m-%Y}. Spell follows the hour and weight per roll follows the spreader. "
+            "All rows are checked together; nothing is saved until every row passes."
+        )
+        batch_blank = pd.DataFrame({
+            "Bin": pd.Series([None] * 5, dtype="object"),
+            "Hour": pd.Series([now_hour] * 5, dtype="Int64"),
+            "Spreader": pd.Series([None] * 5, dtype="object"),
+            "Jute Quality": pd.Series([None] * 5, dtype="object"),
+            "Trolley No": pd.Series([0] * 5, dtype="Int64"),
+            "No. of Rolls": pd.Series([0] * 5, dtype="Int64"),
+        })
+        # A form keeps grid edits from rerunning the page until Save is pressed
+        with st.form("spe_batch_form", clear_on_submit=False):
+            batch_df = st.data_editor(
+                batch_blank,
+                key=f"spe_batch_editor_{st.session_state.get('_spe_batch_key', 0)}",
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Bin": st.column_config.SelectboxColumn("Bin", options=list(bin_options)),
+                    "Hour": st.column_config.NumberColumn("Hour", min_value=0, max_value=23, step=1),
+                    "Spreader": st.column_config.SelectboxColumn("Spreader", options=spreader_display_options),
+                    "Jute Quality": st.column_config.SelectboxColumn("Jute Quality", options=jq_options),
+                    "Trolley No": st.column_config.NumberColumn("Trolley No", min_value=0, step=1),
+                    "No. of Rolls": st.column_config.NumberColumn("No. of Rolls", min_value=0, step=1),
+                },
+            )
+            batch_clicked = st.form_submit_button("Save Batch")
+        if batch_clicked:
+            # Rows left completely blank are ignored
+            filled = batch_df[batch_df[["Bin", "Spreader", "Jute Quality"]].notna().any(axis=1)
+                              | (batch_df["No. of Rolls"].fillna(0) > 0)].reset_index(drop=True)
+            filled["Spell"] = spells.spells_for_hours(filled["Hour"])
+            batch_rows = []
+            for _, r in filled.iterrows():
+                hour = int(r["Hour"]) if pd.notna(r["Hour"]) else None
+                try:
+                    wt = float(spreader_bobbin_weight_map.get(r["Spreader"]))
+                except (TypeError, ValueError):
+                    wt = 0.0
+                batch_rows.append({
+                    "bin_no": r["Bin"],
+                    "entry_time": hour,
+                    "spell": r["Spell"],
+                    "spreader_no": spreader_id_map.get(r["Spreader"]),
+                    "jute_quality_id": jq_id_map.get(r["Jute Quality"], 0),
+                    "no_of_rolls": r["No. of Rolls"] if pd.notna(r["No. of Rolls"]) else 0,
+                    "trolley_no": r["Trolley No"] if pd.notna(r["Trolley No"]) else 0,
+                    "wt_per_roll": 0.0 if pd.isna(wt) else wt,
+                })
+            if not batch_rows:
+                st.warning("Enter at least one row.")
+            else:
+                inserted, batch_errors = insert_spreader_prod_entries(entry_date, batch_rows)
+                if batch_errors:
+                    err_df = filled.loc[[pos for pos, _ in batch_errors]].copy()
+                    err_df.insert(0, "Row", [pos + 1 for pos, _ in batch_errors])
+                    err_df["Error"] = [msg for _, msg in batch_errors]
+                    st.error(f"{len(batch_errors)} of {len(batch_rows)} row(s) failed; nothing was saved.")
+                    st.dataframe(err_df, hide_index=True, use_container_width=True)
+                else:
+                    st.toast(f"Saved {inserted} entries", icon="✅")
+                    st.session_state["_spe_batch_key"] = st.session_state.get("_spe_batch_key", 0) + 1
+                    st.session_state["_spe_refresh_key"] = st.session_state.get("_spe_refresh_key", 0) + 1
+                    st.rerun()
+
     # --- Daily entries summary (for selected entry_date) ---
     # Display all production entries for the chosen date (not filtered by spell/time) below the submit section
     from sqlalchemy import text as _text
@@ -522,24 +562,16 @@ with tab2:
 
         # Compute current rolls and maturity using avg_entry_ts per bin/group
         filtered_df['Current Rolls'] = filtered_df['no_of_rolls'] - filtered_df['issued_rolls'].fillna(0)
-        now_ts = int(datetime.datetime.now().timestamp())
         # avg_entry_ts comes from backend in seconds; fallback: synthesize from entry_date + entry_time
         if 'avg_entry_ts' in filtered_df.columns:
-            avg_ts = filtered_df['avg_entry_ts'].fillna(0).astype(float).astype(int)
+            entry_start = filtered_df['avg_entry_ts'].fillna(0).astype(float)
         else:
-            # fallback
-            dt_series = pd.to_datetime(filtered_df['entry_date']) + pd.to_timedelta(filtered_df['entry_time'], unit='h')
-            avg_ts = (dt_series.view('int64') // 10**9).astype(int)
-        filtered_df['Maturity (hrs)'] = ((now_ts - avg_ts) / 3600).clip(lower=0).round(0).astype(int)
+            entry_start = maturity.entry_timestamps(filtered_df['entry_date'], filtered_df['entry_time'])
+        filtered_df['Maturity (hrs)'] = maturity.elapsed_hours(entry_start)
         filtered_df = filtered_df.sort_values(by='Maturity (hrs)', ascending=False, na_position='last').reset_index(drop=True)
 
-        # Target maturity mapping
-        maturity_df = get_maturity_hours()
-        if isinstance(maturity_df, pd.DataFrame) and not maturity_df.empty:
-            maturity_map = dict(zip(maturity_df['jute_quality_id'], maturity_df['maturity_hours']))
-        else:
-            maturity_map = {}
-        filtered_df['Target Maturity (hrs)'] = filtered_df['jute_quality_id'].map(maturity_map).fillna(48).astype(int)
+        # Target maturity from maturity_time_master (48 h when a quality has none)
+        filtered_df['Target Maturity (hrs)'] = maturity.target_hours(filtered_df['jute_quality_id'], catalog.maturity_hours)
 
         # Prepare display with totals
         show_df = filtered_df.copy()
@@ -596,29 +628,10 @@ with tab2:
             display_df = show_df.drop(columns=drop_cols)
 
         # Conditional formatting for Maturity vs Target
-        def _highlight_row(row):
-            try:
-                actual = row['Maturity (hrs)']
-                target = row['Target Maturity (hrs)']
-            except Exception:
-                return [''] * len(row)
-            styles = [''] * len(row)
-            if pd.notna(actual) and pd.notna(target):
-                # Find column index for 'Maturity (hrs)'
-                try:
-                    m_idx = list(row.index).index('Maturity (hrs)')
-                except ValueError:
-                    m_idx = None
-                if m_idx is not None:
-                    if abs(actual - target) <= 2:
-                        styles[m_idx] = 'background-color: #d4edda'  # green: within ±2 hours
-                    elif actual < target:
-                        styles[m_idx] = 'background-color: #fff3cd'  # yellow: below target maturity
-                    else:
-                        styles[m_idx] = 'background-color: #f8d7da'  # red: above target maturity
-            return styles
-
-        styled = display_df.style.apply(_highlight_row, axis=1).format({"Quantity (MT)": "{:.2f}"})
+        maturity_states = maturity.maturity_state(display_df['Maturity (hrs)'], display_df['Target Maturity (hrs)'])
+        styled = display_df.style.apply(
+            maturity.state_styles, column='Maturity (hrs)', state=maturity_states, axis=None
+        ).format({"Quantity (MT)": "{:.2f}"})
         try:
             styled = styled.hide(axis='index')
         except Exception:
@@ -680,20 +693,8 @@ with tab3:
         issue_time = st.number_input("Issue Time (hour, 0-23)", min_value=0, max_value=23, step=1, value=now_hour, key="issue_time")
 
         # Use the same spell logic as in production entry
-        def get_default_spell(entry_time):
-            if 6 <= entry_time < 11:
-                return "A1"
-            elif 11 <= entry_time < 14:
-                return "B1"
-            elif 14 <= entry_time < 17:
-                return "A2"
-            elif 17 <= entry_time < 22:
-                return "B2"
-            else:
-                return "C"
-
-        default_issue_spell = get_default_spell(issue_time)
-        spell_options = ["A1", "A2", "B1", "B2", "C"]
+        default_issue_spell = spells.spell_for_hour(int(issue_time))
+        spell_options = list(spells.SPELLS)
         spell_index = spell_options.index(default_issue_spell) if default_issue_spell in spell_options else 0
         issue_spell = st.selectbox("Issue Spell", spell_options, index=spell_index, key="issue_spell")
     with col3:
@@ -950,6 +951,7 @@ with tab4:
     st.caption("Shows opening rolls (before snapshot), production and issues within lookback window, and closing rolls at snapshot.")
     from sqlalchemy import text as _t4text
     from db import engine as _t4engine
+    from batching.spreader_checkpoint import stock_window
 
     # New UX: user selects Closing (snapshot) date/hour; Opening is auto 24h prior
     c1, c2 = st.columns(2)
@@ -964,86 +966,16 @@ with tab4:
     opening_str = opening_dt.strftime("%Y-%m-%d %H")
     st.caption(f"Opening: {opening_str}:00 | Closing: {closing_str}:00 (24h window)")
 
-    # Parameterized adaptation of provided SQL template.
     # Logic:
-    #  - openstock: production minus issues strictly before snapshot
-    #  - prodroll / issueroll: activity between start_dt and snapshot_dt inclusive
+    #  - openstock: production minus issues strictly before the opening time,
+    #    from the nearest daily stock checkpoint plus the ledger rows since
+    #  - prodroll / issueroll: activity between opening and closing
     #  - closing = opening + prod - issue
-    raw_sql = _t4text(
-        """
-       SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-               SUM(openstock) AS openstock,
-               SUM(prodroll)  AS prodroll,
-               SUM(issueroll) AS issueroll,
-               SUM(openstock) + SUM(prodroll) - SUM(issueroll) AS closstock
-        FROM (
-            -- Opening stock from production before snapshot
-        SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   SUM(no_of_rolls) AS openstock, 0 AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT spe.entry_id_grp, spe.entry_date, spe.entry_time, spe.bin_no, spe.wt_per_roll,
-                       spe.jute_quality_id, spe.no_of_rolls,
-                       CASE WHEN spe.entry_time < 6 THEN DATE_ADD(spe.entry_date, INTERVAL -1 DAY) ELSE spe.entry_date END AS proddate
-                FROM EMPMILL12.spreader_prod_entry spe
-            ) sprdprod
-            WHERE STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H') < STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Opening stock negative adjustment from issues before snapshot
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   -SUM(no_of_rolls) AS openstock, 0 AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT sri.entry_id_grp, spe.jute_quality_id, spe.bin_no, sri.wt_per_roll,issue_date,
-                       CASE WHEN sri.issue_time < 6 THEN DATE_ADD(sri.issue_date, INTERVAL -1 DAY) ELSE sri.issue_date END AS issudate,
-                       sri.issue_time, sri.no_of_rolls
-                FROM EMPMILL12.spreader_roll_issue sri
-                LEFT JOIN (select entry_id_grp,bin_no,jute_quality_id,sum(no_of_rolls) pdrolls
-            from EMPMILL12.spreader_prod_entry
-                        group by entry_id_grp,bin_no,jute_quality_id) spe ON spe.entry_id_grp = sri.entry_id_grp
-            ) sprdissu
-            WHERE STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H') < STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Production within window
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   0 AS openstock, SUM(no_of_rolls) AS prodroll, 0 AS issueroll
-            FROM (
-                SELECT spe.entry_id_grp, spe.entry_date, spe.entry_time, spe.bin_no, spe.wt_per_roll,
-                       spe.jute_quality_id, spe.no_of_rolls,
-                       CASE WHEN spe.entry_time < 6 THEN DATE_ADD(spe.entry_date, INTERVAL -1 DAY) ELSE spe.entry_date END AS proddate
-                FROM EMPMILL12.spreader_prod_entry spe
-            ) sprdprod2
-            WHERE STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H') >= STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            AND STR_TO_DATE(CONCAT(entry_date, ' ', entry_time), '%Y-%m-%d %H')< STR_TO_DATE(:closing_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-            UNION ALL
-            -- Issues within window
-            SELECT bin_no, entry_id_grp, wt_per_roll, jute_quality_id,
-                   0 AS openstock, 0 AS prodroll, SUM(no_of_rolls) AS issueroll
-            FROM (
-                SELECT sri.entry_id_grp, spe.jute_quality_id, spe.bin_no, sri.wt_per_roll,issue_date,
-                       CASE WHEN sri.issue_time < 6 THEN DATE_ADD(sri.issue_date, INTERVAL -1 DAY) ELSE sri.issue_date END AS issudate,
-                       sri.issue_time, sri.no_of_rolls
-                FROM EMPMILL12.spreader_roll_issue sri
-                LEFT JOIN (select entry_id_grp,bin_no,jute_quality_id,sum(no_of_rolls) pdrolls
-            from EMPMILL12.spreader_prod_entry
-                        group by entry_id_grp,bin_no,jute_quality_id) spe ON spe.entry_id_grp = sri.entry_id_grp
-            ) sprdissu2
-            WHERE STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H')>= STR_TO_DATE(:opening_dt, '%Y-%m-%d %H')
-            AND STR_TO_DATE(CONCAT(issue_date, ' ', issue_time), '%Y-%m-%d %H')< STR_TO_DATE(:closing_dt, '%Y-%m-%d %H')
-            GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-        ) g
-        GROUP BY bin_no, entry_id_grp, wt_per_roll, jute_quality_id
-        HAVING closstock <> 0 OR openstock <> 0 OR prodroll <> 0 OR issueroll <> 0
-        ORDER BY bin_no, entry_id_grp, wt_per_roll
-        """
-    )
 
     load_btn = st.button("Load 24h Window", key="rst_load_btn")
     if load_btn:
         try:
-            with _t4engine.connect() as conn:
-                pos_df = pd.read_sql(raw_sql, conn, params={"opening_dt": opening_str, "closing_dt": closing_str})
+            pos_df = stock_window(opening_dt, closing_dt)
             if pos_df.empty:
                 st.info("No data for the selected window.")
             else:
@@ -1213,7 +1145,7 @@ with tab5:
 with tab6:
     st.markdown("#### Bin Search")
     st.caption("Bin And Quality Search production and issues")
-    jq_dfb = get_jute_quality()
+    jq_dfb = catalog.jute_quality.copy()
     
     # Three columns
     c1, c2, c3 = st.columns(3)
@@ -1261,23 +1193,23 @@ with tab6:
     ) OVER (PARTITION BY entry_id_grp ORDER BY trandate, rem, entryid) AS cumulative_rolls
 FROM (
 SELECT '1P' rem, spe.entry_id_grp, spe.spreader_prod_entry_id entryid,
-           STR_TO_DATE(CONCAT(ENTRY_DATE, ' ', entry_time), '%Y-%m-%d %H') trandate,
+           spe.entry_dt trandate,
            spell, spreader_no, spe.jute_quality_id, jute_quality, spe.bin_no, spe.no_of_rolls,
            pdate,case when entry_time <6 then date_add(entry_date, INTERVAL -1 DAY) else entry_date end
            actdate
     FROM EMPMILL12.spreader_prod_entry spe 
     LEFT JOIN jute_quality_price_master jqpm ON jqpm.id = spe.jute_quality_id 
-	left join (select entry_id_grp,jute_quality_id,bin_no,max(STR_TO_DATE(CONCAT(ENTRY_DATE, ' ', entry_time), '%Y-%m-%d %H')) pdate,sum(no_of_rolls) from  EMPMILL12.spreader_prod_entry spe 
+	left join (select entry_id_grp,jute_quality_id,bin_no,max(entry_dt) pdate,sum(no_of_rolls) from  EMPMILL12.spreader_prod_entry spe 
 	group by 
 	entry_id_grp,jute_quality_id,bin_no ) spe2 on spe.entry_id_grp=spe2.entry_id_grp
     UNION ALL
     SELECT '2I' rem, sri.entry_id_grp, sri.spreader_roll_issue_id entryid,
-           STR_TO_DATE(CONCAT(issue_DATE, ' ', issue_time), '%Y-%m-%d %H') trandate,
+           sri.issue_dt trandate,
            sri.spell, ' ' spreader_no, spe.jute_quality_id, jqpm.jute_quality, bin_no, sri.no_of_rolls,
             pdate,case when issue_time <6 then date_add(issue_date, INTERVAL -1 DAY) else issue_date end
            actdate
     FROM EMPMILL12.spreader_roll_issue sri
-    LEFT JOIN (select entry_id_grp,jute_quality_id,bin_no,max(STR_TO_DATE(CONCAT(ENTRY_DATE, ' ', entry_time), '%Y-%m-%d %H')) pdate,sum(no_of_rolls) from  EMPMILL12.spreader_prod_entry spe 
+    LEFT JOIN (select entry_id_grp,jute_quality_id,bin_no,max(entry_dt) pdate,sum(no_of_rolls) from  EMPMILL12.spreader_prod_entry spe 
     group by 
     entry_id_grp,jute_quality_id,bin_no
     ) spe ON spe.entry_id_grp = sri.entry_id_grp 
@@ -1311,6 +1243,7 @@ SELECT '1P' rem, spe.entry_id_grp, spe.spreader_prod_entry_id entryid,
     binload_btn = st.button("Search", key="bin_load_btn")
     if binload_btn:
         try:
+            ensure_ledger_timestamps()
             with _t4engine.connect() as conn:
                 #pos_dfb = pd.read_sql(raw_sql, conn, params={"bin_no": bin_no, "jqualityid": jute_quality_bin_id})
                 pos_dfb = pd.read_sql(text_sql, conn, params=params)
@@ -9,7 +9,7 @@ def doff10_detailed():
     start_date = today.replace(day=1)
     end_date = today
 
-    df, _ = get_dofftable_details(start_date, end_date)
+    df = get_dofftable_details(start_date, end_date)
     if not df.empty:
         # Filters for each column except total_netwt
         filter_cols = [col for col in df.columns if col != 'total_netwt']
@@ -2,7 +2,8 @@ import datetime
 import pandas as pd
 import streamlit as st
 from sqlalchemy import text
-from db import engine
+from db import get_engine
+from batching import maturity, spells
 from batching.rollestockbatchingquery import (
 	get_jute_quality,
 	get_maturity_hours,
@@ -20,7 +21,6 @@ with tab1:
 	jq_df = get_jute_quality()
 	jq_map = dict(zip(jq_df['id'], jq_df['jute_quality']))
 	maturity_df = get_maturity_hours()
-	maturity_map = dict(zip(maturity_df['jute_quality_id'], maturity_df['maturity_hours'])) if not maturity_df.empty else {}
 
 	# Query each issue joined to ALL production entries of that group & weight (no aggregation)
 	sql = text(
@@ -45,17 +45,17 @@ with tab1:
 		"""
 	)
 	try:
-		with engine.connect() as conn:
+		with get_engine().connect() as conn:
 			df = pd.read_sql(sql, conn, params={"d": report_date})
 		if df.empty:
 			st.info("No issues recorded for the selected date.")
 		else:
-			# Compute per production-entry maturity relative to issue
-			issue_dt = pd.to_datetime(df['issue_date']) + pd.to_timedelta(df['issue_time'], unit='h')
-			prod_dt = pd.to_datetime(df['prod_entry_date']) + pd.to_timedelta(df['prod_entry_time'], unit='h')
-			# Round maturity to whole hours as requested
-			df['Maturity (hrs)'] = ((issue_dt - prod_dt).dt.total_seconds() / 3600).round(0).astype(int)
-			df['Target Maturity (hrs)'] = df['jute_quality_id'].map(maturity_map).fillna(48).astype(int)
+			# Compute per production-entry maturity relative to issue, in whole hours
+			issue_dt = maturity.entry_timestamps(df['issue_date'], df['issue_time'])
+			prod_dt = maturity.entry_timestamps(df['prod_entry_date'], df['prod_entry_time'])
+			df['Maturity (hrs)'] = maturity.elapsed_hours(prod_dt, issue_dt)
+			df['Target Maturity (hrs)'] = maturity.target_hours(df['jute_quality_id'], maturity_df)
+			states = maturity.maturity_state(df['Maturity (hrs)'], df['Target Maturity (hrs)'])
 			df['Quality'] = df['jute_quality_id'].map(jq_map)
 			df['Issued Weight (kg)'] = (df['issue_rolls'] * df['wt_per_roll'].fillna(0)).round(2)
 			df['Issued Weight (MT)'] = (df['Issued Weight (kg)'] / 1000).round(2)
@@ -85,30 +85,8 @@ with tab1:
 			}
 			show_df = pd.concat([show_df, pd.DataFrame([totals])], ignore_index=True)
 
-			def highlight(row):
-				if row.get('Quality') == 'Total':
-					return [''] * len(row)
-				try:
-					m = float(row['Maturity (hrs)']) if row['Maturity (hrs)'] != '' else None
-					t = float(row['Target Maturity (hrs)']) if row['Target Maturity (hrs)'] != '' else None
-				except Exception:
-					m, t = None, None
-				styles = [''] * len(row)
-				if m is not None and t is not None:
-					if abs(m - t) <= 2:
-						color = '#d4edda'
-					elif m < t - 2:
-						color = '#fff3cd'
-					else:
-						color = '#f8d7da'
-					try:
-						idx = list(row.index).index('Maturity (hrs)')
-						styles[idx] = f'background-color: {color}'
-					except ValueError:
-						pass
-				return styles
-
-			styled = show_df.style.apply(highlight, axis=1)
+			# The totals row has no state and stays uncoloured
+			styled = show_df.style.apply(maturity.state_styles, column='Maturity (hrs)', state=states, axis=None)
 			try:
 				styled = styled.hide(axis='index')
 			except Exception:
@@ -140,17 +118,17 @@ with tab2:
 		"""
 		SELECT entry_date, entry_time, spreader_no, jute_quality_id, no_of_rolls, wt_per_roll
 		FROM EMPMILL12.spreader_prod_entry
-		WHERE (entry_date = :d OR entry_date = DATE_ADD(:d, INTERVAL 1 DAY))
+		WHERE (entry_date = :d OR entry_date = :next_d)
 		  AND (
 				(entry_date = :d)  -- whole selected day
-				OR (entry_date = DATE_ADD(:d, INTERVAL 1 DAY) AND entry_time < 6) -- next-day early hours for C shift
+				OR (entry_date = :next_d AND entry_time < 6) -- next-day early hours for C shift
 			  )
 		ORDER BY entry_date, entry_time
 		"""
 	)
 	try:
 		with _t2engine.connect() as conn:
-			raw_df = pd.read_sql(q, conn, params={"d": report_date})
+			raw_df = pd.read_sql(q, conn, params={"d": report_date, "next_d": report_date + datetime.timedelta(days=1)})
 	except Exception as e:
 		st.error(f"Error loading production data: {e}")
 		raw_df = pd.DataFrame()
@@ -159,29 +137,10 @@ with tab2:
 		st.info("No production entries found for the selected date / window.")
 		st.stop()
 
-	# Compute shift bucket based on time and date relative to report_date
-	def map_shift(row):
-		d = row['entry_date']
-		h = int(row['entry_time']) if pd.notna(row['entry_time']) else -1
-		if d == report_date:
-			if 6 <= h < 11:
-				return 'A1'
-			elif 11 <= h < 14:
-				return 'B1'
-			elif 14 <= h < 17:
-				return 'A2'
-			elif 17 <= h < 22:
-				return 'B2'
-			elif h >= 22:
-				return 'C'
-			else:
-				return None  # early hours belong to previous day's C
-		elif d == (report_date + datetime.timedelta(days=1)):
-			if h < 6:
-				return 'C'
-		return None
-
-	raw_df['Shift'] = raw_df.apply(map_shift, axis=1)
+	# Shift bucket by hour; only rows whose 06:00 production day is report_date count
+	# (next-day early hours are the report day's C shift, same-day early hours the previous day's)
+	in_day = spells.production_dates(raw_df['entry_date'], raw_df['entry_time']) == pd.Timestamp(report_date)
+	raw_df['Shift'] = spells.spells_for_hours(raw_df['entry_time']).where(in_day, None)
 	raw_df = raw_df[raw_df['Shift'].notna()].copy()
 	if raw_df.empty:
 		st.info("No rows fall into defined shifts for this date.")
@@ -194,7 +153,7 @@ with tab2:
 
 	# Filters (multi-selects)
 	all_spreaders = sorted(raw_df['Spreader'].unique().tolist())
-	all_shifts = ['A1','A2','B1','B2','C']
+	all_shifts = list(spells.SPELLS)
 	all_qualities = sorted(raw_df['Quality'].unique().tolist())
 	fc1, fc2, fc3, fc4 = st.columns([1,1,1,2])
 	with fc1:
@@ -211,16 +170,17 @@ with tab2:
 		st.warning("Filters removed all data.")
 		st.stop()
 
+	def shift_pivot(df: pd.DataFrame, entity_col: str, value_col: str) -> pd.DataFrame:
+		"""Sum of value_col per entity (rows) and shift (columns, every shift present, in display order)."""
+		return (
+			df.groupby([entity_col, 'Shift'])[value_col].sum()
+			.unstack('Shift', fill_value=0)
+			.reindex(columns=all_shifts, fill_value=0)
+		)
+
 	# Helper to pivot shift metrics per entity (Spreader or Quality)
 	def build_shift_table(df: pd.DataFrame, entity_col: str, value_label: str):
-		base = df.groupby([entity_col, 'Shift'], dropna=False)['no_of_rolls'].sum().reset_index()
-		pivot = base.pivot(index=entity_col, columns='Shift', values='no_of_rolls').fillna(0).astype(int)
-		# Ensure all shift columns present
-		for s in all_shifts:
-			if s not in pivot.columns:
-				pivot[s] = 0
-		# Ordered columns
-		pivot = pivot[['A1','A2','B1','B2','C']]
+		pivot = shift_pivot(df, entity_col, 'no_of_rolls').astype(int)
 		pivot['A'] = pivot['A1'] + pivot['A2']
 		pivot['B'] = pivot['B1'] + pivot['B2']
 		pivot['Total'] = pivot[['A1','A2','B1','B2','C']].sum(axis=1)
@@ -234,12 +194,7 @@ with tab2:
 		pivot = pd.concat([pivot, pd.DataFrame([totals])], ignore_index=True)
 		# Optional weight columns
 		if show_weight:
-			wbase = df.groupby([entity_col, 'Shift'], dropna=False)['Weight (kg)'].sum().reset_index()
-			wpivot = wbase.pivot(index=entity_col, columns='Shift', values='Weight (kg)').fillna(0).round(2)
-			for s in all_shifts:
-				if s not in wpivot.columns:
-					wpivot[s] = 0.0
-			wpivot = wpivot[['A1','A2','B1','B2','C']]
+			wpivot = shift_pivot(df, entity_col, 'Weight (kg)').round(2)
 			wpivot['A'] = wpivot['A1'] + wpivot['A2']
 			wpivot['B'] = wpivot['B1'] + wpivot['B2']
 			wpivot['Total Wt (kg)'] = wpivot[['A1','A2','B1','B2','C']].sum(axis=1)
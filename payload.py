@@ -0,0 +1,18 @@
+"""
+Serialised payloads for query results.
+
+Query functions return plain DataFrames. The JSON / records forms are only
+built here, when a caller actually needs them (e.g. the raw JSON view on the
+Dofftable page), instead of on every query call.
+"""
+import pandas as pd
+
+
+def records_json(df: pd.DataFrame) -> str:
+    """JSON array of row objects, as previously returned next to each frame."""
+    return df.to_json(orient="records")
+
+
+def records(df: pd.DataFrame) -> list:
+    """List of row dicts."""
+    return df.to_dict(orient="records")
@@ -0,0 +1,205 @@
+"""
+Process-wide result cache for the report query functions.
+
+Streamlit runs every session in the same process, so a module-level cache is
+shared by all users: the first person to open yesterday's report pays for the
+query and everyone after gets the stored frame.
+
+Entries are keyed on the function and its arguments. Their lifetime follows
+the newest date found in the arguments:
+
+    today          TODAY_TTL       (data still being entered)
+    yesterday      YESTERDAY_TTL   (late entries and corrections)
+    last week      RECENT_TTL
+    older          no expiry       (closed dates only leave by LRU eviction)
+    no date arg    DEFAULT_TTL
+
+The cache is bounded by an approximate memory budget (``MIS_QUERY_CACHE_MB``,
+default 256) and evicts least recently used entries first. Callers get their
+own copy of any DataFrame, so mutating a result never touches the cache.
+"""
+import datetime
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+
+TODAY_TTL = 60
+YESTERDAY_TTL = 5 * 60
+RECENT_TTL = 60 * 60
+RECENT_DAYS = 7
+DEFAULT_TTL = 10 * 60
+
+MAX_BYTES = int(float(os.getenv("MIS_QUERY_CACHE_MB", "256")) * 1024 * 1024)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[tuple, tuple]" = OrderedDict()   # key -> (value, expires_at, nbytes)
+_inflight: dict = {}                                     # key -> threading.Event
+_total_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+# --------------------------------------------------------------------------- #
+# Keys, sizes and TTLs                                                        #
+# --------------------------------------------------------------------------- #
+def _as_date(value: Any) -> Optional[datetime.date]:
+    """Return the date an argument refers to, or None if it isn't date-like."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _normalize(value: Any) -> Any:
+    """Make an argument hashable and collapse equivalent date spellings."""
+    if isinstance(value, (datetime.date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def ttl_for_args(args: tuple, kwargs: dict) -> Optional[float]:
+    """Seconds to keep a result computed from these arguments (None = no expiry)."""
+    dates = [d for d in map(_as_date, list(args) + list(kwargs.values())) if d is not None]
+    if not dates:
+        return DEFAULT_TTL
+    age = (datetime.date.today() - max(dates)).days
+    if age <= 0:
+        return TODAY_TTL
+    if age == 1:
+        return YESTERDAY_TTL
+    if age <= RECENT_DAYS:
+        return RECENT_TTL
+    return None
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(v) for v in value) + 64
+    return 256
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+# --------------------------------------------------------------------------- #
+# Store                                                                       #
+# --------------------------------------------------------------------------- #
+def _get(key: tuple):
+    """Return (found, value) and refresh the entry's LRU position."""
+    entry = _entries.get(key)
+    if entry is None:
+        return False, None
+    value, expires_at, nbytes = entry
+    if expires_at is not None and expires_at <= time.monotonic():
+        _drop(key)
+        return False, None
+    _entries.move_to_end(key)
+    return True, value
+
+
+def _drop(key: tuple) -> None:
+    global _total_bytes
+    value, expires_at, nbytes = _entries.pop(key)
+    _total_bytes -= nbytes
+
+
+def _put(key: tuple, value: Any, ttl: Optional[float]) -> None:
+    global _total_bytes
+    nbytes = _sizeof(value)
+    if nbytes > MAX_BYTES:
+        return
+    if key in _entries:
+        _drop(key)
+    expires_at = time.monotonic() + ttl if ttl is not None else None
+    _entries[key] = (value, expires_at, nbytes)
+    _total_bytes += nbytes
+    while _total_bytes > MAX_BYTES and _entries:
+        _drop(next(iter(_entries)))
+        _stats["evictions"] += 1
+
+
+def cached_query(fn: Callable = None, *, ttl: Optional[Callable[[tuple, dict], Optional[float]]] = None):
+    """
+    Cache a query function's results process-wide.
+
+    Args:
+        fn: The query function; arguments must be hashable once dates,
+            lists and dicts are normalised.
+        ttl: Optional ``(args, kwargs) -> seconds`` policy replacing
+            :func:`ttl_for_args`.
+
+    Concurrent calls with the same arguments wait for the first one instead
+    of sending the same query again.
+    """
+    if fn is None:
+        return lambda f: cached_query(f, ttl=ttl)
+    ttl_policy = ttl or ttl_for_args
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__module__, fn.__qualname__, _normalize(args), _normalize(kwargs))
+        while True:
+            with _lock:
+                found, value = _get(key)
+                if found:
+                    _stats["hits"] += 1
+                    return _copy(value)
+                waiter = _inflight.get(key)
+                if waiter is None:
+                    _inflight[key] = threading.Event()
+                    _stats["misses"] += 1
+                    break
+            waiter.wait()
+
+        try:
+            value = fn(*args, **kwargs)
+            with _lock:
+                _put(key, value, ttl_policy(args, kwargs))
+            return _copy(value)
+        finally:
+            with _lock:
+                _inflight.pop(key).set()
+
+    wrapper.invalidate = lambda: invalidate(fn)
+    return wrapper
+
+
+def invalidate(fn: Callable = None) -> None:
+    """Drop cached results of one function (by the undecorated function) or of all."""
+    with _lock:
+        for key in list(_entries):
+            if fn is None or key[:2] == (fn.__module__, fn.__qualname__):
+                _drop(key)
+
+
+def cache_stats() -> dict:
+    """Counters and current size, for diagnostics."""
+    with _lock:
+        return dict(_stats, entries=len(_entries), bytes=_total_bytes, max_bytes=MAX_BYTES)
@@ -0,0 +1,201 @@
+"""
+Per-statement timing for everything that goes through SQLAlchemy.
+
+Listeners on the Engine class time every cursor execute and record it
+against the report function that issued it:
+
+    calls, total / max time, rolling p50 / p95 / p99 (last WINDOW calls),
+    rows returned (cursor.rowcount) and bytes fetched (in-memory size of
+    the frames handed back by ``statements.read_frame``)
+
+The caller is the statement name when the query runs through the
+statements registry, otherwise the first frame on the stack outside the
+database and pandas layers.
+
+Statements slower than ``MIS_SLOW_QUERY_MS`` (unset = off) are logged to the
+``mis.slowquery`` logger. ``MIS_QUERY_STATS=0`` disables recording.
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+WINDOW = 512
+ENABLED = os.getenv("MIS_QUERY_STATS", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("MIS_SLOW_QUERY_MS") or 0) or None
+SQL_PREVIEW_CHARS = 300
+
+# Modules that sit between a report function and the cursor
+_SKIP_PREFIXES = (
+    "sqlalchemy", "pandas", "pymysql", "contextlib", "threading", "concurrent",
+    "querystats", "querycache", "statements", "db",
+)
+
+slow_log = logging.getLogger("mis.slowquery")
+
+_caller: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("query_caller", default=None)
+_lock = threading.Lock()
+_stats: Dict[str, "_CallerStats"] = {}
+_installed = False
+
+
+class _CallerStats:
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "bytes", "recent", "sql", "last_at")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.recent = deque(maxlen=WINDOW)
+        self.sql = ""
+        self.last_at = 0.0
+
+
+# --------------------------------------------------------------------------- #
+# Caller attribution                                                          #
+# --------------------------------------------------------------------------- #
+@contextlib.contextmanager
+def caller(name: str):
+    """Attribute statements executed inside the block to ``name``."""
+    token = _caller.set(name)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def _current_caller() -> str:
+    name = _caller.get()
+    if name is not None:
+        return name
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIP_PREFIXES):
+            break
+        frame = frame.f_back
+    else:
+        return "unknown"
+    if module == "__main__":
+        # Streamlit runs page scripts as __main__
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    if frame.f_code.co_name == "<module>":
+        return f"{module}:{frame.f_lineno}"
+    return f"{module}.{frame.f_code.co_name}"
+
+
+# --------------------------------------------------------------------------- #
+# Engine events                                                               #
+# --------------------------------------------------------------------------- #
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+    name = _current_caller()
+    _record(name, elapsed_ms, rows, statement)
+    if SLOW_QUERY_MS is not None and elapsed_ms >= SLOW_QUERY_MS:
+        slow_log.warning(
+            "slow query %.0f ms in %s (%d rows): %s params=%r",
+            elapsed_ms, name, rows, _preview(statement), parameters,
+        )
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def install() -> None:
+    """Attach the listeners to every Engine (idempotent)."""
+    global _installed
+    if _installed or not ENABLED:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+# --------------------------------------------------------------------------- #
+# Recording and reporting                                                     #
+# --------------------------------------------------------------------------- #
+def _preview(statement: str) -> str:
+    return " ".join(statement.split())[:SQL_PREVIEW_CHARS]
+
+
+def _record(name: str, elapsed_ms: float, rows: int, statement: str) -> None:
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _CallerStats()
+            stats.sql = _preview(statement)
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.rows += rows
+        stats.recent.append(elapsed_ms)
+        stats.last_at = time.time()
+
+
+def record_bytes(name: str, nbytes: int) -> None:
+    """Credit ``nbytes`` of fetched result data to ``name``."""
+    if not ENABLED:
+        return
+    with _lock:
+        stats = _stats.get(name)
+        if stats is not None:
+            stats.bytes += nbytes
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def snapshot() -> List[dict]:
+    """One row per caller, slowest total time first."""
+    with _lock:
+        items = [(name, s, sorted(s.recent)) for name, s in _stats.items()]
+    rows = []
+    for name, s, recent in items:
+        rows.append({
+            "caller": name,
+            "calls": s.calls,
+            "total_s": round(s.total_ms / 1000, 3),
+            "mean_ms": round(s.total_ms / s.calls, 1),
+            "p50_ms": round(_percentile(recent, 0.50), 1),
+            "p95_ms": round(_percentile(recent, 0.95), 1),
+            "p99_ms": round(_percentile(recent, 0.99), 1),
+            "max_ms": round(s.max_ms, 1),
+            "rows_per_call": round(s.rows / s.calls, 1),
+            "mb_fetched": round(s.bytes / (1024 * 1024), 2),
+            "last_at": s.last_at,
+            "sql": s.sql,
+        })
+    rows.sort(key=lambda r: r["total_s"], reverse=True)
+    return rows
+
+
+def reset() -> None:
+    """Forget every recorded statement."""
+    with _lock:
+        _stats.clear()
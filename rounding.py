@@ -0,0 +1,48 @@
+"""
+Rounding for displayed figures.
+
+The report tables used to round each figure with Python's ``round(x, 2)``.
+``Series.round`` / ``ndarray.round`` scale by ``10**places`` first, so on
+values near a half they can land one unit off in the last place
+(``round(665.845, 2)`` is 665.85, ``Series.round`` gives 665.84). Every
+vectorised table rounds through ``round_exact`` instead, so it keeps
+showing the figures the per-row code showed.
+
+Where that code averaged a Python list (``sum(vals) / len(vals)``),
+``row_sums`` adds the same way ``sum`` does, since a sum one bit off can
+round to a different figure too.
+"""
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+def round_exact(values: Union[pd.Series, pd.DataFrame], places: int = 2):
+    """``round(x, places)`` of every value of a Series or DataFrame; NaN stays NaN."""
+    if isinstance(values, pd.DataFrame):
+        out = pd.DataFrame({i: round_exact(values.iloc[:, i], places) for i in range(values.shape[1])}, index=values.index)
+        out.columns = values.columns
+        return out
+    arr = values.to_numpy(dtype=float)
+    out = np.full(len(arr), np.nan)
+    known = ~np.isnan(arr)
+    out[known] = [round(v, places) for v in arr[known].tolist()]
+    return pd.Series(out, index=values.index, name=values.name)
+
+
+def row_sums(arr: np.ndarray) -> np.ndarray:
+    """
+    ``sum(row)`` of each row of a 2-D float array with NaN entries left out,
+    added as Python's ``sum`` adds floats (3.12+): left to right with
+    Neumaier compensation, where numpy's ``sum`` adds pairwise.
+    """
+    total = np.zeros(arr.shape[0])
+    compensation = np.zeros(arr.shape[0])
+    for x in arr.T:
+        # Adding 0.0 leaves both the total and the compensation as they were
+        x = np.where(np.isnan(x), 0.0, x)
+        t = total + x
+        compensation += np.where(np.abs(total) >= np.abs(x), (total - t) + x, (x - t) + total)
+        total = t
+    return np.where(np.isfinite(compensation), total + compensation, total)
@@ -1,14 +1,15 @@
 import pandas as pd
-from db import engine
+from querycache import cached_query
+from statements import register, read_frame, Date
+from workers import attach_names
 
-def spg_details_date(selected_date, start_date):
-	query = f"""
-select doffdate,substr(spell,1,1) shift,attendance_type,ifnull(ebno,"Contract") as ebno,name,frameno,q_code,quality,
+register("spg.spg_details_date", """
+select doffdate,substr(spell,1,1) shift,attendance_type,ifnull(ebno,"Contract") as ebno,frameno,q_code,quality,
 	sum(netwt) netwt,
 	sum(whrs) whrs,  sum(stdprod) stdprod,
 	sum(noofframe) noofframe,round(sum(netwt)/sum(stdprod)*100,2)  eff from
 	(
-	select prd.*,concat(wm.worker_name,' ',ifnull(wm.middle_name,' '),' ',ifnull(wm.last_name ,'') ) as name,concat(sm.std_count,' - Lbs ',sm.subgroup_type) quality,   dea.mc_id,
+	select prd.*,concat(sm.std_count,' - Lbs ',sm.subgroup_type) quality,   dea.mc_id,
 	case when (prd.spell='C' and ebno is null) then ifnull((da.working_hours),7.5)
 	when (prd.spell='A1' and ebno is null) then ifnull((da.working_hours),5)
 	when (prd.spell='A2' and ebno is null) then ifnull((da.working_hours),3)
@@ -32,7 +33,7 @@ select doffdate,substr(spell,1,1) shift,attendance_type,ifnull(ebno,"Contract")
 	from (
 	select dft.company_id,doffdate,dft.spell,ebno,frameno,q_code,mechine_id,round(sum(netwt),2) netwt from dofftable dft
 	left join mechine_master mm on mm.company_id =dft.company_id and mm.mach_shr_code =dft.frameno
-	where doffdate between '{start_date}'and '{selected_date}' and dft.company_id=2 and mm.type_of_mechine=36 and is_active=1
+	where doffdate between :start_date and :selected_date and dft.company_id=2 and mm.type_of_mechine=36 and is_active=1
 	group by dft.company_id,doffdate,dft.spell,ebno,frameno,q_code,mechine_id  
 	) prd
 	left join daily_ebmc_attendance dea on dea.company_id =prd.company_id and prd.spell=dea.spell
@@ -41,27 +42,17 @@ select doffdate,substr(spell,1,1) shift,attendance_type,ifnull(ebno,"Contract")
 	left join EMPMILL12.spining_daily_transaction sdt on sdt.company_id=prd.company_id and sdt.q_code =prd.q_code
 	and sdt.tran_date=prd.doffdate
 	left join EMPMILL12.spining_master sm on sdt.company_id=sm.company_id and sdt.q_code =sm.q_code
-	left join vowsls.worker_master wm on wm.eb_no = prd.ebno and wm.company_id = 2 and length(wm.eb_no) > 2
 	where  (da.worked_designation_id in (213,50,55,241,252,195,242) or prd.ebno is null)
 	) g
-	group by doffdate,substr(spell,1,1),ebno,name,frameno,q_code,quality,attendance_type
+	group by doffdate,substr(spell,1,1),ebno,frameno,q_code,quality,attendance_type
 	order by frameno ,substr(spell,1,1)
-	"""
-	with engine.connect() as conn:
-		df = pd.read_sql(query, conn)
+	""", start_date=Date, selected_date=Date)
+
+@cached_query
+def spg_details_date(selected_date, start_date):
+	df = read_frame("spg.spg_details_date", start_date=start_date, selected_date=selected_date)
+	df = attach_names(df, 'ebno', 'name')
 	# Format doffdate as YYYY-MM-DD if present
 	if 'doffdate' in df.columns:
 		df['doffdate'] = pd.to_datetime(df['doffdate']).dt.strftime('%Y-%m-%d')
-	return df, df.to_json(orient="records")
-
-def get_name (ebno):
-	query = f"""
-	    select wm.eb_no as EBNO, concat(wm.worker_name,' ',ifnull(wm.middle_name,' '),' ',ifnull(wm.last_name ,'') ) 
-    as Name from vowsls.worker_master wm  where wm.eb_no = '{ebno}' and wm.company_id = 2;
-	"""
-	with engine.connect() as conn:
-		df = pd.read_sql(query, conn)
-	if not df.empty:
-		return df.iloc[0]['Name']
-	else:
-		return "Unknown"
\ No newline at end of file
+	return df
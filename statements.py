@@ -0,0 +1,86 @@
+"""
+Central registry of named, bound-parameter SQL statements.
+
+Query modules register their SQL once at import time with typed parameters
+and then run it by name:
+
+    register("doff10.get_dofftable_data", \"\"\"... WHERE d.doffdate = :selected_date ...\"\"\",
+             selected_date=Date)
+    df = read_frame("doff10.get_dofftable_data", selected_date=selected_date)
+
+Because every call reuses the same ``text()`` object, the statement text is
+identical from call to call (the server sees one statement per report, not
+one per date) and SQLAlchemy's compiled-statement cache on the engine is hit
+after the first execution. Values are always sent as bound parameters, never
+interpolated into the SQL.
+"""
+from typing import Dict, Union
+
+import pandas as pd
+from sqlalchemy import bindparam, Date, DateTime, Integer, Float, String
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy import text
+
+import querystats
+from db import get_engine
+
+
+__all__ = ["register", "statement", "read_frame", "execute", "registered", "Date", "DateTime", "Integer", "Float", "String"]
+
+_registry: Dict[str, TextClause] = {}
+
+
+def register(name: str, sql: str, **param_types) -> TextClause:
+    """
+    Register ``sql`` under ``name``.
+
+    Args:
+        name: Unique dotted name, conventionally ``<module>.<function>``.
+        sql: Statement text using ``:param`` placeholders.
+        **param_types: SQLAlchemy type for each placeholder.
+
+    Raises:
+        ValueError: If the name is already registered with different SQL.
+    """
+    stmt = text(sql).bindparams(*[bindparam(key, type_=type_) for key, type_ in param_types.items()])
+    existing = _registry.get(name)
+    if existing is not None:
+        if existing.text != stmt.text:
+            raise ValueError(f"Statement {name!r} is already registered with different SQL")
+        return existing
+    _registry[name] = stmt
+    return stmt
+
+
+def statement(name: str) -> TextClause:
+    """The registered statement for ``name``."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(f"Unknown statement {name!r}") from None
+
+
+def registered() -> Dict[str, TextClause]:
+    """Snapshot of every registered statement, keyed by name."""
+    return dict(_registry)
+
+
+def read_frame(stmt: Union[str, TextClause], **params) -> pd.DataFrame:
+    """Run a registered statement and return its rows as a DataFrame."""
+    if not isinstance(stmt, str):
+        with get_engine().connect() as conn:
+            return pd.read_sql(stmt, conn, params=params)
+    with querystats.caller(stmt):
+        with get_engine().connect() as conn:
+            df = pd.read_sql(statement(stmt), conn, params=params)
+    if querystats.ENABLED:
+        querystats.record_bytes(stmt, int(df.memory_usage(index=True, deep=True).sum()))
+    return df
+
+
+def execute(conn, stmt: Union[str, TextClause], **params):
+    """Execute a registered statement on an open connection (e.g. inside ``engine.begin()``)."""
+    if not isinstance(stmt, str):
+        return conn.execute(stmt, params)
+    with querystats.caller(stmt):
+        return conn.execute(statement(stmt), params)
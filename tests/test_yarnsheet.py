@@ -0,0 +1,141 @@
+"""
+Tests for the yarn sheet cache (overall/yarnsheet.py).
+
+Run from the repository root:
+
+    python -m unittest discover tests
+"""
+import tempfile
+import unittest
+
+import pandas as pd
+
+from overall import yarnsheet
+from overall.yarn import DATE, MR, QUALITY, WEIGHT
+
+
+class _Worksheet:
+    """Stands in for a gspread worksheet and records the ranges asked for."""
+
+    def __init__(self, rows, row_count=1000):
+        self.rows = rows
+        self.row_count = row_count
+        self.ranges = []
+
+    def get_all_values(self):
+        return self.rows
+
+    def get(self, cell_range):
+        self.ranges.append(cell_range)
+        first, last = (int(part) for part in cell_range.split(":"))
+        return self.rows[first - 1:last]
+
+
+class _Spreadsheet:
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def worksheet(self, name):
+        return self._worksheet
+
+
+def _source(worksheet):
+    source = yarnsheet.GoogleSheetSource.__new__(yarnsheet.GoogleSheetSource)
+    source._spreadsheet = _Spreadsheet(worksheet)
+    return source
+
+
+class GoogleSheetRangeTest(unittest.TestCase):
+    def test_rows_from_first_row_use_a_row_only_range(self):
+        ws = _Worksheet([["Date"], ["r2"], ["r3"], ["r4"]], row_count=1000)
+        self.assertEqual(_source(ws).values("YARN", first_row=3), [["r3"], ["r4"]])
+        self.assertEqual(ws.ranges, ["3:1000"])
+
+    def test_first_row_reads_everything(self):
+        ws = _Worksheet([["Date"], ["r2"]])
+        self.assertEqual(_source(ws).values("YARN"), [["Date"], ["r2"]])
+        self.assertEqual(ws.ranges, [])
+
+    def test_first_row_past_the_grid_reads_nothing(self):
+        ws = _Worksheet([["Date"]], row_count=10)
+        self.assertEqual(_source(ws).values("YARN", first_row=11), [])
+        self.assertEqual(ws.ranges, [])
+
+
+class _Fixture(yarnsheet.FixtureSource):
+    """A fixture sheet that is edited in place, with the first rows asked for recorded."""
+
+    def __init__(self, directory, yarn_rows):
+        super().__init__(directory)
+        self.first_rows = []
+        self.edits = 0
+        self.write(yarn_rows)
+
+    def write(self, yarn_rows):
+        yarnsheet.write_fixture(self.directory, {
+            yarnsheet.YARN_WORKSHEET: [[DATE, QUALITY, WEIGHT, MR]] + yarn_rows,
+            yarnsheet.STD_WORKSHEET: [["Quality", "Count", "", "Quality", "MR"]],
+        })
+        self.edits += 1
+
+    def modified(self):
+        return str(self.edits)
+
+    def values(self, worksheet, first_row=1):
+        if worksheet == yarnsheet.YARN_WORKSHEET:
+            self.first_rows.append(first_row)
+        return super().values(worksheet, first_row)
+
+
+def _row(day, weight):
+    return [f"2026-09-{day:02d}", "Q1", str(weight), "12"]
+
+
+class IncrementalRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self._check_seconds = yarnsheet.CHECK_SECONDS
+        yarnsheet.CHECK_SECONDS = -1    # check the sheet on every access
+        self._dir = tempfile.TemporaryDirectory()
+        self.rows = [_row(1, 40), _row(2, 41), _row(3, 42)]
+        self.source = _Fixture(self._dir.name, self.rows)
+        yarnsheet.use_source(self.source)
+        yarnsheet.sheet()
+        self.source.first_rows.clear()
+
+    def tearDown(self):
+        yarnsheet.CHECK_SECONDS = self._check_seconds
+        yarnsheet.use_source(None)
+        self._dir.cleanup()
+
+    def assertMatchesSheet(self):
+        held = yarnsheet.sheet().data
+        expected = yarnsheet._compact(yarnsheet._yarn_frame((DATE, QUALITY, WEIGHT, MR), self.rows))
+        pd.testing.assert_frame_equal(held, expected)
+
+    def test_appended_rows_are_read_from_the_last_row_held(self):
+        self.rows += [_row(4, 43), _row(5, 44)]
+        self.source.write(self.rows)
+        self.assertMatchesSheet()
+        self.assertEqual(self.source.first_rows, [4])
+
+    def test_deleted_and_appended_rows_reload_the_sheet(self):
+        self.rows = [self.rows[0], self.rows[2], _row(4, 43), _row(5, 44)]
+        self.source.write(self.rows)
+        self.assertMatchesSheet()
+        self.assertEqual(self.source.first_rows, [4, 1])
+
+    def test_edited_last_row_and_appended_rows_reload_the_sheet(self):
+        self.rows = self.rows[:2] + [_row(3, 50), _row(4, 43)]
+        self.source.write(self.rows)
+        self.assertMatchesSheet()
+        self.assertEqual(self.source.first_rows, [4, 1])
+
+    def test_edit_without_new_rows_reloads_the_sheet(self):
+        self.rows[0] = _row(1, 30)
+        self.source.write(self.rows)
+        self.assertMatchesSheet()
+        self.assertEqual(self.source.first_rows, [4, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import streamlit as st
 import datetime
-from wdg.query import wdg_details_date, get_name
+from wdg.query import wdg_details_date
+from workers import get_name
+from efficiency.summary import ebno_shift_summary, filter_days_attended, sort_blanks_last
+from efficiency.compare import compare_with_shifts, with_average_row, SHIFT_EFF_VALUE_COLS
 import pandas as pd
 
 def wdg_low_producer_view():
@@ -19,7 +22,7 @@ def wdg_low_producer_view():
         from_date_str = from_date.strftime("%Y-%m-%d")
         to_date_str = to_date.strftime("%Y-%m-%d")
         # Query the data
-        df, _ = wdg_details_date(to_date_str, from_date_str)
+        df = wdg_details_date(to_date_str, from_date_str)
         if not df.empty:
             # --- Add selectboxes for Shift, EBNO, Mechine, Quality, Attendance Type ---
             shift_options = ['All'] + sorted([str(x) for x in df['shift'].dropna().unique()]) if 'shift' in df.columns else []
@@ -105,32 +108,11 @@ def wdg_low_producer_view():
                 with colf2:
                     days_filter_value = st.number_input('DaysAttended Value', min_value=0, value=0, key='wdg_days_filter_value')
                 st.markdown('**EBNO/Shiftwise Avg Eff Table**')
-                group_rows = []
-                for ebno, group in filtered_df.groupby(['eb_no']):
-                    row = {'EBNO': ebno}
-                    # Get the name from the first row of the group
-                    row['Name'] = group['name'].iloc[0] if 'name' in group.columns and not group['name'].isnull().all() else ''
-                    row['DaysAttended'] = group['tran_date'].nunique()
-                    for shift in ['A', 'B', 'C']:
-                        effs = group[(group['shift'] == shift) & (group['eff'] > 0) & (~group['eff'].isnull())]['eff']
-                        row[shift] = round(effs.mean(), 2) if not effs.empty else None
-                    effs_all = group[(group['eff'] > 0) & (~group['eff'].isnull())]['eff']
-                    row['Avg Eff'] = round(effs_all.mean(), 2) if not effs_all.empty else None
-                    group_rows.append(row)
-                group_df = pd.DataFrame(group_rows)
+                group_df = ebno_shift_summary(filtered_df, 'eb_no', 'tran_date', 'shift', 'eff', name_col='name')
                 # Apply DaysAttended filter
-                if days_filter_type != 'All':
-                    if days_filter_type == 'Above':
-                        group_df = group_df[group_df['DaysAttended'] > days_filter_value]
-                    elif days_filter_type == 'Below':
-                        group_df = group_df[group_df['DaysAttended'] < days_filter_value]
+                group_df = filter_days_attended(group_df, days_filter_type, days_filter_value)
                 # Sort by Avg Eff (lowest to highest, blanks at the bottom)
-                def avg_eff_sort_key(val):
-                    try:
-                        return float(val)
-                    except:
-                        return float('inf')
-                group_df = group_df.sort_values(by='Avg Eff', key=lambda col: col.map(avg_eff_sort_key)).reset_index(drop=True)
+                group_df = sort_blanks_last(group_df, 'Avg Eff')
                 st.dataframe(group_df, hide_index=True)
             elif not filtered_df.empty and missing_cols:
                 st.warning(f"Cannot display EBNO/Shiftwise Avg Eff Table. Missing columns: {', '.join(missing_cols)}")
@@ -139,50 +121,14 @@ def wdg_low_producer_view():
             if selected_ebno and selected_ebno != 'All' and 'eb_no' in filtered_df.columns:
                 ebno_df = filtered_df[filtered_df['eb_no'].astype(str) == selected_ebno]
                 if not ebno_df.empty:
-                    # Use the original (unfiltered) df for EffA, EffB, EffC
-                    orig_df = df.copy()
-                    grouped = ebno_df.groupby(['tran_date', 'shift', 'mechine_name'], as_index=False)
-                    rows = []
-                    for (date, shift, mechine), group in grouped:
-                        # Eff: average for selected EBNO, date, shift, mechine
-                        eff_vals = group['eff']
-                        eff_vals = eff_vals[(eff_vals > 0) & (~eff_vals.isnull())]
-                        eff = round(eff_vals.mean(), 2) if not eff_vals.empty else None
-                        # EffA, EffB, EffC: average for ALL spinners (all EBNOs) who worked on that date, mechine, and shift A/B/C (from original df, not filtered by EBNO)
-                        eff_a = orig_df[(orig_df['tran_date'] == date) & (orig_df['mechine_name'] == mechine) & (orig_df['shift'] == 'A')]['eff']
-                        eff_a = eff_a[(eff_a > 0) & (~eff_a.isnull())]
-                        eff_b = orig_df[(orig_df['tran_date'] == date) & (orig_df['mechine_name'] == mechine) & (orig_df['shift'] == 'B')]['eff']
-                        eff_b = eff_b[(eff_b > 0) & (~eff_b.isnull())]
-                        eff_c = orig_df[(orig_df['tran_date'] == date) & (orig_df['mechine_name'] == mechine) & (orig_df['shift'] == 'C')]['eff']
-                        eff_c = eff_c[(eff_c > 0) & (~eff_c.isnull())]
-                        eff_a_val = round(eff_a.mean(), 2) if not eff_a.empty else None
-                        eff_b_val = round(eff_b.mean(), 2) if not eff_b.empty else None
-                        eff_c_val = round(eff_c.mean(), 2) if not eff_c.empty else None
-                        avg_eff = [v for v in [eff_a_val, eff_b_val, eff_c_val] if isinstance(v, (int, float))]
-                        avg_eff_val = round(sum(avg_eff) / len(avg_eff), 2) if avg_eff else None
-                        # Get name from the group
-                        name_val = group['name'].iloc[0] if 'name' in group.columns and not group['name'].isnull().all() else None
-                        rows.append({
-                            'Date': date,
-                            'Shift': shift,
-                            'EBNO': selected_ebno,
-                            'Name': name_val,
-                            'Mechine': mechine,
-                            'Eff': eff,
-                            'EffA': eff_a_val,
-                            'EffB': eff_b_val,
-                            'EffC': eff_c_val,
-                            'AvgEff': avg_eff_val
-                        })
-                    result_df = pd.DataFrame(rows)
+                    # Own Eff per (date, shift, mechine) next to the EffA/EffB/EffC average of ALL workers
+                    # on that date and mechine (from the original df, not filtered by EBNO)
+                    result_df = compare_with_shifts(ebno_df, df, 'tran_date', 'shift', 'mechine_name', 'eff', extra_cols=['name'])
+                    result_df = result_df.rename(columns={'tran_date': 'Date', 'shift': 'Shift', 'mechine_name': 'Mechine', 'name': 'Name'})
+                    result_df['EBNO'] = selected_ebno
+                    result_df = result_df.reindex(columns=['Date', 'Shift', 'EBNO', 'Name', 'Mechine', 'Eff', 'EffA', 'EffB', 'EffC', 'AvgEff'])
                     # Add summary row for averages
-                    if not result_df.empty:
-                        avg_row = {'Date': 'Avg', 'Shift': None, 'EBNO': selected_ebno, 'Name': None, 'Mechine': None}
-                        for col in ['Eff', 'EffA', 'EffB', 'EffC', 'AvgEff']:
-                            vals = pd.to_numeric(result_df[col], errors='coerce')
-                            vals = vals[~vals.isnull()]
-                            avg_row[col] = round(vals.mean(), 2) if not vals.empty else None
-                        result_df = pd.concat([result_df, pd.DataFrame([avg_row])], ignore_index=True)
+                    result_df = with_average_row(result_df, SHIFT_EFF_VALUE_COLS, {'Date': 'Avg', 'Shift': None, 'EBNO': selected_ebno, 'Name': None, 'Mechine': None})
                     st.markdown('**EBNO/Shiftwise Eff Table (Details)**')
                     st.dataframe(result_df, hide_index=True)
                 else:
@@ -0,0 +1,123 @@
+"""
+Process-wide worker directory (eb_no -> display name).
+
+The low-producer queries used to join ``vowsls.worker_master`` only to build
+a name column, and the pages ran one more query each time an EBNO was picked.
+The directory is instead loaded once in bulk, kept as a plain dict shared by
+every session, and refreshed incrementally: after REFRESH_SECONDS the next
+lookup fetches only the rows modified since the newest modification seen.
+If the modification column is not available the refresh falls back to a
+full reload.
+"""
+import datetime
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from db import get_engine
+
+
+COMPANY_ID = 2
+REFRESH_SECONDS = 15 * 60
+# worker_master column holding the last modification time of a row
+MODIFIED_COLUMN = "update_date_time"
+
+# Same display format the report queries built with concat()
+NAME_SQL = "concat(wm.worker_name,' ',ifnull(wm.middle_name,' '),' ',ifnull(wm.last_name ,''))"
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_names: Dict[str, str] = {}
+_loaded_at: Optional[float] = None
+_high_water: Optional[datetime.datetime] = None
+_incremental = True
+
+
+def _fetch(since: Optional[datetime.datetime]) -> pd.DataFrame:
+    if _incremental:
+        sql = f"""
+            SELECT wm.eb_no, {NAME_SQL} AS name, wm.{MODIFIED_COLUMN} AS modified
+            FROM vowsls.worker_master wm
+            WHERE wm.company_id = :company_id
+            {"AND wm." + MODIFIED_COLUMN + " > :since" if since is not None else ""}
+            ORDER BY wm.{MODIFIED_COLUMN}
+        """
+    else:
+        sql = f"""
+            SELECT wm.eb_no, {NAME_SQL} AS name, NULL AS modified
+            FROM vowsls.worker_master wm
+            WHERE wm.company_id = :company_id
+        """
+    with get_engine().connect() as conn:
+        return pd.read_sql(text(sql), conn, params={"company_id": COMPANY_ID, "since": since})
+
+
+def ebno_keys(values: pd.Series) -> pd.Series:
+    """
+    Directory keys for eb_no values: stripped strings, without the ``.0``
+    an eb_no picks up in a float column (NULLs become 'nan'; mask them).
+    """
+    return values.astype(str).str.strip().str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+
+
+def refresh(full: bool = False) -> None:
+    """
+    Load the directory, or apply rows modified since the last load. The new
+    mapping is built aside and swapped in, so a dict handed out by
+    ``directory()`` never changes under its reader.
+    """
+    global _names, _loaded_at, _high_water, _incremental
+    since = None if full or _loaded_at is None else _high_water
+    try:
+        rows = _fetch(since)
+    except Exception:
+        if not _incremental:
+            raise
+        log.warning("worker_master.%s unavailable, using full reloads", MODIFIED_COLUMN, exc_info=True)
+        _incremental = False
+        since = None
+        rows = _fetch(None)
+
+    # Later modifications win when an eb_no appears more than once
+    update = dict(zip(ebno_keys(rows["eb_no"]), rows["name"]))
+    _names = update if since is None else {**_names, **update}
+    if _incremental and not rows.empty and rows["modified"].notna().any():
+        newest = pd.Timestamp(rows["modified"].max()).to_pydatetime()
+        _high_water = max(newest, _high_water) if _high_water and since is not None else newest
+    _loaded_at = time.monotonic()
+
+
+def directory() -> Dict[str, str]:
+    """The eb_no -> name mapping, loaded or refreshed as needed."""
+    with _lock:
+        if _loaded_at is None or time.monotonic() - _loaded_at > REFRESH_SECONDS:
+            refresh()
+        return _names
+
+
+def get_name(ebno, default: str = "Unknown") -> str:
+    """Display name for one EBNO."""
+    return directory().get(ebno_keys(pd.Series([ebno])).iloc[0], default)
+
+
+def attach_names(df: pd.DataFrame, ebno_col: str, name_col: str = "name", after: Optional[str] = None) -> pd.DataFrame:
+    """
+    Insert a name column resolved from the directory.
+
+    Only eb_nos longer than two characters are looked up, matching the
+    ``length(wm.eb_no) > 2`` condition the report joins used.
+
+    Args:
+        after: Column to place the names after (default: ``ebno_col``).
+    """
+    keys = ebno_keys(df[ebno_col])
+    names = keys.map(directory()).astype(object)
+    names = names.where(df[ebno_col].notna() & (keys.str.len() > 2) & names.notna(), None)
+    df = df.drop(columns=[name_col], errors="ignore")
+    df.insert(df.columns.get_loc(after or ebno_col) + 1, name_col, names)
+    return df